@@ -0,0 +1,189 @@
+"""
+Bulk registration for onboarding whole departments, used by the
+`register/bulk/` endpoint and the `bulk_register_users` command.
+
+Rows are read lazily (e.g. from a CSV stream) and processed in batches:
+
+1. field validation per row (no queries),
+2. duplicate usernames / e-mails: against earlier rows of the same input
+   in memory, and against the database with one query per batch,
+3. password hashing in a process pool (PBKDF2 is CPU bound, threads would
+   serialize on the GIL),
+4. one `bulk_create` per batch.
+
+Every row gets a result: `{"row": n, "username": ..., "status": "created",
+"id": ...}` or `{..., "status": "failed", "errors": {field: [messages]}}`.
+"""
+
+import csv
+import io
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework import serializers
+
+from .directory import bump_directory_version
+from .hashing import hash_passwords
+from .models import USER_TYPE_CHOICES, User
+
+BATCH_SIZE = 500
+
+USERNAME_TAKEN = "This username is already taken."
+EMAIL_TAKEN = "This email is already in use."
+REGISTERED_CONCURRENTLY = "This username or email was registered meanwhile."
+
+
+class BulkRegisterRowSerializer(serializers.Serializer):
+    """
+    RegisterSerializer without its per-row uniqueness queries; uniqueness
+    is checked for the whole batch at once.
+    """
+
+    username = serializers.CharField(
+        max_length=150, validators=[User.username_validator]
+    )
+    email = serializers.CharField(max_length=254)
+    password = serializers.CharField(min_length=8, write_only=True)
+    first_name = serializers.CharField(
+        max_length=150, required=False, allow_blank=True, default=""
+    )
+    last_name = serializers.CharField(
+        max_length=150, required=False, allow_blank=True, default=""
+    )
+    user_type = serializers.ChoiceField(
+        choices=USER_TYPE_CHOICES, required=False, default="employee"
+    )
+
+
+def read_csv(stream):
+    """
+    Yields the rows of a CSV text stream with a header line as dicts.
+    """
+    for row in csv.DictReader(stream):
+        yield {
+            (name or "").strip(): (value or "").strip() for name, value in row.items()
+        }
+
+
+def read_csv_upload(uploaded_file):
+    """
+    read_csv() for an uploaded (binary) file, without reading it whole.
+    """
+    return read_csv(io.TextIOWrapper(uploaded_file, encoding="utf-8-sig", newline=""))
+
+
+def register_users(rows, batch_size=BATCH_SIZE, executor=None):
+    """
+    Creates users from `rows` (dicts with the RegisterSerializer fields and
+    an optional user_type) and yields one result per row, in input order.
+    Passwords are hashed with `executor` (see accounts.hashing) when given.
+    """
+    seen_usernames = set()
+    seen_emails = set()
+    numbered = enumerate(rows, start=1)
+
+    while True:
+        batch = list(islice(numbered, batch_size))
+        if not batch:
+            return
+        yield from _register_batch(batch, seen_usernames, seen_emails, executor)
+
+
+def _register_batch(batch, seen_usernames, seen_emails, executor):
+    results = {}
+    valid = []
+    for row_number, row in batch:
+        serializer = BulkRegisterRowSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((row_number, serializer.validated_data))
+        else:
+            results[row_number] = _failed(row_number, row, serializer.errors)
+
+    # one query for the whole batch
+    usernames = [data["username"] for _, data in valid]
+    emails = [data["email"] for _, data in valid]
+    existing_usernames = set()
+    existing_emails = set()
+    for username, email in User.objects.filter(
+        Q(username__in=usernames) | Q(email__in=emails)
+    ).values_list("username", "email"):
+        existing_usernames.add(username)
+        existing_emails.add(email)
+
+    new = []
+    for row_number, data in valid:
+        errors = {}
+        if data["username"] in existing_usernames or data["username"] in seen_usernames:
+            errors["username"] = [USERNAME_TAKEN]
+        if data["email"] in existing_emails or data["email"] in seen_emails:
+            errors["email"] = [EMAIL_TAKEN]
+        # a failed row still claims its values: the first one wins
+        seen_usernames.add(data["username"])
+        seen_emails.add(data["email"])
+        if errors:
+            results[row_number] = _failed(row_number, data, errors)
+        else:
+            new.append((row_number, data))
+
+    hashes = hash_passwords([data["password"] for _, data in new], executor)
+    users = [
+        User(
+            username=data["username"],
+            email=data["email"],
+            first_name=data["first_name"],
+            last_name=data["last_name"],
+            user_type=data["user_type"],
+            password=password_hash,
+        )
+        for (_, data), password_hash in zip(new, hashes)
+    ]
+
+    for (row_number, data), user in zip(new, _insert(users)):
+        if user.pk is None:
+            results[row_number] = _failed(
+                row_number, data, {"non_field_errors": [REGISTERED_CONCURRENTLY]}
+            )
+        else:
+            results[row_number] = {
+                "row": row_number,
+                "username": user.username,
+                "status": "created",
+                "id": user.pk,
+            }
+
+    # bulk_create doesn't send post_save (see accounts/signals.py)
+    if any(user.pk and user.user_type == "employee" for user in users):
+        bump_directory_version()
+
+    return [results[row_number] for row_number, _ in batch]
+
+
+def _insert(users):
+    """
+    bulk_create()s `users`; if a concurrent registration took one of the
+    names, falls back to row by row inserts and leaves pk None on the
+    users that could not be created.
+    """
+    try:
+        with transaction.atomic():
+            return User.objects.bulk_create(users)
+    except IntegrityError:
+        pass
+
+    for user in users:
+        try:
+            with transaction.atomic():
+                user.save(force_insert=True)
+        except IntegrityError:
+            user.pk = None
+    return users
+
+
+def _failed(row_number, row, errors):
+    return {
+        "row": row_number,
+        "username": row.get("username"),
+        "status": "failed",
+        "errors": errors,
+    }
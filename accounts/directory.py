@@ -0,0 +1,80 @@
+"""
+Cached employee directory used by the assignee pickers.
+
+Pages are cached under a directory version. Saving or deleting an employee
+bumps the version (see accounts/signals.py), which makes every cached page
+unreachable at once without scanning keys; old pages simply expire.
+"""
+
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import User
+
+VERSION_KEY = "employee-directory:version"
+PAGE_TIMEOUT = 5 * 60
+
+FIELDS = ("id", "first_name", "last_name", "email")
+
+
+def get_directory_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # a fresh, unique start value so pages cached under an evicted
+        # version can never be mistaken for current ones
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_directory_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def search_filter(search):
+    """
+    Every word must be a prefix of the first name, last name or e-mail.
+    """
+    condition = Q()
+    for term in search.split():
+        condition &= (
+            Q(first_name__istartswith=term)
+            | Q(last_name__istartswith=term)
+            | Q(email__istartswith=term)
+        )
+    return condition
+
+
+def _page_key(version, search, after_id, limit):
+    raw = f"{search}|{after_id}|{limit}".encode()
+    return f"employee-directory:{version}:{hashlib.md5(raw).hexdigest()}"
+
+
+def employee_directory_page(search="", after_id=None, limit=50):
+    """
+    Returns `(rows, has_more)` where rows are dicts of FIELDS ordered by id.
+    """
+    search = " ".join(search.lower().split())
+    key = _page_key(get_directory_version(), search, after_id, limit)
+
+    page = cache.get(key)
+    if page is not None:
+        return page
+
+    employees = User.objects.filter(user_type="employee", is_active=True)
+    if search:
+        employees = employees.filter(search_filter(search))
+    if after_id is not None:
+        employees = employees.filter(id__gt=after_id)
+
+    rows = list(employees.order_by("id").values(*FIELDS)[: limit + 1])
+    page = (rows[:limit], len(rows) > limit)
+
+    cache.set(key, page, PAGE_TIMEOUT)
+    return page
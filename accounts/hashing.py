@@ -0,0 +1,59 @@
+"""
+Password hashing in worker processes for bulk registration
+(accounts/bulk.py). PBKDF2 is CPU bound, so threads would serialize on the
+GIL.
+
+Workers are spawned rather than forked, which is safe from threaded web
+servers. A spawned worker unpickles the functions it runs before Django is
+set up, so this module must not import models.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+# passwords per task sent to a worker
+CHUNK_SIZE = 16
+
+
+def _setup_worker():
+    if not apps.ready:
+        django.setup()
+
+
+def hashing_pool(workers):
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_setup_worker,
+    )
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def shared_hashing_pool():
+    """
+    The pool of this web process (BULK_REGISTER_WORKERS workers, None when
+    that is 0), started on first use.
+    """
+    global _shared_pool
+    workers = getattr(settings, "BULK_REGISTER_WORKERS", 4)
+    if not workers:
+        return None
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = hashing_pool(workers)
+        return _shared_pool
+
+
+def hash_passwords(passwords, executor=None):
+    if executor is None or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+    return list(executor.map(make_password, passwords, chunksize=CHUNK_SIZE))
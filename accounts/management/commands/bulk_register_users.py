@@ -0,0 +1,68 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.bulk import BATCH_SIZE, read_csv, register_users
+from accounts.hashing import hashing_pool
+
+
+class Command(BaseCommand):
+    help = (
+        "Registers the users of a CSV file (header: username,email,password,"
+        "first_name,last_name[,user_type]) and reports every row."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file, or - for stdin.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Password hashing processes; 0 hashes in this process.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        try:
+            stream = (
+                sys.stdin
+                if path == "-"
+                else open(path, encoding="utf-8-sig", newline="")
+            )
+        except OSError as exc:
+            raise CommandError(f"Can't read {path}: {exc}")
+
+        workers = options["workers"]
+        executor = hashing_pool(workers) if workers > 0 else None
+
+        created = failed = 0
+        try:
+            for result in register_users(
+                read_csv(stream), options["batch_size"], executor
+            ):
+                if result["status"] == "created":
+                    created += 1
+                    self.stdout.write(
+                        f"row {result['row']}: created {result['username']} "
+                        f"(id {result['id']})"
+                    )
+                else:
+                    failed += 1
+                    errors = "; ".join(
+                        f"{field}: {' '.join(str(m) for m in messages)}"
+                        for field, messages in result["errors"].items()
+                    )
+                    self.stdout.write(
+                        self.style.ERROR(f"row {result['row']}: failed, {errors}")
+                    )
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            if stream is not sys.stdin:
+                stream.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{created} user(s) created, {failed} row(s) failed.")
+        )
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.tokens import BATCH_SIZE, prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes expired outstanding refresh tokens and their blacklist "
+        "entries in small batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.1,
+            help="Seconds to sleep between batches.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=3600,
+            help="Seconds to sleep between runs.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Delete everything that has expired now and exit.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            outstanding, blacklisted = prune_expired_tokens(
+                batch_size=options["batch_size"], pause=options["pause"]
+            )
+            if outstanding or options["once"]:
+                self.stdout.write(
+                    f"{outstanding} expired token(s) deleted, "
+                    f"{blacklisted} of them blacklisted."
+                )
+
+            if options["once"]:
+                return
+
+            time.sleep(options["interval"])
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.16 on 2026-10-19 08:20
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_user_user_type"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="user_type",
+            field=models.CharField(
+                choices=[
+                    ("admin", "Admin"),
+                    ("todo admin", "Employee"),
+                    ("employee", "Employee"),
+                ],
+                default="employee",
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.text.Upper("first_name"),
+                condition=models.Q(("is_active", True), ("user_type", "employee")),
+                name="user_employee_first_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.text.Upper("last_name"),
+                condition=models.Q(("is_active", True), ("user_type", "employee")),
+                name="user_employee_last_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.text.Upper("email"),
+                condition=models.Q(("is_active", True), ("user_type", "employee")),
+                name="user_employee_email_idx",
+            ),
+        ),
+    ]
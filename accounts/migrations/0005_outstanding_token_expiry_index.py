@@ -0,0 +1,32 @@
+from django.db import migrations
+
+INDEX_NAME = "token_outstanding_expires_at_idx"
+
+
+def create_index(apps, schema_editor):
+    # the token tables belong to simplejwt, so the index is added by hand.
+    # CONCURRENTLY keeps logins going while it's built on a large table.
+    concurrently = "CONCURRENTLY " if schema_editor.connection.vendor == "postgresql" else ""
+    table = apps.get_model("token_blacklist", "OutstandingToken")._meta.db_table
+    schema_editor.execute(
+        f"CREATE INDEX {concurrently}IF NOT EXISTS {INDEX_NAME} "
+        f"ON {schema_editor.quote_name(table)} (expires_at)"
+    )
+
+
+def drop_index(apps, schema_editor):
+    schema_editor.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0004_user_task_counters"),
+        ("token_blacklist", "0012_alter_outstandingtoken_user"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
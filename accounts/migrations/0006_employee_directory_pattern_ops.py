@@ -0,0 +1,61 @@
+# Generated by Django 4.2.16 on 2026-10-19 09:24
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+import core.db.indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0005_outstanding_token_expiry_index"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="user",
+            name="user_employee_first_name_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="user",
+            name="user_employee_last_name_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="user",
+            name="user_employee_email_idx",
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                core.db.indexes.PatternOpClass(
+                    django.db.models.functions.text.Upper("first_name"),
+                    name="varchar_pattern_ops",
+                ),
+                condition=models.Q(("is_active", True), ("user_type", "employee")),
+                name="user_employee_first_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                core.db.indexes.PatternOpClass(
+                    django.db.models.functions.text.Upper("last_name"),
+                    name="varchar_pattern_ops",
+                ),
+                condition=models.Q(("is_active", True), ("user_type", "employee")),
+                name="user_employee_last_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                core.db.indexes.PatternOpClass(
+                    django.db.models.functions.text.Upper("email"),
+                    name="varchar_pattern_ops",
+                ),
+                condition=models.Q(("is_active", True), ("user_type", "employee")),
+                name="user_employee_email_idx",
+            ),
+        ),
+    ]
@@ -1,5 +1,9 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Upper
+
+from core.db.indexes import PatternOpClass
 
 USER_TYPE_CHOICES = (
     ("admin", "Admin"),
@@ -18,8 +22,48 @@ class User(AbstractUser):
         max_length=20, choices=USER_TYPE_CHOICES, default="employee"
     )
 
+    # Denormalized task counters for the assigned user, kept up to date by
+    # todo/counters.py and rebuilt by `manage.py reconcile_task_counters`.
+    open_assigned_tasks_count = models.IntegerField(default=0)
+
+    pending_approval_tasks_count = models.IntegerField(default=0)
+
+    completed_tasks_count = models.IntegerField(default=0)
+
+    overdue_tasks_count = models.IntegerField(default=0)
+
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username"]  # admin için username zorunlu olsun
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # prefix search of the employee directory (accounts/directory.py):
+            # `istartswith` compiles to UPPER(col::text) LIKE UPPER('term%'),
+            # which PostgreSQL can only answer from a pattern_ops index
+            # unless the database uses the C collation
+            models.Index(
+                PatternOpClass(Upper("first_name"), name="varchar_pattern_ops"),
+                name="user_employee_first_name_idx",
+                condition=Q(user_type="employee", is_active=True),
+            ),
+            models.Index(
+                PatternOpClass(Upper("last_name"), name="varchar_pattern_ops"),
+                name="user_employee_last_name_idx",
+                condition=Q(user_type="employee", is_active=True),
+            ),
+            models.Index(
+                PatternOpClass(Upper("email"), name="varchar_pattern_ops"),
+                name="user_employee_email_idx",
+                condition=Q(user_type="employee", is_active=True),
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "user_type" in field_names:
+            instance._loaded_user_type = values[field_names.index("user_type")]
+        return instance
+
     def __str__(self):
         return self.email
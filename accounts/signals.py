@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .directory import bump_directory_version
+from .models import User
+
+
+def _is_or_was_employee(user):
+    return "employee" in (user.user_type, getattr(user, "_loaded_user_type", None))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_employee_directory(sender, instance, **kwargs):
+    if _is_or_was_employee(instance):
+        bump_directory_version()
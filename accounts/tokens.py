@@ -0,0 +1,66 @@
+"""
+Pruning of expired refresh tokens (simplejwt's token_blacklist tables).
+
+Every login adds an OutstandingToken row and every logout a BlacklistedToken
+row. Once a token has expired it is rejected on its own, so neither row is
+needed any more. simplejwt's `flushexpiredtokens` deletes them all in one
+statement, which holds locks on millions of rows; here they go in small
+batches found through the expires_at index (migration 0005), each batch in
+its own short transaction.
+"""
+
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+BATCH_SIZE = 1000
+
+
+def expiry_cutoff(now=None):
+    """
+    Tokens that expired before this can be deleted. Tokens are still
+    accepted for LEEWAY after they expire, so a blacklisted one has to stay
+    blacklisted that long.
+    """
+    leeway = api_settings.LEEWAY
+    if not isinstance(leeway, timedelta):
+        leeway = timedelta(seconds=leeway)
+    return (now or timezone.now()) - leeway
+
+
+def prune_expired_tokens(batch_size=BATCH_SIZE, pause=0, now=None):
+    """
+    Deletes the expired outstanding tokens and their blacklist entries.
+    Returns `(outstanding, blacklisted)`, the number of rows deleted.
+    `pause` seconds are slept between batches to leave room for other
+    writers (and replicas) on busy databases.
+    """
+    cutoff = expiry_cutoff(now)
+    outstanding = blacklisted = 0
+
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lt=cutoff)
+            .order_by("expires_at")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return outstanding, blacklisted
+
+        with transaction.atomic():
+            # the blacklist rows cascade
+            _, deleted = OutstandingToken.objects.filter(id__in=ids).only("id").delete()
+        outstanding += deleted.get(OutstandingToken._meta.label, 0)
+        blacklisted += deleted.get(BlacklistedToken._meta.label, 0)
+
+        if len(ids) < batch_size:
+            return outstanding, blacklisted
+        if pause:
+            time.sleep(pause)
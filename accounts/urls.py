@@ -1,9 +1,10 @@
 from django.urls import path
 
-from .views import LoginView, LogoutView, RegisterView
+from .views import BulkRegisterView, LoginView, LogoutView, RegisterView
 
 urlpatterns = [
     path("register/", RegisterView.as_view(), name="register"),
+    path("register/bulk/", BulkRegisterView.as_view(), name="register-bulk"),
     path("login/", LoginView.as_view(), name="login"),
     path("logout/", LogoutView.as_view(), name="logout"),
 ]
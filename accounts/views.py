@@ -1,3 +1,6 @@
+import csv
+from itertools import islice
+
 from django.conf import settings
 from django.db.models import Q
 from rest_framework import status
@@ -6,13 +9,19 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from core.idempotency import idempotent
+
+from .bulk import read_csv_upload, register_users
+from .hashing import shared_hashing_pool
 from .models import User
+from .permissions import IsAdminUser
 from .serializers import LoginSerializer, RegisterSerializer
 
 
 class RegisterView(APIView):
     permission_classes = [AllowAny]
 
+    @idempotent
     def post(self, request):
         serializer = RegisterSerializer(data=request.data)
         if not serializer.is_valid():
@@ -43,6 +52,71 @@ class RegisterView(APIView):
         )
 
 
+class BulkRegisterView(APIView):
+    """
+    Registers many users at once, for onboarding: a CSV upload in "file"
+    (header: username,email,password,first_name,last_name[,user_type]) or
+    JSON {"users": [{...}, ...]}. Every row is reported as created or failed
+    with its errors; failed rows don't stop the others. Inputs larger than
+    `max_rows` go through the bulk_register_users command.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    max_rows = 2000
+
+    @idempotent
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get("file")
+        if upload is not None:
+            rows = read_csv_upload(upload)
+        else:
+            rows = request.data.get("users")
+            if not isinstance(rows, list):
+                return Response(
+                    {"detail": "Send a CSV file in 'file' or a list in 'users'."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        try:
+            rows = list(islice(rows, self.max_rows + 1))
+        except (csv.Error, UnicodeDecodeError):
+            return Response(
+                {"detail": "The file is not a valid UTF-8 CSV file."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(rows) > self.max_rows:
+            return Response(
+                {
+                    "detail": (
+                        f"At most {self.max_rows} rows are allowed; use the "
+                        "bulk_register_users command for larger files."
+                    )
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not all(isinstance(row, dict) for row in rows):
+            return Response(
+                {"detail": "Every user must be an object."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = list(register_users(rows, executor=shared_hashing_pool()))
+        created = sum(1 for result in results if result["status"] == "created")
+
+        return Response(
+            {
+                "status": 200,
+                "message": "Bulk registration processed.",
+                "response": {
+                    "created": created,
+                    "failed": len(results) - created,
+                    "results": results,
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 class LoginView(APIView):
     permission_classes = [AllowAny]
 
@@ -0,0 +1,101 @@
+"""
+Benchmark for pooled database connections (core.db.backends.postgresql_pool)
+against a connection per request (django.db.backends.postgresql).
+
+Runs the request cycle of a cheap endpoint like task-detail: connect, one
+primary-key SELECT, close at the end of the request. Needs the DB_* settings
+of a reachable PostgreSQL server:
+
+    python benchmarks/db_pool.py --requests 2000 --threads 8
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import DEFAULT_DB_ALIAS, connections  # noqa: E402
+from django.db.utils import load_backend  # noqa: E402
+
+from core.db.backends.postgresql_pool.base import close_pools, pool_stats  # noqa: E402
+
+ENGINES = {
+    "connection per request": "django.db.backends.postgresql",
+    "pooled": "core.db.backends.postgresql_pool",
+}
+
+
+def make_wrapper(engine):
+    settings_dict = {
+        **connections[DEFAULT_DB_ALIAS].settings_dict,
+        "ENGINE": engine,
+        "CONN_MAX_AGE": 0,
+    }
+    settings_dict["OPTIONS"] = dict(settings_dict.get("OPTIONS") or {})
+    if engine != ENGINES["pooled"]:
+        settings_dict["OPTIONS"].pop("pool", None)
+    return load_backend(engine).DatabaseWrapper(settings_dict, DEFAULT_DB_ALIAS)
+
+
+def run(engine, count):
+    # one wrapper per thread, like Django's connection handler
+    wrapper = make_wrapper(engine)
+    timings = []
+
+    for n in range(count):
+        started = time.perf_counter()
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT id FROM todo_task WHERE id = %s", [n])
+            cursor.fetchone()
+        # what request_finished does; closes (or checks in) with CONN_MAX_AGE 0
+        wrapper.close_if_unusable_or_obsolete()
+        timings.append(time.perf_counter() - started)
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
+
+    per_thread = max(args.requests // args.threads, 1)
+    results = {}
+
+    for name, engine in ENGINES.items():
+        run(engine, min(50, per_thread))  # warm up
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            futures = [
+                pool.submit(run, engine, per_thread) for _ in range(args.threads)
+            ]
+            timings = [t for future in futures for t in future.result()]
+        elapsed = time.perf_counter() - started
+
+        timings.sort()
+        results[name] = statistics.median(timings)
+        print(
+            f"{name}: median {results[name] * 1e3:.2f} ms, "
+            f"p95 {timings[int(len(timings) * 0.95)] * 1e3:.2f} ms, "
+            f"{len(timings) / elapsed:.0f} requests/s"
+        )
+
+    speedup = results["connection per request"] / results["pooled"]
+    print(f"pooled is {speedup:.1f}x faster per request (median)")
+    print(f"pool: {pool_stats()}")
+    close_pools()
+
+
+if __name__ == "__main__":
+    main()
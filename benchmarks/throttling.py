@@ -0,0 +1,85 @@
+"""
+Benchmark for the per-request overhead of the token-bucket throttles
+(core.throttling).
+
+Times the same cheap view with and without the default throttle classes
+against the configured cache (set REDIS_URL to measure the Redis path):
+
+    python benchmarks/throttling.py --requests 20000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.cache import cache, caches  # noqa: E402
+from rest_framework.response import Response  # noqa: E402
+from rest_framework.settings import api_settings  # noqa: E402
+from rest_framework.test import APIRequestFactory, force_authenticate  # noqa: E402
+from rest_framework.views import APIView  # noqa: E402
+
+from accounts.models import User  # noqa: E402
+
+
+class PingView(APIView):
+    def get(self, request, *args, **kwargs):
+        return Response({"status": "success"})
+
+
+def run(view, user, count):
+    factory = APIRequestFactory()
+    timings = []
+
+    for _ in range(count):
+        request = factory.get("/ping/", HTTP_HOST="localhost")
+        force_authenticate(request, user=user)
+        started = time.perf_counter()
+        response = view(request)
+        timings.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.data
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    # never save the user; the rates are raised so no request is throttled
+    user = User(id=10**9, username="bench-throttle", user_type="employee")
+    api_settings.DEFAULT_THROTTLE_RATES.update(
+        {
+            scope: f"{args.requests * 10}/day"
+            for scope in api_settings.DEFAULT_THROTTLE_RATES
+        }
+    )
+
+    baseline = PingView.as_view(throttle_classes=[])
+    throttled = PingView.as_view()
+
+    results = {}
+    for name, view in (("without throttles", baseline), ("throttled", throttled)):
+        cache.clear()
+        run(view, user, min(1000, args.requests))  # warm up
+        timings = run(view, user, args.requests)
+        results[name] = statistics.median(timings)
+        print(f"{name}: median {results[name] * 1e6:.1f} us/request")
+
+    overhead = results["throttled"] - results["without throttles"]
+    backend = type(caches["default"]).__name__
+    print(f"overhead: {overhead * 1e6:.1f} us/request ({backend})")
+
+
+if __name__ == "__main__":
+    main()
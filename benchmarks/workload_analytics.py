@@ -0,0 +1,142 @@
+"""
+Benchmark for the employee workload endpoint (todo.views.EmployeeWorkloadView).
+
+Generates one admin with N tasks spread over M employees and times the
+endpoint. All rows are created inside a transaction that is rolled back at the
+end, but run it against a scratch database anyway:
+
+    python benchmarks/workload_analytics.py --tasks 1000000 --employees 2000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.test import APIRequestFactory, force_authenticate  # noqa: E402
+
+from accounts.models import User  # noqa: E402
+from todo.models import Task  # noqa: E402
+from todo.views import EmployeeWorkloadView  # noqa: E402
+
+
+class Rollback(Exception):
+    pass
+
+
+def populate(task_count, employee_count, chunk_size=10000):
+    admin = User.objects.create_user(
+        username="bench-admin",
+        email="bench-admin@example.com",
+        password="x",
+        user_type="admin",
+    )
+    User.objects.bulk_create(
+        User(
+            username=f"bench-{i}",
+            email=f"bench-{i}@example.com",
+            first_name="Bench",
+            last_name=str(i),
+        )
+        for i in range(employee_count)
+    )
+    employee_ids = list(
+        User.objects.filter(username__startswith="bench-", user_type="employee")
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+
+    now = timezone.now()
+    rng = random.Random(42)
+    created = 0
+    while created < task_count:
+        batch = []
+        for _ in range(min(chunk_size, task_count - created)):
+            assigned_at = now - timedelta(hours=rng.randint(1, 24 * 30))
+            completed = rng.random() < 0.5
+            batch.append(
+                Task(
+                    owner=admin,
+                    assigned_user_id=rng.choice(employee_ids),
+                    title="bench",
+                    assigned_at=assigned_at,
+                    is_completed=completed,
+                    complete_requested=not completed and rng.random() < 0.2,
+                    completed_at=(
+                        assigned_at + timedelta(hours=rng.randint(1, 72))
+                        if completed
+                        else None
+                    ),
+                )
+            )
+        Task.objects.bulk_create(batch)
+        created += len(batch)
+        print(f"\rcreated {created}/{task_count} tasks", end="", flush=True)
+    print()
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("ANALYZE todo_task")
+        else:
+            cursor.execute("ANALYZE")
+
+    return admin
+
+
+def run(admin, repeat):
+    factory = APIRequestFactory()
+    view = EmployeeWorkloadView.as_view()
+    timings = []
+
+    for _ in range(repeat):
+        request = factory.get(
+            "/api/todo/workload/", {"ordering": "-load"}, HTTP_HOST="localhost"
+        )
+        force_authenticate(request, user=admin)
+        started = time.perf_counter()
+        response = view(request)
+        response.render()
+        timings.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.data
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--employees", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    try:
+        with transaction.atomic():
+            admin = populate(args.tasks, args.employees)
+            timings = run(admin, args.repeat)
+            raise Rollback
+    except Rollback:
+        pass
+
+    print(
+        f"workload endpoint, {args.tasks} tasks / {args.employees} employees: "
+        f"median {statistics.median(timings) * 1000:.1f} ms, "
+        f"min {min(timings) * 1000:.1f} ms, max {max(timings) * 1000:.1f} ms "
+        f"over {args.repeat} runs"
+    )
+
+
+if __name__ == "__main__":
+    main()
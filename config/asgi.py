@@ -2,6 +2,9 @@
 ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests to the task event stream are handled by a plain ASGI app so that
+thousands of idle server-sent event connections do not hold a thread each;
+everything else goes to Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -13,4 +16,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from todo.sse import STREAM_PATH, TaskEventStream  # noqa: E402
+
+task_event_stream = TaskEventStream()
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "http" and scope["path"] == STREAM_PATH:
+        await task_event_stream(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -45,9 +45,11 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework_simplejwt",
     "rest_framework_simplejwt.token_blacklist",
+    "core",
     "accounts",
     "todo",
 ]
@@ -96,8 +98,66 @@ DATABASES = {
         "PORT": os.getenv("DB_PORT", "5432"),
     }
 }
+
+# DB_POOL=True takes connections from a per-process pool (core/db/pool.py) that
+# they go back to at the end of every request; keep CONN_MAX_AGE at 0. Leave
+# it off behind PgBouncer or another external pooler.
+if os.getenv("DB_POOL", "False") == "True":
+    DATABASES["default"]["ENGINE"] = "core.db.backends.postgresql_pool"
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "20")),
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+            "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "1800")),
+        },
+    }
+
+# Database aliases that hold todo.Task rows, split by owner (todo/sharding.py).
+# config/settings_sharded.py runs it locally with SQLite shards.
+TASK_SHARDS = ["default"]
+DATABASE_ROUTERS = ["todo.sharding.TaskShardRouter"]
+
 AUTH_USER_MODEL = "accounts.User"
 
+# Password hashing processes of the bulk registration endpoint
+# (accounts/bulk.py); 0 hashes in the request thread.
+BULK_REGISTER_WORKERS = int(os.getenv("BULK_REGISTER_WORKERS", "4"))
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Set REDIS_URL to share the cache between workers/processes; production
+# needs it, since the request throttles (core/throttling.py) keep their
+# buckets in the default cache.
+
+# "task_lists" holds cached tasks-list responses (todo/list_cache.py). With
+# Redis, bound it on the server with maxmemory and an allkeys-lru policy.
+
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        },
+        "task_lists": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+            "KEY_PREFIX": "task_lists",
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        },
+        "task_lists": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "task_lists",
+            "OPTIONS": {"MAX_ENTRIES": 2000, "CULL_FREQUENCY": 10},
+        },
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -148,6 +208,29 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # DRF / JWT
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
+        # sub-requests of POST /api/batch/ (core/batch.py)
+        "core.authentication.BatchAuthentication",
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
+    # Token buckets in the shared cache, see core/throttling.py
+    "DEFAULT_THROTTLE_CLASSES": ("core.throttling.UserRoleRateThrottle",),
+    "DEFAULT_THROTTLE_RATES": {
+        "user_read": os.getenv("THROTTLE_USER_READ", "300/min"),
+        "user_write": os.getenv("THROTTLE_USER_WRITE", "60/min"),
+        "anon_read": os.getenv("THROTTLE_ANON_READ", "60/min"),
+        "anon_write": os.getenv("THROTTLE_ANON_WRITE", "20/min"),
+        "role_employee_read": os.getenv("THROTTLE_EMPLOYEE_READ", "6000/min"),
+        "role_employee_write": os.getenv("THROTTLE_EMPLOYEE_WRITE", "1200/min"),
+    },
 }
+
+
+# E-mail
+EMAIL_BACKEND = os.getenv(
+    "EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend"
+)
+DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "todo@localhost")
+
+
+# Task change events, see todo/events.py. Served over SSE by config/asgi.py
+TODO_EVENT_BROKER = os.getenv("TODO_EVENT_BROKER", "todo.events.InMemoryBroker")
@@ -0,0 +1,19 @@
+"""
+Settings with todo.Task sharded over two SQLite databases, for running the
+sharding locally:
+
+    pytest todo/tests/test_sharding.py --ds=config.settings_sharded --no-cov
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+DATABASES = {
+    alias: {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / f"{alias}.sqlite3",
+    }
+    for alias in ("default", "shard_0", "shard_1")
+}
+
+TASK_SHARDS = ["shard_0", "shard_1"]
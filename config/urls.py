@@ -18,8 +18,13 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
+from core.batch import BatchView
+from core.db.views import DatabasePoolStatsView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("api/batch/", BatchView.as_view(), name="batch"),
+    path("api/db-pool-stats/", DatabasePoolStatsView.as_view(), name="db-pool-stats"),
     path("api/auth/", include("accounts.urls")),
     path("api/todo/", include("todo.urls")),
 ]
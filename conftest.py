@@ -0,0 +1,67 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from rest_framework.test import APIClient
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    The caches outlive the per-test database rollback; start every test
+    with empty ones so cached data never leaks between tests.
+    """
+    for cache in caches.all():
+        cache.clear()
+    yield
+    for cache in caches.all():
+        cache.clear()
+
+
+@pytest.fixture
+def create_user():
+    """
+    `create_user(username, user_type="employee", **fields)` creates a user
+    with the e-mail `<username>@example.com` and the password
+    "password12345".
+    """
+
+    def create(username, user_type="employee", **fields):
+        fields.setdefault("email", f"{username}@example.com")
+        return get_user_model().objects.create_user(
+            username=username,
+            password="password12345",
+            user_type=user_type,
+            **fields,
+        )
+
+    return create
+
+
+@pytest.fixture
+def create_users(create_user):
+    """
+    `create_users()` returns an admin and an employee.
+    """
+
+    def create():
+        admin = create_user("admin", "admin", first_name="Ayse", last_name="Kaya")
+        employee = create_user(
+            "employee", "employee", first_name="Ali", last_name="Veli"
+        )
+        return admin, employee
+
+    return create
+
+
+@pytest.fixture
+def get_client():
+    """
+    `get_client(user)` returns an API client authenticated as `user`.
+    """
+
+    def client_for(user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+
+    return client_for
@@ -0,0 +1,167 @@
+"""
+Small asyncio HTTP/1.1 client for outgoing requests (webhook deliveries).
+
+Only what the callers need: POST-style requests with a body, keep-alive
+connections reused per (scheme, host, port), at most `max_connections`
+requests in flight and a timeout per request. Response bodies are read so
+the connection can be reused, but not kept beyond `max_body_size`.
+"""
+
+import asyncio
+import ssl
+from collections import defaultdict, deque
+from urllib.parse import urlsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class HTTPError(Exception):
+    pass
+
+
+def _parse_int(value, base, what):
+    try:
+        number = int(value, base)
+    except ValueError:
+        number = -1
+    if number < 0:
+        raise HTTPError(f"Invalid {what}: {value!r}")
+    return number
+
+
+class AsyncHTTPClient:
+    def __init__(self, max_connections=10, timeout=10.0, max_body_size=64 * 1024):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.max_body_size = max_body_size
+        self._idle = defaultdict(deque)
+        self._semaphore = None
+        self._ssl_context = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def request(self, method, url, body=b"", headers=None):
+        """
+        Returns `(status, body)`. Raises HTTPError, OSError or
+        asyncio.TimeoutError when no response arrives.
+        """
+        if self._semaphore is None:
+            # created here so it belongs to the running event loop
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+
+        async with self._semaphore:
+            try:
+                return await asyncio.wait_for(
+                    self._request(method, url, body, headers or {}), self.timeout
+                )
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError) as exc:
+                raise HTTPError(f"Malformed response: {exc}") from exc
+
+    async def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+    async def _request(self, method, url, body, headers):
+        parts = urlsplit(url)
+        if parts.scheme not in DEFAULT_PORTS or not parts.hostname:
+            raise HTTPError(f"Unsupported URL: {url}")
+        key = (parts.scheme, parts.hostname, parts.port or DEFAULT_PORTS[parts.scheme])
+
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        head = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {parts.netloc}",
+            f"Content-Length: {len(body)}",
+            *(f"{name}: {value}" for name, value in headers.items()),
+        ]
+        message = ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+        while self._idle[key]:
+            # the server may have closed an idle connection meanwhile; only
+            # a request that got no response at all is sent again
+            connection = self._idle[key].pop()
+            try:
+                return await self._send(key, connection, message)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                continue
+
+        return await self._send(key, await self._connect(key), message)
+
+    async def _connect(self, key):
+        scheme, host, port = key
+        if scheme == "https" and self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+        return await asyncio.open_connection(
+            host, port, ssl=self._ssl_context if scheme == "https" else None
+        )
+
+    async def _send(self, key, connection, message):
+        reader, writer = connection
+        try:
+            writer.write(message)
+            await writer.drain()
+            status, keep_alive, body = await self._read_response(reader)
+        except BaseException:
+            writer.close()
+            raise
+
+        if keep_alive and len(self._idle[key]) < self.max_connections:
+            self._idle[key].append(connection)
+        else:
+            writer.close()
+        return status, body
+
+    async def _read_response(self, reader):
+        status_line = await reader.readuntil(b"\r\n")
+        try:
+            version, status = status_line.decode("latin-1").split(" ", 2)[:2]
+            status = int(status)
+        except ValueError:
+            raise HTTPError(f"Invalid status line: {status_line!r}") from None
+
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version == "HTTP/1.1"
+        if headers.get("connection", "").lower() == "close":
+            keep_alive = False
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = await self._read_chunked(reader)
+        elif "content-length" in headers:
+            length = _parse_int(headers["content-length"], 10, "Content-Length")
+            if length > self.max_body_size:
+                return status, False, b""
+            body = await reader.readexactly(length)
+        else:
+            body = await reader.read(self.max_body_size)
+            keep_alive = False
+
+        return status, keep_alive, body
+
+    async def _read_chunked(self, reader):
+        body = b""
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            size = _parse_int(line.split(b";")[0].strip(), 16, "chunk size")
+            if size == 0:
+                # trailers
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                return body
+            chunk = await reader.readexactly(size + 2)
+            if len(body) < self.max_body_size:
+                body += chunk[:-2]
@@ -0,0 +1,18 @@
+from rest_framework.authentication import BaseAuthentication
+
+
+class BatchAuthentication(BaseAuthentication):
+    """
+    Authenticates a batch sub-request as the user the batch request was
+    authenticated as; other requests are left to the next authenticators.
+    """
+
+    def authenticate(self, request):
+        return getattr(request._request, "batch_auth", None)
+
+    def authenticate_header(self, request):
+        # DRF only asks the first authenticator for the 401 challenge
+        for authenticator in request.authenticators:
+            if not isinstance(authenticator, BatchAuthentication):
+                return authenticator.authenticate_header(request)
+        return None
@@ -0,0 +1,179 @@
+"""
+POST /api/batch/ runs several API requests in one round trip:
+
+    {"requests": [
+        {"method": "GET", "path": "/api/todo/dashboard/"},
+        {"method": "POST", "path": "/api/todo/create-task/", "body": {...}}
+    ]}
+
+The batch request is authenticated once and the first configured
+authenticator, core.authentication.BatchAuthentication, hands its user to
+the sub-requests, which also carry the batch's headers (Authorization
+included). Every sub-request is dispatched straight to its view through the
+URL resolver (no middleware). Sub-requests run in order; consecutive GET/HEAD
+requests may run concurrently in threads, but only on PostgreSQL outside of
+a transaction, where each thread gets its own connection and sees the same
+committed data. A sub-request that raises gets a 500 entry of its own.
+"""
+
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connection, connections
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+# outer request headers that must not leak into the sub-requests
+PER_REQUEST_HEADERS = ("HTTP_IDEMPOTENCY_KEY", "HTTP_IF_MATCH")
+
+
+def _max_workers():
+    return getattr(settings, "BATCH_MAX_WORKERS", 4)
+
+
+def _can_run_concurrently():
+    return (
+        _max_workers() > 1
+        and connection.vendor == "postgresql"
+        and not connection.in_atomic_block
+    )
+
+
+class BatchView(APIView):
+    permission_classes = [IsAuthenticated]
+    max_requests = 20
+
+    def post(self, request, *args, **kwargs):
+        sub_requests = request.data.get("requests")
+        if not isinstance(sub_requests, list) or not sub_requests:
+            return Response(
+                {"detail": "requests must be a non-empty list."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(sub_requests) > self.max_requests:
+            return Response(
+                {"detail": f"At most {self.max_requests} requests are allowed."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        prepared = []
+        for index, item in enumerate(sub_requests):
+            try:
+                prepared.append(self._prepare(request, item))
+            except ValueError as exc:
+                return Response(
+                    {"detail": f"requests[{index}]: {exc}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        results = []
+        reads = []
+        for sub_request, match in prepared:
+            if sub_request.method in SAFE_METHODS:
+                reads.append((sub_request, match))
+                continue
+            results.extend(self._run_reads(reads))
+            reads = []
+            results.append(_dispatch(sub_request, match))
+        results.extend(self._run_reads(reads))
+
+        return Response(
+            {
+                "status": 200,
+                "message": "Batch processed successfully.",
+                "response": results,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    def _prepare(self, request, item):
+        if not isinstance(item, dict):
+            raise ValueError("must be an object.")
+
+        method = str(item.get("method", "GET")).upper()
+        url = urlsplit(str(item.get("path", "")))
+        try:
+            match = resolve(url.path)
+        except Resolver404:
+            match = None
+
+        if match is not None:
+            view_class = getattr(match.func, "cls", None)
+            if view_class is None or not issubclass(view_class, APIView):
+                raise ValueError("only API endpoints can be batched.")
+            if issubclass(view_class, BatchView):
+                raise ValueError("batches can't be nested.")
+
+        body = item.get("body")
+        payload = json.dumps(body).encode() if body is not None else b""
+
+        environ = {
+            key: value
+            for key, value in request.META.items()
+            if key not in PER_REQUEST_HEADERS
+        }
+        for header, value in (item.get("headers") or {}).items():
+            environ["HTTP_" + header.upper().replace("-", "_")] = str(value)
+        environ.update(
+            {
+                "REQUEST_METHOD": method,
+                "PATH_INFO": url.path,
+                "QUERY_STRING": url.query,
+                "CONTENT_TYPE": "application/json",
+                "CONTENT_LENGTH": str(len(payload)),
+                "wsgi.input": io.BytesIO(payload),
+            }
+        )
+
+        sub_request = WSGIRequest(environ)
+        # authenticated once, by this request (see BatchAuthentication)
+        sub_request.user = request._request.user
+        sub_request.batch_auth = (request.user, request.auth)
+        return sub_request, match
+
+    def _run_reads(self, reads):
+        if len(reads) < 2 or not _can_run_concurrently():
+            return [_dispatch(sub_request, match) for sub_request, match in reads]
+
+        with ThreadPoolExecutor(max_workers=min(len(reads), _max_workers())) as pool:
+            return list(pool.map(lambda read: _dispatch_in_thread(*read), reads))
+
+
+def _dispatch(sub_request, match):
+    if match is None:
+        return {"status": 404, "headers": {}, "body": {"detail": "Not found."}}
+
+    try:
+        response = match.func(sub_request, *match.args, **match.kwargs)
+    except Exception:
+        logger.exception(
+            "Batch sub-request %s %s failed", sub_request.method, sub_request.path
+        )
+        return {
+            "status": 500,
+            "headers": {},
+            "body": {"detail": "Internal server error."},
+        }
+    return {
+        "status": response.status_code,
+        "headers": dict(response.headers),
+        "body": response.data,
+    }
+
+
+def _dispatch_in_thread(sub_request, match):
+    try:
+        return _dispatch(sub_request, match)
+    finally:
+        # connections are per thread and nothing else closes these
+        connections.close_all()
@@ -0,0 +1,150 @@
+"""
+Two-tier read-through cache: a small in-process LRU in front of a Django
+cache that all processes share.
+
+Every key has a version stamp in the shared cache. Values are stored in the
+shared tier under the stamp, and local entries remember the stamp they were
+loaded with, so bumping it (`invalidate`) makes the value unreachable in
+both tiers of every process. A read costs one shared-cache GET of the stamp
+when the local tier has the value, and no database query in either case.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.db import transaction
+
+
+class LocalLRU:
+    """
+    Thread-safe LRU with a per-entry TTL.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TwoTierCache:
+    def __init__(
+        self, name, alias="default", local_maxsize=1024, local_ttl=30, timeout=300
+    ):
+        self.name = name
+        self.alias = alias
+        self.timeout = timeout
+        self.local = LocalLRU(local_maxsize, local_ttl)
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def _stamp_key(self, key):
+        return f"{self.name}:stamp:{key}"
+
+    def _stamp(self, key):
+        stamp_key = self._stamp_key(key)
+        stamp = self.shared.get(stamp_key)
+        if stamp is None:
+            # unique start value, so values stored under an evicted stamp
+            # are never served again
+            self.shared.add(stamp_key, time.time_ns(), None)
+            stamp = self.shared.get(stamp_key)
+        return stamp
+
+    def _count(self, stat):
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+    def get_or_load(self, key, loader):
+        """
+        Returns the cached value for `key`, calling `loader()` on a miss.
+        A loader result of None is returned but not cached.
+        """
+        stamp = self._stamp(key)
+
+        entry = self.local.get(key)
+        if entry is not None and entry[0] == stamp:
+            self._count("local_hits")
+            return entry[1]
+
+        shared_key = f"{self.name}:{key}:{stamp}"
+        value = self.shared.get(shared_key)
+        if value is not None:
+            self._count("shared_hits")
+        else:
+            self._count("misses")
+            value = loader()
+            if value is None:
+                return None
+            self.shared.set(shared_key, value, self.timeout)
+
+        self.local.set(key, (stamp, value))
+        return value
+
+    def invalidate(self, key):
+        """
+        Drops `key` in every process once the current transaction commits.
+        """
+
+        def bump():
+            self.local.delete(key)
+            stamp_key = self._stamp_key(key)
+            try:
+                self.shared.incr(stamp_key)
+            except ValueError:
+                self.shared.set(stamp_key, time.time_ns(), None)
+
+        self.local.delete(key)
+        transaction.on_commit(bump)
+
+    def stats(self):
+        """
+        Counters of this process since start (or reset_stats).
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = sum(stats.values())
+        hits = stats["local_hits"] + stats["shared_hits"]
+        stats["hit_ratio"] = hits / lookups if lookups else None
+        stats["local_size"] = len(self.local)
+        return stats
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats = {"local_hits": 0, "shared_hits": 0, "misses": 0}
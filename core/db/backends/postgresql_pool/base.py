@@ -0,0 +1,161 @@
+"""
+PostgreSQL (psycopg2) backend whose connections come from a per-process
+pool (core.db.pool) instead of being opened and closed for every request.
+
+    DATABASES = {
+        "default": {
+            "ENGINE": "core.db.backends.postgresql_pool",
+            ...,
+            "OPTIONS": {"pool": {"min_size": 2, "max_size": 20}},
+        }
+    }
+
+config/settings.py uses it with DB_POOL=True. Don't combine it with an
+external pooler such as PgBouncer in transaction mode.
+
+Leave CONN_MAX_AGE at 0: Django then "closes" the connection at the end of
+every request, which returns it to the pool, so idle threads (WSGI) and
+finished requests (ASGI) don't hold on to connections. The pool options are
+the keyword arguments of ConnectionPool; `pool_stats()` reports every pool
+of this process.
+
+A returned connection is rolled back and its session is cleared with
+`DISCARD ALL` (SET values, LISTEN, temporary tables, advisory locks), and the
+per-connection state Django sets up on connect (isolation level, jsonb
+loader) is set up again on every checkout.
+"""
+
+import threading
+from functools import partial
+
+import psycopg2.extras
+from django.db.backends.postgresql import base, creation
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from psycopg2 import extensions
+
+from core.db.pool import ConnectionPool, PoolTimeout
+
+Database = base.Database
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _check(conn):
+    return not conn.closed
+
+
+def _ping(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+        conn.rollback()
+
+
+def _reset(conn):
+    status = conn.get_transaction_status()
+    if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+        raise Database.InterfaceError("connection is in an unknown state")
+    if status != extensions.TRANSACTION_STATUS_IDLE:
+        conn.rollback()
+
+    # DISCARD ALL can't run in a transaction block
+    autocommit = conn.autocommit
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("DISCARD ALL")
+    finally:
+        conn.autocommit = autocommit
+    conn.notifies.clear()
+    conn.notices.clear()
+
+
+def get_pool(alias, conn_params, options):
+    # keyed by the connection parameters too: the test runner points the
+    # alias at another database
+    dbname = conn_params.get("dbname")
+    params = repr(sorted((name, repr(value)) for name, value in conn_params.items()))
+    key = (dbname, alias, params)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(
+                f"{alias}:{dbname}", check=_check, ping=_ping, reset=_reset, **options
+            )
+        return pool
+
+
+def close_pools(dbname=None):
+    """
+    Closes the idle connections of every pool, or of the pools for `dbname`.
+    """
+    with _pools_lock:
+        pools = [pool for key, pool in _pools.items() if dbname in (None, key[0])]
+    for pool in pools:
+        pool.close()
+
+
+def pool_stats():
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    # DROP DATABASE and CREATE DATABASE ... TEMPLATE fail while connections
+    # to the database are open, idle pooled ones included
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        close_pools(test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+    def _clone_test_db(self, suffix, verbosity, keepdb=False):
+        self.connection.close()
+        close_pools(self.connection.settings_dict["NAME"])
+        super()._clone_test_db(suffix, verbosity, keepdb)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop("pool", None)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        options = self.settings_dict["OPTIONS"].get("pool") or {}
+        pool = get_pool(self.alias, conn_params, options)
+        try:
+            connection = pool.getconn(partial(super().get_new_connection, conn_params))
+        except PoolTimeout as exc:
+            raise Database.OperationalError(str(exc)) from exc
+        self._pool = pool
+        self._configure_connection(connection)
+        return connection
+
+    def _configure_connection(self, connection):
+        # what base.DatabaseWrapper.get_new_connection does after connecting;
+        # a reused connection skips that and this wrapper may be new (another
+        # thread), so it's repeated on every checkout
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+        if isolation_level is None:
+            self.isolation_level = IsolationLevel.READ_COMMITTED
+        else:
+            self.isolation_level = IsolationLevel(isolation_level)
+            connection.isolation_level = self.isolation_level
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            if self.in_atomic_block:
+                # Django keeps using this object until the atomic block
+                # ends, so it can't go back to the pool
+                self._pool.discard(self.connection)
+            else:
+                self._pool.putconn(self.connection)
@@ -0,0 +1,23 @@
+from django.contrib.postgres.indexes import OpClass
+from django.db.models import OrderBy
+from django.db.models.functions import Collate
+from django.db.models.indexes import IndexExpression
+
+
+class PatternOpClass(OpClass):
+    """
+    `OpClass` for indexes that must also build on SQLite (local and sharded
+    settings): the operator class is only emitted on PostgreSQL, other
+    databases index the bare expression.
+    """
+
+    def as_sql(self, compiler, connection, **extra_context):
+        if connection.vendor != "postgresql":
+            return compiler.compile(self.get_source_expressions()[0])
+        return super().as_sql(compiler, connection, **extra_context)
+
+
+def register_index_wrappers():
+    # index expressions look their wrappers up by exact type; same order as
+    # django.contrib.postgres registers them
+    IndexExpression.register_wrappers(OrderBy, OpClass, PatternOpClass, Collate)
@@ -0,0 +1,264 @@
+"""
+Thread-safe pool of DB-API connections, used by the
+core.db.backends.postgresql_pool database backend.
+
+Django keeps one connection per thread (or per async context under ASGI)
+and "closes" it at the end of every request when CONN_MAX_AGE is 0. The
+backend turns that close into a check-in here, so a request usually reuses
+an idle connection instead of paying for TCP + TLS + authentication.
+
+- `max_size` connections at most; checkouts beyond that wait up to
+  `timeout` seconds and then raise PoolTimeout.
+- `min_size` connections are opened on first use and kept open; idle
+  connections above it are closed after `max_idle` seconds.
+- connections are closed once they are older than `max_lifetime`, so
+  server-side memory and changed DNS/failovers are picked up.
+- on checkout, broken connections are replaced; connections that were
+  idle for `check_after` seconds or more are pinged first.
+
+The pool doesn't know how to talk to a database; the backend passes the
+connect function and the check / ping / reset / close hooks.
+"""
+
+import os
+import threading
+import time
+from collections import Counter, deque
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        name,
+        min_size=0,
+        max_size=10,
+        timeout=10,
+        max_lifetime=30 * 60,
+        max_idle=10 * 60,
+        check_after=30,
+        check=None,
+        ping=None,
+        reset=None,
+        close=None,
+    ):
+        self.name = name
+        self.min_size = min_size
+        self.max_size = max(max_size, 1)
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self._check = check or (lambda conn: True)
+        self._ping = ping or (lambda conn: None)
+        self._reset = reset or (lambda conn: None)
+        self._close = close or (lambda conn: conn.close())
+
+        self._cond = threading.Condition()
+        # (connection, returned_at) of idle connections, most recent last
+        self._idle = deque()
+        # id(connection) -> creation time, for every open connection
+        self._born = {}
+        # open + being opened
+        self._size = 0
+        self._stats = Counter()
+        self._pid = os.getpid()
+
+    # ===== CHECKOUT =====
+
+    def getconn(self, connect):
+        """
+        Returns an idle connection or one made with `connect()`.
+        """
+        self._after_fork()
+        entry = self._reserve()
+        try:
+            if entry is None:
+                conn = self._open(connect)
+            else:
+                conn, returned_at = entry
+                if not self._usable(conn, returned_at):
+                    self._discard(conn, release=False)
+                    conn = self._open(connect)
+        except BaseException:
+            self._release_slot()
+            raise
+
+        with self._cond:
+            self._stats["checkouts"] += 1
+        self._warm_up(connect)
+        return conn
+
+    def _reserve(self):
+        """
+        Takes an idle `(connection, returned_at)`, or a slot for a new
+        connection (None).
+        """
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        with self._cond:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"No connection available in pool '{self.name}' "
+                        f"after {self.timeout}s ({self.max_size} in use)."
+                    )
+                if not waited:
+                    self._stats["waits"] += 1
+                    waited = True
+                self._cond.wait(remaining)
+
+    def _open(self, connect):
+        conn = connect()
+        with self._cond:
+            self._born[id(conn)] = time.monotonic()
+            self._stats["connections_opened"] += 1
+        return conn
+
+    def _usable(self, conn, returned_at):
+        if self._expired(conn) or not self._check(conn):
+            return False
+        if time.monotonic() - returned_at < self.check_after:
+            return True
+        try:
+            self._ping(conn)
+        except Exception:
+            with self._cond:
+                self._stats["failed_health_checks"] += 1
+            return False
+        return True
+
+    def _warm_up(self, connect):
+        with self._cond:
+            missing = self.min_size - self._size
+            self._size += max(missing, 0)
+        for _ in range(missing):
+            try:
+                conn = self._open(connect)
+            except Exception:
+                self._release_slot()
+                continue
+            self._checkin(conn)
+
+    # ===== CHECKIN =====
+
+    def putconn(self, conn):
+        """
+        Returns a connection; it is reset (rolled back) or closed.
+        """
+        if self._pid != os.getpid():
+            return
+        if self._expired(conn) or not self._check(conn):
+            self._discard(conn)
+            return
+        try:
+            self._reset(conn)
+        except Exception:
+            self._discard(conn)
+            return
+        self._checkin(conn)
+
+    def discard(self, conn):
+        """
+        Closes a checked out connection instead of returning it.
+        """
+        if self._pid != os.getpid():
+            return
+        self._discard(conn)
+
+    def _checkin(self, conn):
+        now = time.monotonic()
+        with self._cond:
+            self._idle.append((conn, now))
+            self._cond.notify()
+        self._close_idle(now)
+
+    def _close_idle(self, now):
+        """
+        Closes the least recently used idle connections above min_size
+        that were idle for max_idle seconds.
+        """
+        stale = []
+        with self._cond:
+            while (
+                self._idle
+                and self._size - len(stale) > self.min_size
+                and now - self._idle[0][1] >= self.max_idle
+            ):
+                stale.append(self._idle.popleft()[0])
+        for conn in stale:
+            self._discard(conn)
+
+    def _discard(self, conn, release=True):
+        with self._cond:
+            self._born.pop(id(conn), None)
+            self._stats["connections_closed"] += 1
+        try:
+            self._close(conn)
+        except Exception:
+            pass
+        if release:
+            self._release_slot()
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _expired(self, conn):
+        born = self._born.get(id(conn))
+        return born is None or time.monotonic() - born >= self.max_lifetime
+
+    # ===== LIFECYCLE =====
+
+    def _after_fork(self):
+        # connections inherited from the parent process belong to it
+        if self._pid != os.getpid():
+            with self._cond:
+                self._idle.clear()
+                self._born.clear()
+                self._size = 0
+                self._pid = os.getpid()
+
+    def close(self):
+        """
+        Closes the idle connections, e.g. before dropping the database.
+        """
+        with self._cond:
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "name": self.name,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                **{
+                    stat: self._stats[stat]
+                    for stat in (
+                        "checkouts",
+                        "waits",
+                        "timeouts",
+                        "connections_opened",
+                        "connections_closed",
+                        "failed_health_checks",
+                    )
+                },
+            }
@@ -0,0 +1,26 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from accounts.permissions import IsAdminUser
+from core.db.backends.postgresql_pool.base import pool_stats
+
+
+class DatabasePoolStatsView(APIView):
+    """
+    Size and checkout / wait / timeout counters of the database connection
+    pools, for this process.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(
+            {
+                "status": 200,
+                "message": "Database pool stats retrieved successfully.",
+                "response": pool_stats(),
+            },
+            status=status.HTTP_200_OK,
+        )
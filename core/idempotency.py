@@ -0,0 +1,131 @@
+"""
+Idempotency-Key support for unsafe API requests.
+
+The first response for a (user, method, path, key) is stored in the cache for
+IDEMPOTENCY_KEY_TTL seconds and replayed for retries without running the view
+again. A retry that arrives while the first request is still running waits
+for its result instead of running in parallel. Reusing a key with a different
+payload is rejected.
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+# how long a retry waits for the in-flight request before giving up
+WAIT_TIMEOUT = 10
+WAIT_INTERVAL = 0.05
+
+
+def _ttl():
+    return getattr(settings, "IDEMPOTENCY_KEY_TTL", 24 * 60 * 60)
+
+
+def _lock_timeout():
+    return getattr(settings, "IDEMPOTENCY_LOCK_TIMEOUT", 60)
+
+
+def idempotency_cache_key(user_id, method, path, key):
+    raw = f"{user_id}|{method}|{path}|{key}".encode()
+    return f"idempotency:{hashlib.sha256(raw).hexdigest()}"
+
+
+def _fingerprint(request):
+    content_type = request.META.get("CONTENT_TYPE", "")
+    if content_type.startswith("multipart/"):
+        # don't read uploads into memory just to hash them
+        body = request.META.get("CONTENT_LENGTH", "").encode()
+    else:
+        body = request.body
+    return hashlib.sha256(body).hexdigest()
+
+
+def _replay(stored, fingerprint):
+    if stored["fingerprint"] != fingerprint:
+        return Response(
+            {"detail": f"{HEADER} was already used with a different payload."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+
+    response = Response(stored["data"], status=stored["status"])
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _wait_for(cache_key):
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        stored = cache.get(cache_key)
+        if stored is not None:
+            return stored
+    return None
+
+
+def idempotent(view_method):
+    """
+    Decorator for APIView handler methods (post/patch/...).
+    Requests without the header are not affected.
+    """
+
+    @wraps(view_method)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view_method(view, request, *args, **kwargs)
+
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {"detail": f"{HEADER} must be at most {MAX_KEY_LENGTH} characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        user_id = request.user.pk if request.user.is_authenticated else "anon"
+        cache_key = idempotency_cache_key(user_id, request.method, request.path, key)
+        lock_key = f"{cache_key}:lock"
+        fingerprint = _fingerprint(request)
+
+        stored = cache.get(cache_key)
+        if stored is not None:
+            return _replay(stored, fingerprint)
+
+        if not cache.add(lock_key, 1, _lock_timeout()):
+            stored = _wait_for(cache_key)
+            if stored is not None:
+                return _replay(stored, fingerprint)
+            return Response(
+                {"detail": f"A request with this {HEADER} is still in progress."},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        try:
+            # the first request may have finished between get() and add()
+            stored = cache.get(cache_key)
+            if stored is not None:
+                return _replay(stored, fingerprint)
+
+            response = view_method(view, request, *args, **kwargs)
+
+            if response.status_code < 500:
+                cache.set(
+                    cache_key,
+                    {
+                        "fingerprint": fingerprint,
+                        "status": response.status_code,
+                        "data": response.data,
+                    },
+                    _ttl(),
+                )
+            return response
+        finally:
+            cache.delete(lock_key)
+
+    return wrapper
@@ -0,0 +1,202 @@
+"""
+Token-bucket request throttling shared by all API workers.
+
+Every request passes through two buckets, one keyed on the user (or the
+client IP when anonymous) and one keyed on the user's user_type, and each
+key has separate buckets for reads (safe methods) and writes. Rates use the
+DRF "<requests>/<period>" syntax in REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]:
+the number of requests is the bucket size and the bucket refills at
+requests/period. A scope without a configured rate is not throttled.
+
+All buckets of a request are checked before any of them is charged, so a
+request rejected by the role bucket doesn't use up the user's tokens.
+
+The buckets live in the default cache, which must be shared by all workers
+(Redis or Memcached); with the per-process locmem cache every process
+enforces the limits on its own. A bucket is stored as a single "theoretical
+arrival time" (GCRA, which is equivalent to a token bucket). With Redis the
+buckets are checked and updated by one Lua script. The generic cache API has
+no compare-and-set, so on other backends a request holds a short lock on
+each of its buckets (cache.add()) while it reads and writes them.
+"""
+
+import math
+import secrets
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+# seconds after which the lock of a worker that died holding it expires
+LOCK_TIMEOUT = 1
+
+# KEYS = buckets, ARGV = interval, period (seconds) of each bucket in turn
+# returns the seconds to wait, "0" if the request is allowed
+TOKEN_BUCKET_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local wait = 0
+local tats = {}
+for i, key in ipairs(KEYS) do
+    local interval = tonumber(ARGV[2 * i - 1])
+    local period = tonumber(ARGV[2 * i])
+    local tat = tonumber(redis.call('GET', key) or now)
+    if tat < now then tat = now end
+    tats[i] = tat + interval
+    wait = math.max(wait, tats[i] - period - now)
+end
+if wait > 0 then return tostring(wait) end
+for i, key in ipairs(KEYS) do
+    redis.call('SET', key, tostring(tats[i]), 'PX', math.ceil((tats[i] - now) * 1000))
+end
+return '0'
+"""
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """
+    "100/min" -> (100, 60). The period is matched on its first letter like
+    DRF does, so "s", "sec", "m", "min", "hour" and "day" all work.
+    """
+    num, period = rate.split("/")
+    return int(num), PERIODS[period[0]]
+
+
+def _redis_client():
+    # django.core.cache.backends.redis.RedisCache
+    get_client = getattr(getattr(cache, "_cache", None), "get_client", None)
+    if get_client is None:
+        return None
+    return get_client(write=True)
+
+
+@contextmanager
+def _locked(keys):
+    """
+    Holds "<key>:lock" for each key. Locks are taken in sorted order, so two
+    requests never wait for each other's.
+    """
+    token = secrets.token_hex(8)
+    locks = [f"{key}:lock" for key in sorted(keys)]
+    try:
+        for lock in locks:
+            while not cache.add(lock, token, LOCK_TIMEOUT):
+                time.sleep(0.001)
+        yield
+    finally:
+        for lock in locks:
+            # not when it expired and another worker holds it now
+            if cache.get(lock) == token:
+                cache.delete(lock)
+
+
+def _take_from_cache(buckets):
+    now = time.time()
+    keys = [key for key, _, _ in buckets]
+
+    with _locked(keys):
+        tats = cache.get_many(keys)
+        wait = 0
+        new_tats = {}
+        for key, num, period in buckets:
+            tat = max(tats.get(key, now), now) + period / num
+            new_tats[key] = tat
+            wait = max(wait, tat - period - now)
+        if wait > 0:
+            return wait
+
+        for key, tat in new_tats.items():
+            cache.set(key, tat, math.ceil(tat - now))
+    return 0
+
+
+def take_tokens(buckets):
+    """
+    Takes a token from each `(key, num, period)` bucket, holding `num`
+    tokens and refilling every `period` seconds, or from none of them.
+    Returns 0 if allowed, otherwise the seconds until a token is available.
+    """
+    if not buckets:
+        return 0
+    client = _redis_client()
+
+    if client is not None:
+        script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        keys = [cache.make_and_validate_key(key) for key, _, _ in buckets]
+        args = [value for _, num, period in buckets for value in (period / num, period)]
+        return float(script(keys=keys, args=args))
+
+    return _take_from_cache(buckets)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Base class; subclasses return the `(bucket name, rate scope)` pairs for
+    the request from get_buckets().
+    """
+
+    def get_buckets(self, request, kind):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        kind = "read" if request.method in SAFE_METHODS else "write"
+
+        buckets = []
+        for name, scope in self.get_buckets(request, kind):
+            rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+            if rate is not None:
+                buckets.append((f"throttle:{name}:{kind}", *parse_rate(rate)))
+
+        wait = take_tokens(buckets)
+        if wait:
+            self.wait_seconds = wait
+            return False
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UserRateThrottle(TokenBucketThrottle):
+    """
+    One bucket per user, scopes "user_read"/"user_write". Anonymous requests
+    are keyed on the client IP with "anon_read"/"anon_write".
+    """
+
+    def get_buckets(self, request, kind):
+        if request.user and request.user.is_authenticated:
+            return [(f"user:{request.user.pk}", f"user_{kind}")]
+        return [(f"anon:{self.get_ident(request)}", f"anon_{kind}")]
+
+
+class RoleRateThrottle(TokenBucketThrottle):
+    """
+    One bucket shared by all users of a user_type, scopes
+    "role_<user_type>_read"/"role_<user_type>_write" (spaces in the user_type
+    become underscores, e.g. "role_todo_admin_write").
+    """
+
+    def get_buckets(self, request, kind):
+        if not (request.user and request.user.is_authenticated):
+            return []
+        role = request.user.user_type.replace(" ", "_")
+        return [(f"role:{role}", f"role_{role}_{kind}")]
+
+
+class UserRoleRateThrottle(UserRateThrottle, RoleRateThrottle):
+    """
+    The user and role buckets together: a request is only charged when
+    both have a token.
+    """
+
+    def get_buckets(self, request, kind):
+        buckets = UserRateThrottle.get_buckets(self, request, kind)
+        return buckets + RoleRateThrottle.get_buckets(self, request, kind)
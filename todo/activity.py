@@ -0,0 +1,93 @@
+"""
+Batched writer for the task activity log (todo.TaskActivity).
+
+Task events (todo/signals.py) are sent inside the transaction that changes
+the task. `shard_atomic` opens an `activity_batch` around that transaction:
+the entries recorded in it are written with one `bulk_create` when the block
+ends, before the transaction commits. A change and its history therefore
+commit or roll back together, and a request that sends several events
+inserts them at once.
+
+Outside a batch an entry is inserted right away.
+"""
+
+import threading
+from contextlib import contextmanager
+
+from django.utils import timezone
+
+_local = threading.local()
+
+
+def _batches():
+    batches = getattr(_local, "batches", None)
+    if batches is None:
+        batches = _local.batches = []
+    return batches
+
+
+def _write(entries):
+    # todo.models imports todo.sharding, which opens the batches
+    from .models import TaskActivity
+
+    TaskActivity.objects.bulk_create(entries)
+
+
+@contextmanager
+def activity_batch():
+    """
+    Collects the entries recorded in the block and writes them when it ends
+    without an error. Nested batches hand their entries to the outer one.
+    """
+    batches = _batches()
+    entries = []
+    batches.append(entries)
+    try:
+        yield
+    finally:
+        batches.pop()
+
+    if not entries:
+        return
+    if batches:
+        batches[-1].extend(entries)
+    else:
+        _write(entries)
+
+
+def record_activity(task, event, actor, details=None):
+    from .models import TaskActivity
+
+    entry = TaskActivity(
+        task_id=task.id,
+        actor_id=actor.id if actor is not None else None,
+        event=event,
+        details=details or {},
+        created_at=timezone.now(),
+    )
+
+    _add([entry])
+
+
+def record_removals(event, removals):
+    """
+    Entries without an actor for tasks changed in bulk (offboarding), from
+    `(task_id, details)` pairs. The sync API turns them into tombstones.
+    """
+    from .models import TaskActivity
+
+    now = timezone.now()
+    _add(
+        [
+            TaskActivity(task_id=task_id, event=event, details=details, created_at=now)
+            for task_id, details in removals
+        ]
+    )
+
+
+def _add(entries):
+    batches = _batches()
+    if batches:
+        batches[-1].extend(entries)
+    else:
+        _write(entries)
@@ -0,0 +1,84 @@
+"""
+Per-user task counters stored on accounts.User.
+
+Every write path takes a `counter_snapshot` of the task before changing it
+and calls `update_counters(before, task)` inside the same transaction. Only
+the difference is written, as `F()` increments, so concurrent requests never
+overwrite each other's changes.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F, Q
+
+from accounts.models import User
+
+from .models import ACTIVE_TASK_STATUSES
+
+OPEN = "open_assigned_tasks_count"
+PENDING = "pending_approval_tasks_count"
+COMPLETED = "completed_tasks_count"
+OVERDUE = "overdue_tasks_count"
+
+COUNTER_FIELDS = (OPEN, PENDING, COMPLETED, OVERDUE)
+
+# Same definitions as counter_snapshot, for aggregating over Task rows
+# (see the reconcile_task_counters command).
+COUNTER_AGGREGATES = {
+    OPEN: Count("id", filter=Q(status__in=ACTIVE_TASK_STATUSES)),
+    PENDING: Count("id", filter=Q(status="pending_approval")),
+    COMPLETED: Count("id", filter=Q(status="completed")),
+    OVERDUE: Count("id", filter=Q(status__in=ACTIVE_TASK_STATUSES, is_overdue=True)),
+}
+
+
+def counter_snapshot(task):
+    """
+    `(assigned_user_id, counter fields the task contributes to)`, or None
+    when the task is not counted for anybody.
+    """
+    if task is None or task.assigned_user_id is None or task.is_deleted:
+        return None
+
+    if task.is_completed:
+        return task.assigned_user_id, frozenset([COMPLETED])
+
+    fields = {OPEN}
+    if task.complete_requested:
+        fields.add(PENDING)
+    if task.is_overdue:
+        fields.add(OVERDUE)
+    return task.assigned_user_id, frozenset(fields)
+
+
+def apply_counter_deltas(deltas):
+    """
+    `deltas` maps user id -> {counter field: increment}.
+    """
+    for user_id, changes in deltas.items():
+        updates = {field: F(field) + n for field, n in changes.items() if n}
+        if updates:
+            User.objects.filter(id=user_id).update(**updates)
+
+
+def update_counters(before, task):
+    """
+    `before` is the counter_snapshot taken before the task was changed
+    (None for new tasks); `task` is the task after the change (None when it
+    was removed).
+    """
+    after = counter_snapshot(task)
+    if before == after:
+        return
+
+    deltas = defaultdict(Counter)
+    if before is not None:
+        user_id, fields = before
+        for field in fields:
+            deltas[user_id][field] -= 1
+    if after is not None:
+        user_id, fields = after
+        for field in fields:
+            deltas[user_id][field] += 1
+
+    apply_counter_deltas(deltas)
@@ -0,0 +1,26 @@
+import base64
+import json
+
+
+def encode_cursor(*values):
+    """
+    Opaque keyset cursor for the given values (JSON-serializable).
+    """
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, size):
+    """
+    Reverses encode_cursor. Raises ValueError for malformed cursors.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor.") from exc
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor.")
+
+    return values
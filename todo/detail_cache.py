@@ -0,0 +1,54 @@
+"""
+Read-through cache for `task-detail/<id>` payloads (core.cache.TwoTierCache).
+
+Task saves, deletes and task events invalidate a task's entry (see
+todo/signals.py), as does the scheduler when it marks tasks overdue, since
+that bumps their version. Owner name changes show up after the shared
+timeout.
+"""
+
+from core.cache import TwoTierCache
+
+from .models import VISIBLE_TASK_STATUSES, Task
+
+task_detail_cache = TwoTierCache(
+    "task-detail", local_maxsize=2048, local_ttl=30, timeout=5 * 60
+)
+
+
+def task_detail_data(task):
+    return {
+        "id": task.id,
+        "title": task.title,
+        "description": task.description,
+        "due_date": task.due_date,
+        "is_completed": task.is_completed,
+        "is_deleted": task.is_deleted,
+        "version": task.version,
+        "created_at": task.created_at,
+        "task_owner": f"{task.owner.first_name} {task.owner.last_name}",
+    }
+
+
+def get_task_detail(task_id):
+    """
+    `{"owner_id": ..., "data": task_detail_data(task)}` for a visible task,
+    None if there is none. The caller checks the owner.
+    """
+
+    def load():
+        task = (
+            Task.objects.for_id(task_id)
+            .with_users("owner")
+            .filter(id=task_id, status__in=VISIBLE_TASK_STATUSES)
+            .first()
+        )
+        if task is None:
+            return None
+        return {"owner_id": task.owner_id, "data": task_detail_data(task)}
+
+    return task_detail_cache.get_or_load(task_id, load)
+
+
+def invalidate_task_detail(task_id):
+    task_detail_cache.invalidate(task_id)
@@ -0,0 +1,112 @@
+"""
+In-process publish/subscribe for task change events.
+
+Views publish through ``get_broker().publish`` after commit and the SSE
+endpoint in todo/sse.py subscribes per connected user. The backend is chosen
+with the ``TODO_EVENT_BROKER`` setting; ``InMemoryBroker`` only reaches clients
+connected to the same process, a shared backend (Redis, PostgreSQL
+LISTEN/NOTIFY, ...) can be plugged in by subclassing ``BaseBroker``.
+"""
+
+import asyncio
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+DEFAULT_BROKER = "todo.events.InMemoryBroker"
+
+
+class Subscription:
+    """
+    One connected client. Events are delivered to the event loop the
+    subscription was created on, so publishing is safe from any thread.
+    """
+
+    def __init__(self, broker, user_id, max_queue_size=100):
+        self.broker = broker
+        self.user_id = user_id
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=max_queue_size)
+
+    def _put(self, event):
+        if self._queue.full():
+            # slow client: drop the oldest event rather than grow unbounded
+            self._queue.get_nowait()
+        self._queue.put_nowait(event)
+
+    def deliver(self, event):
+        self._loop.call_soon_threadsafe(self._put, event)
+
+    async def get(self):
+        return await self._queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class BaseBroker:
+    def subscribe(self, user_id):
+        """
+        Must be called from a running event loop. Returns a Subscription.
+        """
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+    def publish(self, user_ids, event):
+        """
+        Sends `event` (a JSON-serializable dict) to every subscription of the
+        given users. Can be called from sync code in any thread.
+        """
+        raise NotImplementedError
+
+
+class InMemoryBroker(BaseBroker):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+
+    def subscribe(self, user_id):
+        subscription = Subscription(self, user_id)
+        with self._lock:
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.user_id]
+
+    def publish(self, user_ids, event):
+        with self._lock:
+            targets = [
+                subscription
+                for user_id in user_ids
+                for subscription in self._subscriptions.get(user_id, ())
+            ]
+
+        for subscription in targets:
+            try:
+                subscription.deliver(event)
+            except RuntimeError:
+                # the subscriber's event loop is already closed
+                self.unsubscribe(subscription)
+
+        return len(targets)
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subs) for subs in self._subscriptions.values())
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    path = getattr(settings, "TODO_EVENT_BROKER", DEFAULT_BROKER)
+    return import_string(path)()
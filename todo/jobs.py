@@ -0,0 +1,153 @@
+"""
+Lightweight database-backed job queue.
+
+Jobs are rows in ``todo.Job``. ``enqueue`` is called inside the transaction
+that makes the state change, so a job exists if and only if the change was
+committed. The ``run_jobs`` command claims queued jobs in batches with
+``SELECT ... FOR UPDATE SKIP LOCKED``, so several workers never pick the same
+job, and failed jobs are retried with exponential backoff.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 60 * 60
+
+# A running job whose worker died is queued again after this long. Jobs that
+# can run longer register their own lock_timeout.
+LOCK_TIMEOUT = timedelta(minutes=10)
+
+_registry = {}
+_lock_timeouts = {}
+
+
+def register(name, lock_timeout=LOCK_TIMEOUT):
+    """
+    Registers a function as the handler of the given job name. The handler is
+    called with the job payload as keyword arguments. `lock_timeout` must be
+    longer than the longest run of the job.
+    """
+
+    def decorator(func):
+        _registry[name] = func
+        _lock_timeouts[name] = lock_timeout
+        return func
+
+    return decorator
+
+
+def enqueue(name, payload=None, run_at=None, max_attempts=5):
+    if name not in _registry:
+        raise ValueError(f"Unknown job: {name}")
+
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts,
+    )
+
+
+def backoff_delay(attempts):
+    seconds = BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, BACKOFF_MAX_SECONDS))
+
+
+def requeue_stale_jobs(now=None):
+    """
+    Queues running jobs whose worker died again, or marks them failed when
+    they used up their attempts. Returns how many jobs were released.
+    """
+    now = now or timezone.now()
+    custom = {
+        name: timeout
+        for name, timeout in _lock_timeouts.items()
+        if timeout != LOCK_TIMEOUT
+    }
+    stale = Q(locked_at__lt=now - LOCK_TIMEOUT) & ~Q(name__in=custom)
+    for name, timeout in custom.items():
+        stale |= Q(name=name, locked_at__lt=now - timeout)
+
+    jobs = Job.objects.filter(stale, status="running")
+    error = "Lock timed out; the worker stopped while running the job."
+    failed = jobs.filter(attempts__gte=F("max_attempts")).update(
+        status="failed", locked_at=None, last_error=error
+    )
+    requeued = jobs.update(status="queued", locked_at=None, last_error=error)
+    return failed + requeued
+
+
+def claim_jobs(batch_size=50, now=None):
+    now = now or timezone.now()
+
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status="queued", run_at__lte=now)
+            .order_by("run_at", "id")[:batch_size]
+        )
+        if not jobs:
+            return []
+
+        Job.objects.filter(id__in=[job.id for job in jobs]).update(
+            status="running", locked_at=now, attempts=F("attempts") + 1
+        )
+
+    for job in jobs:
+        job.status = "running"
+        job.locked_at = now
+        job.attempts += 1
+
+    return jobs
+
+
+def run_job(job, now=None):
+    """
+    Runs a claimed job. Returns True when the job succeeded.
+    """
+    handler = _registry.get(job.name)
+
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job '{job.name}'.")
+        handler(**job.payload)
+    except Exception as exc:
+        now = now or timezone.now()
+        logger.exception("Job %s (%s) failed", job.id, job.name)
+
+        job.last_error = f"{type(exc).__name__}: {exc}"
+        job.locked_at = None
+        if job.attempts >= job.max_attempts:
+            job.status = "failed"
+        else:
+            job.status = "queued"
+            job.run_at = now + backoff_delay(job.attempts)
+        job.save(update_fields=["status", "run_at", "locked_at", "last_error"])
+        return False
+
+    job.delete()
+    return True
+
+
+def run_pending_jobs(batch_size=50, now=None):
+    """
+    Claims and runs one batch. Returns `(succeeded, failed)`.
+    """
+    succeeded = failed = 0
+
+    for job in claim_jobs(batch_size=batch_size, now=now):
+        if run_job(job, now=now):
+            succeeded += 1
+        else:
+            failed += 1
+
+    return succeeded, failed
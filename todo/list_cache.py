@@ -0,0 +1,97 @@
+"""
+Cached `tasks-list` responses.
+
+Entries are keyed by user, the normalized query params and the user's task
+generation. Any change to a task bumps the generation of its owner and
+assignee (see the receivers in todo/signals.py), which makes every cached
+list of theirs unreachable at once without scanning keys. Admins see every
+task, so their lists use the global generation that every change bumps.
+
+Entries live in the "task_lists" cache: a locmem cache with MAX_ENTRIES
+(LRU culling) by default, Redis when REDIS_URL is set (run it with an
+allkeys-lru maxmemory policy to bound it).
+"""
+
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+
+CACHE_ALIAS = "task_lists"
+LIST_TIMEOUT = 5 * 60
+
+# query params that change the result, see TasksListView
+PARAMS = ("is_completed", "due_date_start", "due_date_end", "limit")
+
+ALL_TASKS = "all"
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _generation_key(scope):
+    return f"task-generation:{scope}"
+
+
+def get_task_generation(scope):
+    """
+    `scope` is a user id or ALL_TASKS.
+    """
+    key = _generation_key(scope)
+    generation = _cache().get(key)
+    if generation is None:
+        # unique start value, like the employee directory version: lists
+        # cached under an evicted generation can never be served again
+        _cache().add(key, time.time_ns(), None)
+        generation = _cache().get(key)
+    return generation
+
+
+def bump_task_generations(user_ids):
+    """
+    Invalidates the cached lists of `user_ids` and of the admins, once the
+    current transaction commits (a list cached before that would otherwise
+    be stored under the new generation with the old data).
+    """
+    scopes = {ALL_TASKS, *(user_id for user_id in user_ids if user_id is not None)}
+
+    def bump():
+        for scope in scopes:
+            try:
+                _cache().incr(_generation_key(scope))
+            except ValueError:
+                _cache().set(_generation_key(scope), time.time_ns(), None)
+
+    transaction.on_commit(bump)
+
+
+def _normalize(name, value):
+    value = value.strip()
+    if name == "is_completed":
+        value = value.lower()
+        if value in ("true", "1", "yes"):
+            return "true"
+        if value in ("false", "0", "no"):
+            return "false"
+    return value
+
+
+def task_list_cache_key(user, query_params):
+    scope = ALL_TASKS if user.user_type == "admin" else user.id
+    params = "&".join(
+        f"{name}={_normalize(name, query_params[name])}"
+        for name in PARAMS
+        if query_params.get(name)
+    )
+    digest = hashlib.md5(params.encode()).hexdigest()
+    return f"task-list:{user.id}:{get_task_generation(scope)}:{digest}"
+
+
+def get_cached_task_list(key):
+    return _cache().get(key)
+
+
+def cache_task_list(key, data):
+    _cache().set(key, data, LIST_TIMEOUT)
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from todo.models import RollupWatermark
+from todo.rollups import BACKFILL_WATERMARK, backfill_chunk
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills the daily task rollups for tasks that existed before the rollup "
+        "table, in small chunks that are safe to run on a live database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.0,
+            help="Seconds to pause between chunks to limit load.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            covered = backfill_chunk(chunk_size=options["chunk_size"])
+            if not covered:
+                break
+
+            watermark = RollupWatermark.objects.get(name=BACKFILL_WATERMARK)
+            self.stdout.write(
+                f"Backfilled task ids up to {watermark.position}/{watermark.until_id}."
+            )
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS("Task rollup backfill complete."))
@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from accounts.models import User
+from todo.models import Offboarding
+from todo.offboarding import (
+    BATCH_SIZE,
+    deactivate_user,
+    finish_offboarding,
+    purge_user,
+    reassign_open_tasks,
+    record_progress,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Offboards a user: hands their active tasks to another user, then "
+        "deletes their tasks and the user in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("user_id", type=int)
+        parser.add_argument(
+            "--reassign-to",
+            type=int,
+            help="User who takes over the active tasks assigned to the user.",
+        )
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(id=options["user_id"]).first()
+        if user is None:
+            raise CommandError(f"User {options['user_id']} does not exist.")
+
+        reassign_to_id = options["reassign_to"]
+        if reassign_to_id is not None and (
+            reassign_to_id == user.id
+            or not User.objects.filter(
+                id=reassign_to_id, is_active=True, is_deleted=False
+            ).exists()
+        ):
+            raise CommandError("--reassign-to must be another active user.")
+
+        totals = {}
+
+        with transaction.atomic():
+            deactivate_user(user)
+            offboarding = Offboarding.objects.create(user_id=user.id)
+            record = record_progress(offboarding.id)
+
+            def progress(stage, count):
+                record(stage, count)
+                totals[stage] = totals.get(stage, 0) + count
+                self.stdout.write(f"{totals[stage]} task(s) {stage}")
+
+            reassigned = 0
+            if reassign_to_id is not None:
+                reassigned = reassign_open_tasks(user.id, reassign_to_id, progress)
+
+        result = purge_user(user.id, options["batch_size"], progress)
+        finish_offboarding(offboarding.id)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"User {user.id} offboarded: {reassigned} task(s) reassigned, "
+                f"{result['deleted']} deleted, {result['unassigned']} unassigned."
+            )
+        )
@@ -0,0 +1,84 @@
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import User
+from todo.counters import COUNTER_AGGREGATES, COUNTER_FIELDS
+from todo.models import VISIBLE_TASK_STATUSES, Task
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the per-user task counters from the task table in batches "
+        "and fixes the ones that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report mismatches, do not write anything.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        check_only = options["check"]
+
+        checked = mismatched = 0
+        last_id = 0
+
+        while True:
+            with transaction.atomic():
+                # locking the users makes concurrent F() increments wait, so
+                # the counts below and the stored values match up
+                users = list(
+                    User.objects.select_for_update()
+                    .filter(id__gt=last_id)
+                    .order_by("id")
+                    .only("id", *COUNTER_FIELDS)[:batch_size]
+                )
+                if not users:
+                    break
+                last_id = users[-1].id
+
+                # assigned tasks can be on any shard
+                actual = defaultdict(Counter)
+                for tasks in Task.objects.per_shard():
+                    rows = (
+                        tasks.filter(
+                            assigned_user_id__in=[user.id for user in users],
+                            status__in=VISIBLE_TASK_STATUSES,
+                        )
+                        .values("assigned_user_id")
+                        .annotate(**COUNTER_AGGREGATES)
+                    )
+                    for row in rows:
+                        actual[row.pop("assigned_user_id")].update(row)
+
+                drifted = []
+                for user in users:
+                    row = actual.get(user.id, {})
+                    expected = {field: row.get(field, 0) for field in COUNTER_FIELDS}
+                    stored = {field: getattr(user, field) for field in COUNTER_FIELDS}
+                    if expected != stored:
+                        self.stdout.write(
+                            f"User {user.id}: stored {stored}, expected {expected}"
+                        )
+                        for field, value in expected.items():
+                            setattr(user, field, value)
+                        drifted.append(user)
+
+                if drifted and not check_only:
+                    User.objects.bulk_update(drifted, COUNTER_FIELDS)
+
+            checked += len(users)
+            mismatched += len(drifted)
+
+        verb = "found" if check_only else "fixed"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Checked {checked} user(s), {verb} {mismatched} mismatch(es)."
+            )
+        )
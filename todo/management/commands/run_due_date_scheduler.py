@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from todo.scheduler import CHANGE_OVERLAP, DueDateScheduler
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends due-date reminders and marks tasks as overdue when their "
+        "deadline passes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lead-minutes",
+            type=int,
+            default=24 * 60,
+            help="How long before the deadline the reminder is sent.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--poll-interval",
+            type=int,
+            default=300,
+            help="Maximum seconds to sleep without checking for task changes.",
+        )
+        parser.add_argument(
+            "--change-overlap",
+            type=int,
+            default=int(CHANGE_OVERLAP.total_seconds()),
+            help=(
+                "Seconds of task changes to re-read on every poll; more than "
+                "the longest transaction that writes tasks."
+            ),
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Task shard to work on; run one worker per TASK_SHARDS entry.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process everything that is due now and exit.",
+        )
+
+    def handle(self, *args, **options):
+        scheduler = DueDateScheduler(
+            lead_time=timedelta(minutes=options["lead_minutes"]),
+            batch_size=options["batch_size"],
+            poll_interval=options["poll_interval"],
+            database=options["database"],
+            change_overlap=timedelta(seconds=options["change_overlap"]),
+        )
+        scheduler.start()
+
+        while True:
+            reminders_sent, marked_overdue = scheduler.run_pending()
+            if reminders_sent or marked_overdue:
+                self.stdout.write(
+                    f"{reminders_sent} reminder(s) sent, "
+                    f"{marked_overdue} task(s) marked overdue."
+                )
+
+            if options["once"]:
+                return
+
+            scheduler.wait(scheduler.seconds_until_next_run())
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from todo.jobs import requeue_stale_jobs, run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "Runs queued background jobs (e-mail notifications etc.)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=2.0,
+            help="Seconds to wait when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run the jobs that are due now and exit.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            requeue_stale_jobs()
+
+            succeeded = failed = 0
+            while True:
+                ok, failures = run_pending_jobs(batch_size=options["batch_size"])
+                succeeded += ok
+                failed += failures
+                if ok + failures < options["batch_size"]:
+                    break
+
+            if succeeded or failed:
+                self.stdout.write(f"{succeeded} job(s) done, {failed} failed.")
+
+            if options["once"]:
+                return
+
+            time.sleep(options["sleep"])
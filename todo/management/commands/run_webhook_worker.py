@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from todo.webhooks import deliver_pending
+
+
+class Command(BaseCommand):
+    help = "Delivers queued task events to the webhook subscriptions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--endpoints",
+            type=int,
+            default=50,
+            help="Endpoints served concurrently per round.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Events per endpoint and round.",
+        )
+        parser.add_argument(
+            "--max-connections",
+            type=int,
+            default=10,
+            help="Requests in flight at the same time.",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=10.0,
+            help="Seconds to wait for an endpoint to answer.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when nothing is due.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Deliver the events that are due now and exit.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            delivered = failed = 0
+            while True:
+                ok, failures = deliver_pending(
+                    max_endpoints=options["endpoints"],
+                    batch_size=options["batch_size"],
+                    max_connections=options["max_connections"],
+                    timeout=options["timeout"],
+                )
+                delivered += ok
+                failed += failures
+                if not ok:
+                    break
+
+            if delivered or failed:
+                self.stdout.write(
+                    f"{delivered} event(s) delivered, {failed} failed to deliver."
+                )
+
+            if options["once"]:
+                return
+
+            time.sleep(options["sleep"])
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.16 on 2026-10-19 08:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0004_task_reason_for_reject"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="is_overdue",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="reminder_sent_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(
+                    ("is_completed", False),
+                    ("is_deleted", False),
+                    ("is_overdue", False),
+                ),
+                fields=["due_date", "id"],
+                name="task_pending_due_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["updated_at"], name="task_updated_at_idx"),
+        ),
+    ]
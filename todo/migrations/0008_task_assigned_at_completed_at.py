@@ -0,0 +1,55 @@
+# Generated by Django 4.2.16 on 2026-10-19 08:23
+
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 10000
+
+
+def _batches(Task):
+    last = Task.objects.order_by("-id").values_list("id", flat=True).first() or 0
+    for start in range(0, last, BATCH_SIZE):
+        yield Task.objects.filter(id__gt=start, id__lte=start + BATCH_SIZE)
+
+
+def backfill_timestamps(apps, schema_editor):
+    # best available approximation for existing rows, one short transaction
+    # per batch of ids so large tables are never locked as a whole
+    Task = apps.get_model("todo", "Task")
+    for batch in _batches(Task):
+        with transaction.atomic():
+            batch.filter(assigned_user__isnull=False, assigned_at__isnull=True).update(
+                assigned_at=models.F("created_at")
+            )
+            batch.filter(is_completed=True, completed_at__isnull=True).update(
+                completed_at=models.F("updated_at")
+            )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("todo", "0007_task_updated_at_id_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="assigned_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="completed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["owner", "assigned_user"],
+                name="task_owner_assignee_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_timestamps, migrations.RunPython.noop),
+    ]
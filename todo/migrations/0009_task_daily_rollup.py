@@ -0,0 +1,85 @@
+# Generated by Django 4.2.16 on 2026-10-19 08:24
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_backfill_watermark(apps, schema_editor):
+    # Everything up to this point is backfilled by `backfill_task_rollups`,
+    # anything newer is counted live by the workflow views.
+    Task = apps.get_model("todo", "Task")
+    RollupWatermark = apps.get_model("todo", "RollupWatermark")
+
+    last = Task.objects.order_by("-id").values_list("id", flat=True).first()
+    RollupWatermark.objects.create(
+        name="task_rollups",
+        position=0,
+        until_id=last or 0,
+        until_time=django.utils.timezone.now(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("todo", "0008_task_assigned_at_completed_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RollupWatermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("position", models.BigIntegerField(default=0)),
+                ("until_id", models.BigIntegerField(default=0)),
+                ("until_time", models.DateTimeField(default=django.utils.timezone.now)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="TaskDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("created_count", models.PositiveIntegerField(default=0)),
+                ("completion_requested_count", models.PositiveIntegerField(default=0)),
+                ("approved_count", models.PositiveIntegerField(default=0)),
+                ("rejected_count", models.PositiveIntegerField(default=0)),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="task_daily_rollups",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="taskdailyrollup",
+            constraint=models.UniqueConstraint(
+                fields=("owner", "day"), name="task_daily_rollup_owner_day_uniq"
+            ),
+        ),
+        migrations.RunPython(create_backfill_watermark, migrations.RunPython.noop),
+    ]
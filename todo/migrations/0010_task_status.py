@@ -0,0 +1,34 @@
+# Generated by Django 4.2.16 on 2026-10-19 08:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0009_task_daily_rollup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("open", "Open"),
+                    ("pending_approval", "Pending approval"),
+                    ("completed", "Completed"),
+                    ("rejected", "Rejected"),
+                    ("deleted", "Deleted"),
+                ],
+                default="open",
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["owner", "status"], name="task_owner_status_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,49 @@
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 10000
+
+
+def _batches(Task):
+    last = Task.objects.order_by("-id").values_list("id", flat=True).first() or 0
+    for start in range(0, last, BATCH_SIZE):
+        yield Task.objects.filter(id__gt=start, id__lte=start + BATCH_SIZE)
+
+
+def backfill_status(apps, schema_editor):
+    # one short transaction per batch of ids so large tables are never locked
+    # as a whole
+    Task = apps.get_model("todo", "Task")
+    status = models.Case(
+        models.When(is_deleted=True, then=models.Value("deleted")),
+        models.When(is_completed=True, then=models.Value("completed")),
+        models.When(complete_requested=True, then=models.Value("pending_approval")),
+        models.When(reason_for_reject__isnull=False, then=models.Value("rejected")),
+        default=models.Value("open"),
+    )
+    for batch in _batches(Task):
+        with transaction.atomic():
+            batch.update(status=status)
+
+
+def restore_booleans(apps, schema_editor):
+    Task = apps.get_model("todo", "Task")
+    for batch in _batches(Task):
+        with transaction.atomic():
+            batch.update(
+                is_deleted=models.Q(status="deleted"),
+                is_completed=models.Q(status="completed")
+                | models.Q(status="deleted", completed_at__isnull=False),
+                complete_requested=models.Q(status="pending_approval"),
+            )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("todo", "0010_task_status"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_status, restore_booleans),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.16 on 2026-10-19 08:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0011_backfill_task_status"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="task",
+            name="task_pending_due_date_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="task",
+            name="task_owner_assignee_idx",
+        ),
+        migrations.RemoveField(
+            model_name="task",
+            name="complete_requested",
+        ),
+        migrations.RemoveField(
+            model_name="task",
+            name="is_completed",
+        ),
+        migrations.RemoveField(
+            model_name="task",
+            name="is_deleted",
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(
+                    ("is_overdue", False),
+                    ("status__in", ("open", "pending_approval", "rejected")),
+                ),
+                fields=["due_date", "id"],
+                name="task_pending_due_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(
+                    (
+                        "status__in",
+                        ("open", "pending_approval", "rejected", "completed"),
+                    )
+                ),
+                fields=["owner", "assigned_user"],
+                name="task_owner_assignee_idx",
+            ),
+        ),
+    ]
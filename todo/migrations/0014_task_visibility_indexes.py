@@ -0,0 +1,26 @@
+# Generated by Django 4.2.16 on 2026-10-19 08:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0013_task_version"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["owner", "-created_at"], name="task_owner_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["assigned_user", "-created_at"],
+                name="task_assignee_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,75 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from todo.sharding import is_sharded
+
+
+def remove_orphans(Task, User):
+    """
+    Applies on_delete to tasks whose users were deleted while the
+    constraints were missing. Returns `(deleted, unassigned)`.
+    `manage.py reconcile_task_counters` fixes the counters afterwards.
+    """
+    users = User.objects.values("id")
+    deleted, _ = Task.objects.exclude(owner_id__in=users).delete()
+    unassigned = (
+        Task.objects.filter(assigned_user__isnull=False)
+        .exclude(assigned_user_id__in=users)
+        .update(assigned_user=None)
+    )
+    return deleted, unassigned
+
+
+def remove_orphaned_tasks(apps, schema_editor):
+    if not is_sharded():
+        remove_orphans(
+            apps.get_model("todo", "Task"), apps.get_model(settings.AUTH_USER_MODEL)
+        )
+
+
+class AlterFieldUnlessSharded(migrations.AlterField):
+    """
+    0015 dropped the constraints for every install; they are only left out
+    where tasks and users can be in different databases.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if not is_sharded():
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if not is_sharded():
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("todo", "0018_offboarding"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_orphaned_tasks, migrations.RunPython.noop),
+        AlterFieldUnlessSharded(
+            model_name="task",
+            name="assigned_user",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="assigned_tasks",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        AlterFieldUnlessSharded(
+            model_name="task",
+            name="owner",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="user_tasks",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.16 on 2026-10-19 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0019_task_user_constraints"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="taskactivity",
+            index=models.Index(
+                condition=models.Q(("event__in", ["reassigned", "purged"])),
+                fields=["created_at", "id"],
+                name="task_activity_removal_idx",
+            ),
+        ),
+    ]
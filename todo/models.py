@@ -1,11 +1,67 @@
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, models, router
+from django.utils import timezone
 
 from accounts.models import User
 
+from . import sharding
+
+TASK_STATUS_CHOICES = (
+    ("open", "Open"),
+    ("pending_approval", "Pending approval"),
+    ("completed", "Completed"),
+    ("rejected", "Rejected"),
+    ("deleted", "Deleted"),
+)
+
+# not completed and not deleted
+ACTIVE_TASK_STATUSES = ("open", "pending_approval", "rejected")
+
+# everything but soft-deleted tasks
+VISIBLE_TASK_STATUSES = ACTIVE_TASK_STATUSES + ("completed",)
+
+
+class TaskQuerySet(models.QuerySet):
+    """
+    Shard selection for tasks, see todo/sharding.py. Without sharding every
+    method here queries the default database.
+    """
+
+    def for_owner(self, owner_id):
+        return self.using(sharding.shard_for_owner(owner_id))
+
+    def for_id(self, task_id):
+        return self.using(sharding.shard_for_task_id(task_id))
+
+    def per_shard(self):
+        return [self.using(alias) for alias in sharding.get_shards()]
+
+    def with_users(self, *fields):
+        """
+        select_related for the user FKs in `fields`; users live on the
+        default database, so tasks on other shards prefetch them instead.
+        """
+        if self.db == DEFAULT_DB_ALIAS:
+            return self.select_related(*fields)
+        return self.prefetch_related(*fields)
+
+    def create(self, **kwargs):
+        if self._db is None and sharding.is_sharded():
+            owner = kwargs.get("owner")
+            owner_id = owner.pk if owner is not None else kwargs.get("owner_id")
+            return self.for_owner(owner_id).create(**kwargs)
+        return super().create(**kwargs)
+
 
 # Create your models here.
 class Task(models.Model):
-    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="user_tasks")
+    # the FK constraints only exist without sharding, where tasks and users
+    # share a database (migration 0019)
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="user_tasks",
+    )
 
     assigned_user = models.ForeignKey(
         User,
@@ -19,19 +75,398 @@ class Task(models.Model):
 
     description = models.TextField(blank=True, null=True)
 
-    is_completed = models.BooleanField(default=False)
+    assigned_at = models.DateTimeField(blank=True, null=True)
 
-    complete_requested = models.BooleanField(default=False)
+    status = models.CharField(
+        max_length=20, choices=TASK_STATUS_CHOICES, default="open"
+    )
+
+    completed_at = models.DateTimeField(blank=True, null=True)
 
     reason_for_reject = models.JSONField(blank=True, null=True)
 
     due_date = models.DateTimeField(blank=True, null=True)
 
-    is_deleted = models.BooleanField(default=False)
+    # maintained by the run_due_date_scheduler worker
+    is_overdue = models.BooleanField(default=False)
+
+    reminder_sent_at = models.DateTimeField(blank=True, null=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
 
     updated_at = models.DateTimeField(auto_now=True)
 
+    # bumped by every write that clients or counters care about; PATCH
+    # requests can send it back in If-Match (see TaskDetailView.patch)
+    version = models.PositiveIntegerField(default=1)
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["due_date", "id"],
+                name="task_pending_due_date_idx",
+                condition=models.Q(status__in=ACTIVE_TASK_STATUSES, is_overdue=False),
+            ),
+            models.Index(fields=["updated_at", "id"], name="task_updated_at_id_idx"),
+            models.Index(fields=["owner", "status"], name="task_owner_status_idx"),
+            # the two branches of todo.visibility.visible_tasks
+            models.Index(
+                fields=["owner", "-created_at"], name="task_owner_created_idx"
+            ),
+            models.Index(
+                fields=["assigned_user", "-created_at"],
+                name="task_assignee_created_idx",
+            ),
+            models.Index(
+                fields=["owner", "assigned_user"],
+                name="task_owner_assignee_idx",
+                condition=models.Q(status__in=VISIBLE_TASK_STATUSES),
+            ),
+        ]
+
     def __str__(self):
         return f"{self.title} - {self.owner.email}"
+
+    def save(self, *args, **kwargs):
+        if self.pk is None and sharding.is_sharded():
+            using = kwargs.get("using") or router.db_for_write(Task, instance=self)
+            self.pk = sharding.encode_task_id(TaskIdSequence.next_value(), using)
+        super().save(*args, **kwargs)
+
+    # what the due-date scheduler (todo/scheduler.py) reads; it is only
+    # notified when one of these changes
+    SCHEDULE_FIELDS = ("due_date", "status", "is_overdue")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if all(field in field_names for field in cls.SCHEDULE_FIELDS):
+            instance._loaded_schedule = instance.schedule_state()
+        return instance
+
+    def schedule_state(self):
+        return (self.due_date, self.status in ACTIVE_TASK_STATUSES, self.is_overdue)
+
+    # The workflow used to be stored as three booleans. They are kept as
+    # computed attributes for the API and can still be passed to Task(...).
+
+    @property
+    def is_completed(self):
+        return self.status == "completed"
+
+    @is_completed.setter
+    def is_completed(self, value):
+        if self.status == "deleted":
+            return
+        if value:
+            self.status = "completed"
+        elif self.status == "completed":
+            self.status = "open"
+
+    @property
+    def complete_requested(self):
+        return self.status == "pending_approval"
+
+    @complete_requested.setter
+    def complete_requested(self, value):
+        if self.status == "deleted":
+            return
+        if value:
+            self.status = "pending_approval"
+        elif self.status == "pending_approval":
+            self.status = "open"
+
+    @property
+    def is_deleted(self):
+        return self.status == "deleted"
+
+    @is_deleted.setter
+    def is_deleted(self, value):
+        if value:
+            self.status = "deleted"
+        elif self.status == "deleted":
+            # the state before deletion is not kept; completed_at is
+            self.status = "completed" if self.completed_at else "open"
+
+
+class TaskActivity(models.Model):
+    """
+    Append-only history of task changes, written in batches by
+    todo/activity.py.
+    """
+
+    # not a ForeignKey: the log lives on the default database, tasks can be
+    # on other shards, and the history outlives deleted tasks
+    task_id = models.BigIntegerField()
+
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        related_name="task_activities",
+        blank=True,
+        null=True,
+    )
+
+    # a todo.signals task event: created, updated, completion_requested, ...
+    event = models.CharField(max_length=30)
+
+    # e.g. {field: [old, new]} for updates
+    details = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["task_id", "-id"], name="task_activity_task_id_idx"),
+            # tombstones for TaskSyncView (todo.signals.REMOVAL_EVENTS)
+            models.Index(
+                fields=["created_at", "id"],
+                name="task_activity_removal_idx",
+                condition=models.Q(event__in=["reassigned", "purged"]),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} - {self.event}"
+
+
+JOB_STATUS_CHOICES = (
+    ("queued", "Queued"),
+    ("running", "Running"),
+    ("failed", "Failed"),
+)
+
+
+class Job(models.Model):
+    """
+    Background job stored in the database, see todo/jobs.py.
+    Finished jobs are deleted; jobs that ran out of attempts stay as 'failed'.
+    """
+
+    name = models.CharField(max_length=100)
+
+    payload = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(
+        max_length=20, choices=JOB_STATUS_CHOICES, default="queued"
+    )
+
+    attempts = models.PositiveIntegerField(default=0)
+
+    max_attempts = models.PositiveIntegerField(default=5)
+
+    run_at = models.DateTimeField(default=timezone.now)
+
+    locked_at = models.DateTimeField(blank=True, null=True)
+
+    last_error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["run_at", "id"],
+                name="job_queued_run_at_idx",
+                condition=models.Q(status="queued"),
+            ),
+            models.Index(
+                fields=["locked_at"],
+                name="job_running_locked_at_idx",
+                condition=models.Q(status="running"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.id} ({self.status})"
+
+
+class TaskDailyRollup(models.Model):
+    """
+    Per owner, per day (UTC) workflow counts for the trend charts.
+    Updated incrementally by the workflow views (todo/rollups.py); history
+    from before the table existed is filled by `backfill_task_rollups`.
+    """
+
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="task_daily_rollups"
+    )
+
+    day = models.DateField()
+
+    created_count = models.PositiveIntegerField(default=0)
+
+    completion_requested_count = models.PositiveIntegerField(default=0)
+
+    approved_count = models.PositiveIntegerField(default=0)
+
+    rejected_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["owner", "day"], name="task_daily_rollup_owner_day_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.owner_id} - {self.day}"
+
+
+class RollupWatermark(models.Model):
+    """
+    Progress of a chunked backfill: rows with `position < id <= until_id`
+    are still to be processed.
+    """
+
+    name = models.CharField(max_length=50, unique=True)
+
+    position = models.BigIntegerField(default=0)
+
+    until_id = models.BigIntegerField(default=0)
+
+    until_time = models.DateTimeField(default=timezone.now)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.position}/{self.until_id}"
+
+
+class TaskIdSequence(models.Model):
+    """
+    Task ids when tasks are sharded (see todo/sharding.py). Lives on the
+    default database; rows are deleted right after their id is taken.
+    """
+
+    @classmethod
+    def next_value(cls):
+        row = cls.objects.create()
+        cls.objects.filter(id=row.id).delete()
+        return row.id
+
+
+class WebhookSubscription(models.Model):
+    """
+    An endpoint that receives task events, see todo/webhooks.py. Requests
+    are signed with `secret`.
+    """
+
+    url = models.URLField(max_length=500)
+
+    secret = models.CharField(max_length=100)
+
+    # task event names, see todo.signals.WEBHOOK_EVENTS
+    events = models.JSONField(default=list)
+
+    is_active = models.BooleanField(default=True)
+
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        related_name="webhook_subscriptions",
+        blank=True,
+        null=True,
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # Delivery state, maintained by the worker: failed attempts in a row,
+    # and when the endpoint may be tried again (also the lease of the
+    # worker that is delivering to it).
+    consecutive_failures = models.PositiveIntegerField(default=0)
+
+    retry_at = models.DateTimeField(blank=True, null=True)
+
+    last_error = models.TextField(blank=True, default="")
+
+    def __str__(self):
+        return self.url
+
+
+WEBHOOK_EVENT_STATUS_CHOICES = (
+    ("pending", "Pending"),
+    ("failed", "Failed"),
+)
+
+
+class WebhookEvent(models.Model):
+    """
+    Transactional outbox: one row per event and subscription, written in the
+    transaction that changes the task and deleted once delivered. Events
+    that ran out of attempts stay as 'failed'.
+    """
+
+    subscription = models.ForeignKey(
+        WebhookSubscription, on_delete=models.CASCADE, related_name="outbox"
+    )
+
+    event = models.CharField(max_length=30)
+
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+
+    status = models.CharField(
+        max_length=20, choices=WEBHOOK_EVENT_STATUS_CHOICES, default="pending"
+    )
+
+    attempts = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["subscription", "id"],
+                name="webhook_event_pending_idx",
+                condition=models.Q(status="pending"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event} #{self.id} ({self.status})"
+
+
+OFFBOARDING_STATUS_CHOICES = (
+    ("running", "Running"),
+    ("done", "Done"),
+)
+
+
+class Offboarding(models.Model):
+    """
+    Progress of a user's offboarding, updated after every batch by
+    todo/offboarding.py.
+    """
+
+    # not a ForeignKey: the row outlives the user it reports on
+    user_id = models.BigIntegerField(db_index=True)
+
+    # the purge job; gone once it succeeded, 'failed' if it gave up
+    job = models.ForeignKey(
+        Job,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        blank=True,
+        null=True,
+    )
+
+    status = models.CharField(
+        max_length=20, choices=OFFBOARDING_STATUS_CHOICES, default="running"
+    )
+
+    reassigned = models.PositiveIntegerField(default=0)
+
+    deleted = models.PositiveIntegerField(default=0)
+
+    unassigned = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.user_id} ({self.status})"
@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.core.mail import send_mail, send_mass_mail
+
+from .jobs import register
+from .models import Task
+
+
+def _full_name(user):
+    return f"{user.first_name} {user.last_name}".strip() or user.email
+
+
+def send_due_date_reminders(tasks):
+    """
+    Sends one reminder e-mail per task to the assignee and the owner.
+    `tasks` must have `owner` and `assigned_user` selected.
+    """
+    messages = []
+
+    for task in tasks:
+        recipients = [task.owner.email]
+        if task.assigned_user and task.assigned_user.email not in recipients:
+            recipients.append(task.assigned_user.email)
+
+        assignee = _full_name(task.assigned_user) if task.assigned_user else "-"
+        messages.append(
+            (
+                f"Reminder: '{task.title}' is due soon",
+                (
+                    f"The task '{task.title}' is due on "
+                    f"{task.due_date:%Y-%m-%d %H:%M} UTC.\n"
+                    f"Assigned user: {assignee}"
+                ),
+                settings.DEFAULT_FROM_EMAIL,
+                recipients,
+            )
+        )
+
+    if not messages:
+        return 0
+
+    return send_mass_mail(messages, fail_silently=False)
+
+
+@register("task_workflow_email")
+def send_task_workflow_email(task_id, event):
+    """
+    Job handler for completion requests, approvals and rejections.
+    Completion requests go to the owner, decisions go to the assignee.
+    """
+    task = (
+        Task.objects.for_id(task_id)
+        .with_users("owner", "assigned_user")
+        .get(id=task_id)
+    )
+
+    if event == "completion_requested":
+        recipient = task.owner
+        subject = f"Completion requested: '{task.title}'"
+        body = (
+            f"{_full_name(task.assigned_user)} requested completion of "
+            f"'{task.title}'. Please approve or reject it."
+        )
+    elif event == "approved":
+        recipient = task.assigned_user
+        subject = f"Task approved: '{task.title}'"
+        body = f"{_full_name(task.owner)} approved '{task.title}'."
+    elif event == "rejected":
+        recipient = task.assigned_user
+        reasons = task.reason_for_reject or []
+        reason = reasons[-1]["reason"] if reasons else "-"
+        subject = f"Completion request rejected: '{task.title}'"
+        body = (
+            f"{_full_name(task.owner)} rejected the completion request for "
+            f"'{task.title}'.\nReason: {reason}"
+        )
+    else:
+        raise ValueError(f"Unknown task event: {event}")
+
+    if recipient is None:
+        return
+
+    send_mail(subject, body, settings.DEFAULT_FROM_EMAIL, [recipient.email])
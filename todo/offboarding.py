@@ -0,0 +1,305 @@
+"""
+Offboarding of employees who leave.
+
+Deleting a user with `user.delete()` makes Django's collector load every
+task they own (CASCADE) or are assigned to (SET_NULL) and delete or update
+them row by row, in one long transaction. Here instead:
+
+1. `reassign_open_tasks` hands their active tasks to another user with one
+   UPDATE per shard,
+2. `purge_user` deletes their own tasks, unassigns the rest and removes
+   them as the actor of activity log entries in batches of `batch_size`
+   ids, each in its own short transaction, and deletes the user once
+   nothing large points at them any more.
+
+Counters, cached lists and task details are updated per batch, the same way
+the views do it for single tasks, and every task gets a "reassigned" or
+"purged" activity entry that the sync API turns into a tombstone. Progress is reported through the
+`progress(stage, count)` callback after every batch; `start_offboarding`
+records it on an Offboarding row that the API reads.
+"""
+
+import logging
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from accounts.models import User
+
+from . import counters
+from .activity import record_removals
+from .detail_cache import invalidate_task_detail
+from .jobs import enqueue, register
+from .list_cache import bump_task_generations
+from .models import ACTIVE_TASK_STATUSES, Offboarding, Task, TaskActivity
+from .sharding import shard_atomic
+from .signals import TASK_PURGED, TASK_REASSIGNED
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+# purging a user with many tasks can take a while; it's safe to resume
+PURGE_LOCK_TIMEOUT = timedelta(hours=2)
+
+REASSIGNED = "reassigned"
+DELETED = "deleted"
+UNASSIGNED = "unassigned"
+
+
+def _invalidate(task_ids, user_ids):
+    bump_task_generations(user_ids)
+
+    def invalidate():
+        for task_id in task_ids:
+            invalidate_task_detail(task_id)
+
+    transaction.on_commit(invalidate)
+
+
+def _counter_deltas(tasks, sign):
+    """
+    Counter deltas per assignee for adding (sign=1) or removing (sign=-1)
+    the counted `tasks`.
+    """
+    rows = (
+        tasks.filter(assigned_user__isnull=False)
+        .values("assigned_user_id")
+        .annotate(**counters.COUNTER_AGGREGATES)
+    )
+    deltas = defaultdict(Counter)
+    for row in rows:
+        user_id = row.pop("assigned_user_id")
+        for field, n in row.items():
+            deltas[user_id][field] += sign * n
+    return deltas
+
+
+def reassign_open_tasks(from_user_id, to_user_id, progress=None):
+    """
+    Assigns every active task of `from_user_id` to `to_user_id` and returns
+    how many there were. Completed tasks keep their assignee.
+    """
+    reassigned = 0
+
+    # assigned tasks can be on any shard
+    for tasks in Task.objects.per_shard():
+        with shard_atomic(tasks.db):
+            rows = list(
+                tasks.select_for_update()
+                .filter(assigned_user_id=from_user_id, status__in=ACTIVE_TASK_STATUSES)
+                .values_list("id", "owner_id")
+            )
+            if not rows:
+                continue
+            ids = [task_id for task_id, _ in rows]
+
+            totals = tasks.filter(id__in=ids).aggregate(**counters.COUNTER_AGGREGATES)
+            now = timezone.now()
+            tasks.filter(id__in=ids).update(
+                assigned_user_id=to_user_id,
+                assigned_at=now,
+                updated_at=now,
+                version=F("version") + 1,
+            )
+
+            counters.apply_counter_deltas(
+                {
+                    from_user_id: {
+                        field: -totals[field] for field in counters.COUNTER_FIELDS
+                    },
+                    to_user_id: {
+                        field: totals[field] for field in counters.COUNTER_FIELDS
+                    },
+                }
+            )
+            _invalidate(ids, [from_user_id, to_user_id, *{owner for _, owner in rows}])
+            record_removals(
+                TASK_REASSIGNED,
+                [
+                    (task_id, {"assigned_user": [from_user_id, to_user_id]})
+                    for task_id in ids
+                ],
+            )
+
+        reassigned += len(ids)
+        if progress:
+            progress(REASSIGNED, len(ids))
+
+    return reassigned
+
+
+def _delete_owned_batch(user_id, batch_size):
+    tasks = Task.objects.for_owner(user_id)
+    with shard_atomic(tasks.db):
+        rows = list(
+            tasks.select_for_update()
+            .filter(owner_id=user_id)
+            .order_by("id")
+            .values_list("id", "assigned_user_id")[:batch_size]
+        )
+        if not rows:
+            return 0
+        ids = [task_id for task_id, _ in rows]
+
+        deltas = _counter_deltas(tasks.filter(id__in=ids), -1)
+        deltas.pop(user_id, None)
+        # post_delete invalidates the cached lists and details of each task
+        tasks.filter(id__in=ids).delete()
+
+        counters.apply_counter_deltas(deltas)
+        record_removals(
+            TASK_PURGED,
+            [
+                (task_id, {"owner": user_id, "assigned_user": assigned_user_id})
+                for task_id, assigned_user_id in rows
+            ],
+        )
+
+    return len(ids)
+
+
+def _unassign_batch(tasks, user_id, batch_size):
+    with shard_atomic(tasks.db):
+        rows = list(
+            tasks.select_for_update()
+            .filter(assigned_user_id=user_id)
+            .order_by("id")
+            .values_list("id", "owner_id")[:batch_size]
+        )
+        if not rows:
+            return 0
+        ids = [task_id for task_id, _ in rows]
+
+        # the user's own counters go away with the user
+        tasks.filter(id__in=ids).update(
+            assigned_user=None,
+            updated_at=timezone.now(),
+            version=F("version") + 1,
+        )
+        _invalidate(ids, [user_id, *{owner for _, owner in rows}])
+        record_removals(
+            TASK_REASSIGNED,
+            [(task_id, {"assigned_user": [user_id, None]}) for task_id in ids],
+        )
+
+    return len(ids)
+
+
+def _detach_activity_batch(user_id, batch_size):
+    # the history is kept, without the user (on_delete=SET_NULL)
+    ids = list(
+        TaskActivity.objects.filter(actor_id=user_id).values_list("id", flat=True)[
+            :batch_size
+        ]
+    )
+    if not ids:
+        return 0
+    return TaskActivity.objects.filter(id__in=ids).update(actor=None)
+
+
+def purge_user(user_id, batch_size=BATCH_SIZE, progress=None):
+    """
+    Deletes the user with their tasks in batches. Tasks of other owners that
+    are still assigned to them are unassigned. Safe to run again after an
+    interruption. Returns `{"deleted": ..., "unassigned": ...}`.
+    """
+    result = {DELETED: 0, UNASSIGNED: 0}
+
+    while True:
+        deleted = _delete_owned_batch(user_id, batch_size)
+        if not deleted:
+            break
+        result[DELETED] += deleted
+        if progress:
+            progress(DELETED, deleted)
+
+    for tasks in Task.objects.per_shard():
+        while True:
+            unassigned = _unassign_batch(tasks, user_id, batch_size)
+            if not unassigned:
+                break
+            result[UNASSIGNED] += unassigned
+            if progress:
+                progress(UNASSIGNED, unassigned)
+
+    while _detach_activity_batch(user_id, batch_size):
+        pass
+
+    # only small relations (tokens, rollups, webhook subscriptions they
+    # created) are left for the collector
+    User.objects.filter(id=user_id).delete()
+    return result
+
+
+def deactivate_user(user):
+    """
+    Stops the user from logging in and from being assigned new tasks while
+    they are offboarded.
+    """
+    user.is_active = False
+    user.is_deleted = True
+    user.save(update_fields=["is_active", "is_deleted"])
+
+
+def record_progress(offboarding_id):
+    """
+    A `progress` callback that adds to the counts of the Offboarding row.
+    """
+
+    def progress(stage, count):
+        logger.info("Offboarding %s: %s %s task(s)", offboarding_id, stage, count)
+        Offboarding.objects.filter(id=offboarding_id).update(
+            **{stage: F(stage) + count}, updated_at=timezone.now()
+        )
+
+    return progress
+
+
+def finish_offboarding(offboarding_id):
+    now = timezone.now()
+    Offboarding.objects.filter(id=offboarding_id).update(
+        status="done", updated_at=now, finished_at=now
+    )
+
+
+def start_offboarding(user, reassign_to_id=None):
+    """
+    Deactivates the user, hands their active tasks to `reassign_to_id` and
+    queues the purge in one transaction, so a failure leaves the user
+    untouched. Returns the Offboarding row.
+
+    With sharding the reassignment commits per shard; it is idempotent, so
+    offboarding the user again finishes it.
+    """
+    with transaction.atomic():
+        # no new tasks can be assigned to the user from here on
+        deactivate_user(user)
+
+        offboarding = Offboarding.objects.create(user_id=user.id)
+        if reassign_to_id is not None:
+            offboarding.reassigned = reassign_open_tasks(user.id, reassign_to_id)
+        offboarding.job = enqueue(
+            "offboard_user", {"user_id": user.id, "offboarding_id": offboarding.id}
+        )
+        offboarding.save(update_fields=["reassigned", "job"])
+
+    return offboarding
+
+
+@register("offboard_user", lock_timeout=PURGE_LOCK_TIMEOUT)
+def purge_user_job(user_id, offboarding_id=None, batch_size=BATCH_SIZE):
+    def log_progress(stage, count):
+        logger.info("Offboarding user %s: %s %s task(s)", user_id, stage, count)
+
+    progress = log_progress
+    if offboarding_id is not None:
+        progress = record_progress(offboarding_id)
+
+    result = purge_user(user_id, batch_size=batch_size, progress=progress)
+    if offboarding_id is not None:
+        finish_offboarding(offboarding_id)
+    logger.info("Offboarded user %s: %s", user_id, result)
@@ -1,4 +1,13 @@
-from rest_framework.pagination import PageNumberPagination
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import DjangoPaginator, PageNumberPagination
+from rest_framework.response import Response
 
 
 class PostPagination(PageNumberPagination):
@@ -32,3 +41,106 @@ class PostPagination6(PageNumberPagination):
 class AllDataPagination(PageNumberPagination):
     page_size = 1000
     page_size_query_param = None
+
+
+def estimate_count(queryset):
+    """
+    Planner row estimate for `queryset` (from table statistics, i.e.
+    pg_class.reltuples and column histograms), or None when the database
+    can't provide one. Only PostgreSQL is supported.
+    """
+    if connections[queryset.db].vendor != "postgresql":
+        return None
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class ApproximatePage(Page):
+    """
+    Page of a paginator with an estimated count: whether there is a next
+    page is known from the rows, not from num_pages.
+    """
+
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+
+class CachedCountPaginator(DjangoPaginator):
+    """
+    Keeps the count of each distinct query (SQL and parameters) in the cache
+    for PAGINATION_COUNT_CACHE_TIMEOUT seconds. When the planner estimates
+    at least PAGINATION_COUNT_ESTIMATE_THRESHOLD rows the estimate is used
+    instead of COUNT(*), and `count_is_approximate` is set.
+    """
+
+    count_is_approximate = False
+
+    @cached_property
+    def count(self):
+        sql, params = self.object_list.order_by().query.sql_with_params()
+        digest = hashlib.md5(f"{sql}|{params!r}".encode()).hexdigest()
+        key = f"pagination-count:{digest}"
+
+        cached = cache.get(key)
+        if cached is None:
+            threshold = getattr(
+                settings, "PAGINATION_COUNT_ESTIMATE_THRESHOLD", 100_000
+            )
+            estimate = estimate_count(self.object_list)
+            if estimate is not None and estimate >= threshold:
+                cached = (estimate, True)
+            else:
+                cached = (self.object_list.count(), False)
+            timeout = getattr(settings, "PAGINATION_COUNT_CACHE_TIMEOUT", 60)
+            cache.set(key, cached, timeout)
+
+        count, self.count_is_approximate = cached
+        return count
+
+    def validate_number(self, number):
+        if not (self.count and self.count_is_approximate):
+            return super().validate_number(number)
+        # with an estimate any page may exist; it's just empty past the end
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_is_approximate:
+            return super().page(number)
+
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        return ApproximatePage(
+            rows[: self.per_page], number, self, len(rows) > self.per_page
+        )
+
+
+class CachedCountPagination(PageNumberPagination):
+    """
+    PostPagination with CachedCountPaginator. Responses carry
+    "count_is_approximate".
+    """
+
+    page_size = 10
+    django_paginator_class = CachedCountPaginator
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.page.paginator.count,
+                "count_is_approximate": self.page.paginator.count_is_approximate,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
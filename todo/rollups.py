@@ -0,0 +1,94 @@
+"""
+Daily workflow rollups per owner (todo.TaskDailyRollup).
+
+The workflow views add to today's row in the same transaction as the change
+(see the receiver in todo/signals.py). Tasks that existed before the table
+are counted by `backfill_chunk`, which walks task ids in bounded chunks and
+records its progress in a RollupWatermark so it can run on a live database
+and resume after interruptions.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+
+from .models import RollupWatermark, Task, TaskDailyRollup
+
+ROLLUP_FIELDS = (
+    "created_count",
+    "completion_requested_count",
+    "approved_count",
+    "rejected_count",
+)
+
+BACKFILL_WATERMARK = "task_rollups"
+
+
+def increment(owner_id, day, counts):
+    """
+    Adds `counts` ({rollup field: n}) to the owner's row for `day`.
+    """
+    updates = {field: F(field) + n for field, n in counts.items()}
+    rows = TaskDailyRollup.objects.filter(owner_id=owner_id, day=day)
+
+    if rows.update(**updates):
+        return
+
+    try:
+        with transaction.atomic():
+            TaskDailyRollup.objects.create(owner_id=owner_id, day=day, **counts)
+    except IntegrityError:
+        # created concurrently by another request
+        rows.update(**updates)
+
+
+def backfill_chunk(chunk_size=1000):
+    """
+    Counts the next chunk of pre-existing tasks into the rollups. Returns the
+    number of task ids covered, 0 when the backfill is complete.
+    """
+    with transaction.atomic():
+        watermark = RollupWatermark.objects.select_for_update().get(
+            name=BACKFILL_WATERMARK
+        )
+        if watermark.position >= watermark.until_id:
+            return 0
+
+        end = min(watermark.position + chunk_size, watermark.until_id)
+
+        deltas = defaultdict(Counter)
+        for tasks in Task.objects.per_shard():
+            chunk = tasks.filter(id__gt=watermark.position, id__lte=end)
+            created = (
+                chunk.annotate(day=TruncDate("created_at"))
+                .values("owner_id", "day")
+                .annotate(n=Count("id"))
+            )
+            for row in created:
+                deltas[(row["owner_id"], row["day"])]["created_count"] += row["n"]
+
+            # approvals after until_time are already counted by the views
+            approved = (
+                chunk.filter(
+                    # deleted tasks keep completed_at
+                    status__in=("completed", "deleted"),
+                    completed_at__isnull=False,
+                    completed_at__lt=watermark.until_time,
+                )
+                .annotate(day=TruncDate("completed_at"))
+                .values("owner_id", "day")
+                .annotate(n=Count("id"))
+            )
+            for row in approved:
+                deltas[(row["owner_id"], row["day"])]["approved_count"] += row["n"]
+
+        for (owner_id, day), counts in deltas.items():
+            increment(owner_id, day, counts)
+
+        covered = end - watermark.position
+        watermark.position = end
+        watermark.save(update_fields=["position", "updated_at"])
+
+    return covered
@@ -0,0 +1,321 @@
+"""
+Due-date scheduler driven by the ``run_due_date_scheduler`` command.
+
+Upcoming deadlines are kept in a min-heap that is filled in keyset order
+from the partial ``(due_date, id)`` index, so the worker only holds the next
+slice of the schedule in memory. Task writes are picked up incrementally
+instead of reloading everything:
+
+- on PostgreSQL a write that changes a deadline sends the task id with
+  ``NOTIFY`` when it commits. The worker sleeps on ``LISTEN``, so it wakes
+  either at the next deadline or when a task changes, and re-reads the
+  notified tasks however long their transaction took.
+- every database is also polled for rows with a recent ``updated_at``. The
+  cursor is the latest ``updated_at`` seen minus `change_overlap`, because
+  ``updated_at`` is set when a row is written, not when it commits. Without
+  NOTIFY, a change whose transaction ran longer than the overlap is missed
+  until the worker restarts; raise ``--change-overlap`` above the longest
+  transaction that writes tasks.
+
+With sharded tasks (todo/sharding.py) one worker runs per shard, see the
+``--database`` option of the command.
+"""
+
+import heapq
+import select
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import counters
+from .detail_cache import invalidate_task_detail
+from .list_cache import bump_task_generations
+from .models import ACTIVE_TASK_STATUSES, Task
+from .notifications import send_due_date_reminders
+from .sharding import shard_atomic
+
+NOTIFY_CHANNEL = "todo_due_dates"
+
+REMINDER = "reminder"
+OVERDUE = "overdue"
+
+# How far change polling re-reads behind the latest `updated_at` it saw.
+# Re-applying a change is cheap.
+CHANGE_OVERLAP = timedelta(minutes=1)
+
+
+def pending_tasks(using=None):
+    return Task.objects.using(using).filter(
+        status__in=ACTIVE_TASK_STATUSES,
+        is_overdue=False,
+        due_date__isnull=False,
+    )
+
+
+def notify_schedule_changed(task_id, using="default"):
+    """
+    Wakes up a sleeping scheduler and has it re-read the task. Call it when
+    one of Task.SCHEDULE_FIELDS changed. On PostgreSQL NOTIFY is delivered
+    on commit, so calling this inside a transaction is safe.
+    """
+    conn = connections[using]
+    if conn.vendor == "postgresql":
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [NOTIFY_CHANNEL, str(task_id)])
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class DueDateScheduler:
+    def __init__(
+        self,
+        lead_time=timedelta(hours=24),
+        batch_size=500,
+        poll_interval=300,
+        database=DEFAULT_DB_ALIAS,
+        change_overlap=CHANGE_OVERLAP,
+    ):
+        self.lead_time = lead_time
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.database = database
+        self.change_overlap = change_overlap
+
+        # (fire_at, task_id, kind, due_date) entries. Entries whose due_date no
+        # longer matches `_scheduled[task_id]` are stale and skipped on pop.
+        self._heap = []
+        self._scheduled = {}
+        # (due_date, id) of the last row loaded from the index.
+        self._frontier = None
+        self._exhausted = False
+        self._changes_since = None
+
+    def start(self, now=None):
+        now = now or timezone.now()
+        self._changes_since = now - self.change_overlap
+
+        connection = connections[self.database]
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+
+        self._fill()
+
+    # ===== SCHEDULE =====
+
+    def _schedule(self, task_id, due_date, reminder_sent):
+        self._scheduled[task_id] = due_date
+        if not reminder_sent:
+            heapq.heappush(
+                self._heap, (due_date - self.lead_time, task_id, REMINDER, due_date)
+            )
+        heapq.heappush(self._heap, (due_date, task_id, OVERDUE, due_date))
+
+    def _is_live(self, entry):
+        return self._scheduled.get(entry[1]) == entry[3]
+
+    def _discard_stale(self):
+        while self._heap and not self._is_live(self._heap[0]):
+            heapq.heappop(self._heap)
+
+    def _is_loaded(self, due_date, task_id):
+        if self._exhausted:
+            return True
+        return self._frontier is not None and (due_date, task_id) <= self._frontier
+
+    def _load_next_chunk(self):
+        qs = pending_tasks(self.database).order_by("due_date", "id")
+        if self._frontier is not None:
+            due_date, task_id = self._frontier
+            qs = qs.filter(
+                Q(due_date__gt=due_date) | Q(due_date=due_date, id__gt=task_id)
+            )
+
+        rows = list(
+            qs.values_list("id", "due_date", "reminder_sent_at")[: self.batch_size]
+        )
+        for task_id, due_date, reminder_sent_at in rows:
+            self._schedule(task_id, due_date, reminder_sent_at is not None)
+
+        if rows:
+            self._frontier = (rows[-1][1], rows[-1][0])
+        self._exhausted = len(rows) < self.batch_size
+
+    def _fill(self):
+        """
+        Loads chunks until the earliest entry in the heap fires before anything
+        that is still unloaded could.
+        """
+        while not self._exhausted:
+            self._discard_stale()
+            if self._heap and self._frontier is not None:
+                unloaded_fire_at = self._frontier[0] - self.lead_time
+                if self._heap[0][0] < unloaded_fire_at:
+                    return
+            self._load_next_chunk()
+
+    def _notified_ids(self):
+        """
+        Ids of the tasks NOTIFY reported since the last call. psycopg2 keeps
+        the notifications that arrive with any query, not just in wait().
+        """
+        connection = connections[self.database]
+        if connection.vendor != "postgresql" or connection.connection is None:
+            return set()
+
+        notifies = connection.connection.notifies
+        task_ids = {int(n.payload) for n in notifies if n.payload.isdigit()}
+        notifies.clear()
+        return task_ids
+
+    def _apply_changes(self):
+        changed = (
+            Task.objects.using(self.database)
+            .filter(
+                Q(updated_at__gte=self._changes_since) | Q(id__in=self._notified_ids())
+            )
+            .values_list(
+                "id",
+                "due_date",
+                "reminder_sent_at",
+                "status",
+                "is_overdue",
+                "updated_at",
+            )
+            .iterator(chunk_size=self.batch_size)
+        )
+
+        latest = None
+        for row in changed:
+            task_id, due_date, reminder_sent_at, task_status, overdue, updated_at = row
+            if latest is None or updated_at > latest:
+                latest = updated_at
+
+            if due_date is None or task_status not in ACTIVE_TASK_STATUSES or overdue:
+                self._scheduled.pop(task_id, None)
+                continue
+
+            if not self._is_loaded(due_date, task_id):
+                # will be picked up by a later keyset chunk
+                self._scheduled.pop(task_id, None)
+                continue
+
+            if self._scheduled.get(task_id) != due_date:
+                self._schedule(task_id, due_date, reminder_sent_at is not None)
+
+        if latest is not None:
+            self._changes_since = max(self._changes_since, latest - self.change_overlap)
+
+    # ===== FIRE =====
+
+    def _send_reminders(self, task_ids, now):
+        tasks = list(
+            pending_tasks(self.database)
+            .filter(id__in=task_ids, reminder_sent_at__isnull=True, due_date__gt=now)
+            .with_users("owner", "assigned_user")
+        )
+        if not tasks:
+            return 0
+
+        send_due_date_reminders(tasks)
+        Task.objects.using(self.database).filter(
+            id__in=[task.id for task in tasks]
+        ).update(reminder_sent_at=now)
+        return len(tasks)
+
+    def _mark_overdue(self, task_ids, now):
+        with shard_atomic(self.database):
+            rows = list(
+                pending_tasks(self.database)
+                .select_for_update()
+                .filter(id__in=task_ids, due_date__lte=now)
+                .values_list("id", "owner_id", "assigned_user_id")
+            )
+            if not rows:
+                return 0
+
+            Task.objects.using(self.database).filter(
+                id__in=[task_id for task_id, _, _ in rows]
+            ).update(is_overdue=True, updated_at=now, version=F("version") + 1)
+            for task_id, _, _ in rows:
+                invalidate_task_detail(task_id)
+            # cached task lists show is_overdue
+            bump_task_generations(
+                {
+                    user_id
+                    for _, owner_id, assignee_id in rows
+                    for user_id in (owner_id, assignee_id)
+                }
+            )
+
+            per_user = Counter(user_id for _, _, user_id in rows if user_id is not None)
+            counters.apply_counter_deltas(
+                {user_id: {counters.OVERDUE: n} for user_id, n in per_user.items()}
+            )
+
+        return len(rows)
+
+    def run_pending(self, now=None):
+        """
+        Applies task changes, fires everything that is due and returns
+        `(reminders_sent, tasks_marked_overdue)`.
+        """
+        now = now or timezone.now()
+        self._apply_changes()
+        self._fill()
+
+        reminder_ids = []
+        overdue_ids = []
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if not self._is_live(entry):
+                continue
+
+            _, task_id, kind, _ = entry
+            if kind == REMINDER:
+                reminder_ids.append(task_id)
+            else:
+                overdue_ids.append(task_id)
+                del self._scheduled[task_id]
+
+        reminders_sent = 0
+        for batch in _chunks(reminder_ids, self.batch_size):
+            reminders_sent += self._send_reminders(batch, now)
+
+        marked_overdue = 0
+        for batch in _chunks(overdue_ids, self.batch_size):
+            marked_overdue += self._mark_overdue(batch, now)
+
+        self._fill()
+        return reminders_sent, marked_overdue
+
+    # ===== WAIT =====
+
+    def seconds_until_next_run(self, now=None):
+        now = now or timezone.now()
+        timeout = self.poll_interval
+
+        self._discard_stale()
+        if self._heap:
+            timeout = min(timeout, (self._heap[0][0] - now).total_seconds())
+
+        return max(timeout, 0)
+
+    def wait(self, timeout):
+        connection = connections[self.database]
+        if connection.vendor != "postgresql":
+            time.sleep(timeout)
+            return
+
+        connection.ensure_connection()
+        pg_connection = connection.connection
+        if select.select([pg_connection], [], [], timeout) != ([], [], []):
+            # run_pending() reads the notified task ids
+            pg_connection.poll()
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
-from .models import Task
+from .models import Task, WebhookSubscription
+from .signals import WEBHOOK_EVENTS
 
 
 class TaskSerializer(serializers.ModelSerializer):
@@ -13,6 +14,7 @@ class TaskSerializer(serializers.ModelSerializer):
             "title",
             "description",
             "due_date",
+            "status",
             "is_completed",
             "created_at",
             "task_owner",
@@ -20,3 +22,49 @@ class TaskSerializer(serializers.ModelSerializer):
 
     def get_task_owner(self, obj):
         return f"{obj.owner.first_name} {obj.owner.last_name}"
+
+
+class TaskSyncSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Task
+        fields = [
+            "id",
+            "title",
+            "description",
+            "due_date",
+            "status",
+            "is_completed",
+            "complete_requested",
+            "is_overdue",
+            "reason_for_reject",
+            "owner",
+            "assigned_user",
+            "created_at",
+            "updated_at",
+            "version",
+        ]
+
+
+class WebhookSubscriptionSerializer(serializers.ModelSerializer):
+    events = serializers.ListField(
+        child=serializers.ChoiceField(choices=WEBHOOK_EVENTS), allow_empty=False
+    )
+
+    class Meta:
+        model = WebhookSubscription
+        fields = [
+            "id",
+            "url",
+            "events",
+            "is_active",
+            "created_at",
+            "consecutive_failures",
+            "retry_at",
+            "last_error",
+        ]
+        read_only_fields = [
+            "created_at",
+            "consecutive_failures",
+            "retry_at",
+            "last_error",
+        ]
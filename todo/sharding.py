@@ -0,0 +1,206 @@
+"""
+Owner-hash sharding of todo.Task.
+
+TASK_SHARDS lists the database aliases that hold tasks; every other model
+(users, jobs, rollups, ...) stays on the default database. A task lives on
+the shard of its owner, `crc32(owner_id) % len(TASK_SHARDS)`, so everything
+an owner sees about their own tasks is answered by one database.
+
+Task ids are allocated from one sequence on the default database and encode
+the shard in their low bits (`sequence * SHARD_ID_STRIDE + shard index`),
+so a task can be found from its id alone (`Task.objects.for_id(id)`).
+Foreign keys from tasks to users can't be enforced across databases and have
+no constraints when sharded (migration 0019 keeps them otherwise), and
+`select_related` to users only works on the default database
+(`TaskQuerySet.with_users` prefetches instead).
+
+Queries that span owners (admin lists, assignee lists) run on every shard
+and are merged in Python, see `scatter_gather`.
+
+With the default `TASK_SHARDS = ["default"]` none of this is active: the
+router returns None and every task query runs on the default database as
+before. Turning sharding on for an existing database needs its tasks copied
+to their shards with new ids; there is no command for that.
+"""
+
+import heapq
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import wraps
+from itertools import islice
+from operator import attrgetter
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .activity import activity_batch
+
+# upper bound for the number of shards, fixed once ids were allocated
+SHARD_ID_STRIDE = 64
+
+TASK_MODEL = "todo.Task"
+
+
+def get_shards():
+    return list(getattr(settings, "TASK_SHARDS", None) or [DEFAULT_DB_ALIAS])
+
+
+def is_sharded():
+    return get_shards() != [DEFAULT_DB_ALIAS]
+
+
+def shard_for_owner(owner_id):
+    shards = get_shards()
+    if len(shards) == 1:
+        return shards[0]
+    return shards[zlib.crc32(str(owner_id).encode()) % len(shards)]
+
+
+def shard_for_task_id(task_id):
+    shards = get_shards()
+    if not is_sharded():
+        return shards[0]
+    return shards[int(task_id) % SHARD_ID_STRIDE % len(shards)]
+
+
+def encode_task_id(sequence, alias):
+    return sequence * SHARD_ID_STRIDE + get_shards().index(alias)
+
+
+class TaskShardRouter:
+    """
+    Sends task queries to the owner's shard and everything else to the
+    default database. Every database gets the full schema (see
+    `allow_migrate`), only the rows are split.
+    """
+
+    def _is_task(self, model):
+        return model._meta.label == TASK_MODEL
+
+    def _db_for(self, model, instance=None, **hints):
+        if not is_sharded():
+            return None
+        if not self._is_task(model):
+            return DEFAULT_DB_ALIAS
+        if instance is not None and self._is_task(type(instance)):
+            if instance.owner_id is not None:
+                return shard_for_owner(instance.owner_id)
+            return instance._state.db
+        # querysets without a shard; TaskQuerySet.for_owner / for_id /
+        # per_shard pick one explicitly
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._db_for(model, **hints)
+
+    def db_for_write(self, model, **hints):
+        return self._db_for(model, **hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if self._is_task(type(obj1)) or self._is_task(type(obj2)):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Schema operations run everywhere: the old migrations create the
+        # task FKs with constraints, so the tables they point to have to
+        # exist on the shards too. Data migrations (RunPython/RunSQL without
+        # a model_name hint) query the default database and only run there.
+        if model_name is None and db != DEFAULT_DB_ALIAS:
+            return False
+        return None
+
+
+@contextmanager
+def shard_atomic(alias):
+    """
+    transaction.atomic() on the default database and, when it is another
+    database, on `alias`. The shard commits first, so on_commit callbacks
+    (cache invalidation, e-mails) see the committed task. The two commits
+    are not atomic together. Task activity recorded in the block is written
+    before either commits (todo/activity.py).
+    """
+    with transaction.atomic():
+        if alias == DEFAULT_DB_ALIAS:
+            with activity_batch():
+                yield
+        else:
+            with transaction.atomic(using=alias), activity_batch():
+                yield
+
+
+def task_atomic(view_method):
+    """
+    Like @transaction.atomic for APIView handlers that get the task `id`
+    from the URL, also covering the task's shard.
+    """
+
+    @wraps(view_method)
+    def wrapper(view, request, *args, **kwargs):
+        with shard_atomic(shard_for_task_id(kwargs["id"])):
+            return view_method(view, request, *args, **kwargs)
+
+    return wrapper
+
+
+def _can_query_concurrently(aliases):
+    return all(
+        connections[alias].vendor == "postgresql"
+        and not connections[alias].in_atomic_block
+        for alias in aliases
+    )
+
+
+def _fetch_in_thread(queryset):
+    try:
+        return list(queryset)
+    finally:
+        # connections are per thread and nothing else closes these
+        connections.close_all()
+
+
+def merge_sorted(results, order_by, limit=None):
+    """
+    Merges lists that are each sorted by `order_by` (field names, "-" for
+    descending) into one sorted list of at most `limit` items.
+    """
+    names = [field.lstrip("-") for field in order_by]
+    directions = {field.startswith("-") for field in order_by}
+
+    if not names:
+        merged = (item for result in results for item in result)
+    elif len(directions) == 1:
+        merged = heapq.merge(*results, key=attrgetter(*names), reverse=directions.pop())
+    else:
+        # mixed directions: stable sorts from the last field to the first
+        merged = [item for result in results for item in result]
+        for name, field in reversed(list(zip(names, order_by))):
+            merged.sort(key=attrgetter(name), reverse=field.startswith("-"))
+
+    return list(islice(merged, limit))
+
+
+def fetch_all(querysets):
+    """
+    Evaluates `querysets` (usually one per shard) into lists. The shards
+    are queried concurrently on PostgreSQL outside of transactions, one
+    after the other otherwise.
+    """
+    querysets = list(querysets)
+    if len(querysets) > 1 and _can_query_concurrently(qs.db for qs in querysets):
+        with ThreadPoolExecutor(max_workers=len(querysets)) as pool:
+            return list(pool.map(_fetch_in_thread, querysets))
+    return [list(queryset) for queryset in querysets]
+
+
+def scatter_gather(querysets, order_by=(), limit=None):
+    """
+    Runs `querysets` ordered by `order_by` and cut at `limit` each, and
+    merges the rows into the first `limit` of all of them. The ordering
+    fields must not be NULL.
+    """
+    querysets = [queryset.order_by(*order_by) for queryset in querysets]
+    if limit is not None:
+        querysets = [queryset[:limit] for queryset in querysets]
+    return merge_sorted(fetch_all(querysets), order_by, limit)
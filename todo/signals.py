@@ -0,0 +1,128 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from .activity import record_activity
+from .detail_cache import invalidate_task_detail
+from .events import get_broker
+from .jobs import enqueue
+from .list_cache import bump_task_generations
+from .models import Task
+from .rollups import increment as increment_rollup
+from .scheduler import notify_schedule_changed
+from .webhooks import enqueue_webhook_event
+
+TASK_CREATED = "created"
+TASK_UPDATED = "updated"
+TASK_COMPLETION_REQUESTED = "completion_requested"
+TASK_APPROVED = "approved"
+TASK_REJECTED = "rejected"
+
+# recorded by todo/offboarding.py for tasks that leave their users' view;
+# see TaskSyncView
+TASK_REASSIGNED = "reassigned"
+TASK_PURGED = "purged"
+REMOVAL_EVENTS = (TASK_REASSIGNED, TASK_PURGED)
+
+# events that can be subscribed to with webhooks (todo/webhooks.py)
+WEBHOOK_EVENTS = (
+    TASK_CREATED,
+    TASK_COMPLETION_REQUESTED,
+    TASK_APPROVED,
+    TASK_REJECTED,
+)
+
+ROLLUP_FIELDS_BY_EVENT = {
+    TASK_CREATED: "created_count",
+    TASK_COMPLETION_REQUESTED: "completion_requested_count",
+    TASK_APPROVED: "approved_count",
+    TASK_REJECTED: "rejected_count",
+}
+
+# Sent by the views in todo/views.py inside the transaction that changes the
+# task, with `task`, `event`, `actor` and `details` (what changed, for the
+# activity log) keyword arguments.
+task_event = Signal()
+
+
+def send_task_event(task, event, actor, details=None):
+    task_event.send(sender=Task, task=task, event=event, actor=actor, details=details)
+
+
+@receiver(post_save, sender=Task)
+def wake_due_date_scheduler(sender, instance, created, using, **kwargs):
+    state = instance.schedule_state()
+    if created:
+        changed = instance.due_date is not None
+    else:
+        # tasks that weren't loaded from the database count as changed
+        changed = getattr(instance, "_loaded_schedule", None) != state
+    instance._loaded_schedule = state
+
+    if changed:
+        notify_schedule_changed(instance.id, using)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task_caches(sender, instance, **kwargs):
+    bump_task_generations([instance.owner_id, instance.assigned_user_id])
+    invalidate_task_detail(instance.id)
+
+
+@receiver(task_event)
+def invalidate_task_caches_on_event(sender, task, **kwargs):
+    # TaskDetailView.patch writes with update(), which sends no post_save
+    bump_task_generations([task.owner_id, task.assigned_user_id])
+    invalidate_task_detail(task.id)
+
+
+@receiver(task_event)
+def enqueue_workflow_email(sender, task, event, **kwargs):
+    if event in (TASK_COMPLETION_REQUESTED, TASK_APPROVED, TASK_REJECTED):
+        enqueue("task_workflow_email", {"task_id": task.id, "event": event})
+
+
+def task_event_payload(task, event, actor):
+    return {
+        "event": event,
+        "actor": actor.id,
+        "task": {
+            "id": task.id,
+            "title": task.title,
+            "owner": task.owner_id,
+            "assigned_user": task.assigned_user_id,
+            "status": task.status,
+            "is_completed": task.is_completed,
+            "complete_requested": task.complete_requested,
+            "is_deleted": task.is_deleted,
+            "updated_at": task.updated_at.isoformat(),
+        },
+    }
+
+
+@receiver(task_event)
+def publish_task_event(sender, task, event, actor, **kwargs):
+    recipients = {task.owner_id, task.assigned_user_id} - {None}
+    payload = task_event_payload(task, event, actor)
+    transaction.on_commit(lambda: get_broker().publish(recipients, payload))
+
+
+@receiver(task_event)
+def enqueue_task_webhooks(sender, task, event, actor, **kwargs):
+    # in the transaction of the change: the outbox row commits with it
+    if event in WEBHOOK_EVENTS:
+        enqueue_webhook_event(event, task_event_payload(task, event, actor))
+
+
+@receiver(task_event)
+def update_daily_rollup(sender, task, event, **kwargs):
+    field = ROLLUP_FIELDS_BY_EVENT.get(event)
+    if field is not None:
+        increment_rollup(task.owner_id, timezone.now().date(), {field: 1})
+
+
+@receiver(task_event)
+def record_task_activity(sender, task, event, actor, details=None, **kwargs):
+    record_activity(task, event, actor, details)
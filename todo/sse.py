@@ -0,0 +1,137 @@
+"""
+Server-sent events stream of task changes.
+
+``TaskEventStream`` is a plain ASGI application mounted in config/asgi.py.
+Every connection is a coroutine waiting on its Subscription queue, so idle
+clients cost no thread. The JWT access token is read from the Authorization
+header or, because EventSource cannot send headers, from ``?token=``.
+"""
+
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from .events import get_broker
+
+STREAM_PATH = "/api/todo/events/"
+
+HEARTBEAT_SECONDS = 15
+RETRY_MILLISECONDS = 5000
+
+
+def format_event(event):
+    return (
+        f"event: task.{event['event']}\n"
+        f"data: {json.dumps(event, separators=(',', ':'))}\n\n"
+    ).encode()
+
+
+def _raw_token(scope):
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            parts = value.split()
+            if len(parts) == 2 and parts[0].lower() == b"bearer":
+                return parts[1]
+
+    query = parse_qs(scope.get("query_string", b"").decode())
+    token = query.get("token")
+    return token[0].encode() if token else None
+
+
+@sync_to_async
+def _authenticate(raw_token):
+    close_old_connections()
+    authentication = JWTAuthentication()
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated_token)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    finally:
+        close_old_connections()
+
+
+class TaskEventStream:
+    async def __call__(self, scope, receive, send):
+        if scope["method"] != "GET":
+            await self._error(send, 405, "Method not allowed.")
+            return
+
+        raw_token = _raw_token(scope)
+        user = await _authenticate(raw_token) if raw_token else None
+        if user is None or not user.is_active:
+            await self._error(
+                send, 401, "Authentication credentials were not provided."
+            )
+            return
+
+        subscription = get_broker().subscribe(user.id)
+        try:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", b"text/event-stream"),
+                        (b"cache-control", b"no-cache"),
+                        (b"x-accel-buffering", b"no"),
+                    ],
+                }
+            )
+            await self._send(send, f"retry: {RETRY_MILLISECONDS}\n\n".encode())
+            await self._stream(subscription, receive, send)
+        finally:
+            subscription.close()
+
+    async def _stream(self, subscription, receive, send):
+        disconnected = asyncio.ensure_future(self._wait_for_disconnect(receive))
+        try:
+            while True:
+                next_event = asyncio.ensure_future(subscription.get())
+                done, _ = await asyncio.wait(
+                    {disconnected, next_event},
+                    timeout=HEARTBEAT_SECONDS,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                if next_event in done:
+                    await self._send(send, format_event(next_event.result()))
+                else:
+                    next_event.cancel()
+
+                if disconnected in done:
+                    return
+
+                if not done:
+                    await self._send(send, b": keepalive\n\n")
+        finally:
+            disconnected.cancel()
+
+    async def _wait_for_disconnect(self, receive):
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+
+    async def _send(self, send, body):
+        await send({"type": "http.response.body", "body": body, "more_body": True})
+
+    async def _error(self, send, status, detail):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send(
+            {
+                "type": "http.response.body",
+                "body": json.dumps({"detail": detail}).encode(),
+            }
+        )
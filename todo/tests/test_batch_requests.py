@@ -0,0 +1,133 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from todo.models import Task
+from todo.views import AdminDashboardView
+
+pytestmark = pytest.mark.django_db
+
+
+def test_batch_dispatches_sub_requests_as_the_batch_user(create_user):
+    admin = create_user("admin", "admin")
+    create_user("employee", "employee")
+    Task.objects.create(owner=admin, title="Existing")
+
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    response = client.post(
+        reverse("batch"),
+        {
+            "requests": [
+                {"method": "GET", "path": reverse("dashboard")},
+                {"method": "GET", "path": reverse("employee-list") + "?limit=1"},
+                {"method": "GET", "path": reverse("tasks-list")},
+                {"method": "GET", "path": "/api/todo/does-not-exist/"},
+            ]
+        },
+        format="json",
+    )
+
+    assert response.status_code == 200
+    dashboard, employees, tasks, missing = response.json()["response"]
+    assert dashboard["status"] == 200
+    assert dashboard["body"]["response"]["total_tasks"] == 1
+    assert employees["status"] == 200
+    assert len(employees["body"]["response"]) == 1
+    assert [task["title"] for task in tasks["body"]["response"]] == ["Existing"]
+    assert missing["status"] == 404
+
+
+def test_batch_runs_writes_in_order_and_rejects_bad_input(create_user):
+    todo_admin = create_user("todoadmin", "todo admin")
+    client = APIClient()
+    client.force_authenticate(user=todo_admin)
+    url = reverse("batch")
+
+    response = client.post(
+        url,
+        {
+            "requests": [
+                {
+                    "method": "POST",
+                    "path": reverse("create-task"),
+                    "body": {"title": "From batch"},
+                },
+                {"method": "GET", "path": reverse("tasks-list")},
+            ]
+        },
+        format="json",
+    )
+    created, listed = response.json()["response"]
+    assert created["status"] == 201
+    assert listed["body"]["response"][0]["title"] == "From batch"
+
+    nested = client.post(
+        url, {"requests": [{"method": "POST", "path": url}]}, format="json"
+    )
+    assert nested.status_code == 400
+
+    admin_site = client.post(url, {"requests": [{"path": "/admin/"}]}, format="json")
+    assert admin_site.status_code == 400
+
+    assert APIClient().post(url, {"requests": []}, format="json").status_code == 401
+
+
+def test_sub_requests_are_authenticated_with_the_batch_token(create_user):
+    todo_admin = create_user("todoadmin", "todo admin")
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(todo_admin)}")
+
+    response = client.post(
+        reverse("batch"),
+        {
+            "requests": [
+                {
+                    "method": "POST",
+                    "path": reverse("create-task"),
+                    "body": {"title": "With a token"},
+                },
+            ]
+        },
+        format="json",
+    )
+
+    assert response.status_code == 200
+    [created] = response.json()["response"]
+    assert created["status"] == 201
+    assert Task.objects.get().owner_id == todo_admin.id
+
+    # the 401 challenge still comes from the JWT authenticator
+    response = APIClient().post(reverse("batch"), {"requests": []}, format="json")
+    assert response["WWW-Authenticate"].startswith("Bearer")
+
+
+def test_a_failing_sub_request_only_fails_its_own_entry(create_user, monkeypatch):
+    admin = create_user("admin", "admin")
+    client = APIClient()
+    client.force_authenticate(user=admin)
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(AdminDashboardView, "get", broken)
+    response = client.post(
+        reverse("batch"),
+        {
+            "requests": [
+                {"method": "GET", "path": reverse("dashboard")},
+                {"method": "GET", "path": reverse("tasks-list")},
+            ]
+        },
+        format="json",
+    )
+
+    assert response.status_code == 200
+    dashboard, tasks = response.json()["response"]
+    assert dashboard == {
+        "status": 500,
+        "headers": {},
+        "body": {"detail": "Internal server error."},
+    }
+    assert tasks["status"] == 200
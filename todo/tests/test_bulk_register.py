@@ -0,0 +1,133 @@
+import io
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.bulk import register_users
+from accounts.hashing import hashing_pool
+from accounts.views import BulkRegisterView
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+CSV = (
+    "username,email,password,first_name,last_name\n"
+    "ada,ada@example.com,password12345,Ada,Lovelace\n"
+    "taken,new@example.com,password12345,Taken,Name\n"
+    "grace,grace@example.com,short,Grace,Hopper\n"
+    "alan,alan@example.com,password12345,Alan,Turing\n"
+    "alan,other@example.com,password12345,Alan,Again\n"
+)
+
+
+@pytest.fixture(autouse=True)
+def hash_in_process(settings):
+    settings.BULK_REGISTER_WORKERS = 0
+
+
+def test_csv_upload_reports_every_row(create_user, get_client):
+    admin = create_user("admin", "admin")
+    create_user("taken")
+
+    upload = SimpleUploadedFile("users.csv", CSV.encode(), content_type="text/csv")
+    response = get_client(admin).post(
+        reverse("register-bulk"), {"file": upload}, format="multipart"
+    )
+    assert response.status_code == 200
+
+    data = response.json()["response"]
+    assert (data["created"], data["failed"]) == (2, 3)
+    results = data["results"]
+    assert [result["status"] for result in results] == [
+        "created",
+        "failed",
+        "failed",
+        "created",
+        "failed",
+    ]
+    assert "username" in results[1]["errors"]
+    assert "password" in results[2]["errors"]
+    assert results[4]["errors"] == {"username": ["This username is already taken."]}
+
+    ada = User.objects.get(username="ada")
+    assert ada.id == results[0]["id"]
+    assert ada.check_password("password12345")
+    assert ada.user_type == "employee"
+
+
+def test_duplicates_are_checked_with_one_query_per_batch(create_user):
+    for n in range(3):
+        create_user(f"existing{n}")
+    rows = [
+        {
+            "username": f"user{n}" if n % 2 else f"existing{n % 3}",
+            "email": f"user{n}@example.com",
+            "password": "password12345",
+        }
+        for n in range(6)
+    ]
+
+    with CaptureQueriesContext(connection) as queries:
+        results = list(register_users(rows, batch_size=3))
+
+    assert [result["status"] for result in results] == ["failed", "created"] * 3
+    selects = [q for q in queries if q["sql"].startswith("SELECT")]
+    inserts = [q for q in queries if q["sql"].startswith("INSERT")]
+    assert len(selects) == 2
+    assert len(inserts) == 2
+
+
+def test_passwords_are_hashed_in_a_process_pool():
+    rows = [
+        {
+            "username": f"user{n}",
+            "email": f"user{n}@example.com",
+            "password": f"password-{n}",
+        }
+        for n in range(4)
+    ]
+
+    with hashing_pool(2) as executor:
+        results = list(register_users(rows, executor=executor))
+
+    assert all(result["status"] == "created" for result in results)
+    assert User.objects.get(username="user3").check_password("password-3")
+
+
+def test_bulk_registration_is_admin_only_and_bounded(
+    create_user, get_client, monkeypatch
+):
+    employee = create_user("employee")
+    url = reverse("register-bulk")
+    assert (
+        get_client(employee).post(url, {"users": []}, format="json").status_code == 403
+    )
+
+    admin = create_user("admin", "admin")
+    client = get_client(admin)
+    assert client.post(url, {"users": "nope"}, format="json").status_code == 400
+
+    monkeypatch.setattr(BulkRegisterView, "max_rows", 2)
+    too_many = [{"username": f"u{n}"} for n in range(3)]
+    response = client.post(url, {"users": too_many}, format="json")
+    assert response.status_code == 400
+    assert not User.objects.filter(username__startswith="u").exists()
+
+
+def test_command_registers_users_from_csv(create_user, tmp_path):
+    path = tmp_path / "users.csv"
+    path.write_text(CSV)
+    create_user("taken")
+
+    out = io.StringIO()
+    call_command("bulk_register_users", str(path), "--workers", "0", stdout=out)
+
+    assert "2 user(s) created, 3 row(s) failed." in out.getvalue()
+    assert "row 3: failed, password:" in out.getvalue()
+    assert User.objects.filter(username__in=["ada", "alan", "grace"]).count() == 2
@@ -0,0 +1,70 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from todo import pagination
+from todo.models import Task
+from todo.pagination import CachedCountPagination
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+def paginate(queryset, page=1):
+    request = Request(APIRequestFactory().get("/tasks/", {"page": page}))
+    paginator = CachedCountPagination()
+    rows = paginator.paginate_queryset(queryset, request)
+    return paginator, rows
+
+
+def create_tasks(count):
+    owner = User.objects.create_user(username="owner", password="password12345")
+    Task.objects.bulk_create(Task(owner=owner, title=f"t{i}") for i in range(count))
+    return owner
+
+
+def test_count_is_cached_per_filter_set():
+    owner = create_tasks(15)
+    tasks = Task.objects.filter(owner=owner).order_by("id")
+
+    paginator, rows = paginate(tasks)
+    assert paginator.page.paginator.count == 15
+    assert len(rows) == 10
+
+    Task.objects.create(owner=owner, title="new")
+    with CaptureQueriesContext(connection) as queries:
+        paginator, rows = paginate(tasks, page=2)
+    # served from the cache: stale within the TTL, no COUNT query
+    assert paginator.page.paginator.count == 15
+    assert not [q for q in queries if "COUNT(" in q["sql"]]
+
+    # another filter set is counted separately
+    paginator, _ = paginate(tasks.filter(title="new"))
+    assert paginator.page.paginator.count == 1
+
+    response = paginator.get_paginated_response([])
+    assert response.data["count_is_approximate"] is False
+
+
+def test_large_estimates_replace_count(monkeypatch, settings):
+    settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD = 100
+    monkeypatch.setattr(pagination, "estimate_count", lambda queryset: 1000)
+    owner = create_tasks(15)
+    tasks = Task.objects.filter(owner=owner).order_by("id")
+
+    paginator, rows = paginate(tasks, page=2)
+    assert paginator.page.paginator.count == 1000
+    assert len(rows) == 5
+
+    response = paginator.get_paginated_response(rows)
+    assert response.data["count_is_approximate"] is True
+    assert response.data["next"] is None
+    assert response.data["previous"] is not None
+
+    # past the real end of the data the page is empty rather than a 404
+    _, rows = paginate(tasks, page=50)
+    assert rows == []
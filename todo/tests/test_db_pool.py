@@ -0,0 +1,201 @@
+import threading
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.db.backends.postgresql_pool import base
+from core.db.pool import ConnectionPool, PoolTimeout
+
+User = get_user_model()
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.pings = 0
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    def ping(conn):
+        conn.pings += 1
+        if conn.closed:
+            raise ConnectionError
+
+    kwargs.setdefault("check", lambda conn: not conn.closed)
+    return ConnectionPool("test", ping=ping, **kwargs)
+
+
+def test_connections_are_reused():
+    pool = make_pool(max_size=2)
+
+    first = pool.getconn(FakeConnection)
+    pool.putconn(first)
+    assert pool.getconn(FakeConnection) is first
+
+    stats = pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["connections_opened"] == 1
+    assert stats["in_use"] == 1
+
+
+def test_checkout_waits_for_a_free_connection_then_times_out():
+    pool = make_pool(max_size=1, timeout=0.05)
+    conn = pool.getconn(FakeConnection)
+
+    with pytest.raises(PoolTimeout):
+        pool.getconn(FakeConnection)
+
+    pool.timeout = 5
+    threading.Timer(0.05, pool.putconn, args=[conn]).start()
+    assert pool.getconn(FakeConnection) is conn
+
+    stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["waits"] == 2
+    assert stats["size"] == 1
+
+
+def test_broken_connections_are_replaced_on_checkout():
+    pool = make_pool(max_size=1, check_after=0)
+
+    conn = pool.getconn(FakeConnection)
+    pool.putconn(conn)
+    assert pool.getconn(FakeConnection) is conn
+    assert conn.pings == 1
+
+    # dropped by the server while idle: the cheap check still passes
+    pool.putconn(conn)
+    pool._check = lambda conn: True
+    conn.closed = True
+    replacement = pool.getconn(FakeConnection)
+    assert replacement is not conn
+
+    stats = pool.stats()
+    assert stats["failed_health_checks"] == 1
+    assert stats["connections_closed"] == 1
+    assert stats["size"] == 1
+
+
+def test_old_connections_and_failed_resets_are_closed():
+    pool = make_pool(max_lifetime=0)
+    conn = pool.getconn(FakeConnection)
+    pool.putconn(conn)
+    assert conn.closed
+    assert pool.stats()["size"] == 0
+
+    def reset(conn):
+        raise ConnectionError
+
+    pool = make_pool(reset=reset)
+    conn = pool.getconn(FakeConnection)
+    pool.putconn(conn)
+    assert conn.closed
+    assert pool.stats()["idle"] == 0
+
+
+def test_min_size_connections_are_opened_and_kept():
+    pool = make_pool(min_size=3, max_size=5, max_idle=0)
+    conns = [pool.getconn(FakeConnection) for _ in range(4)]
+    assert pool.stats()["connections_opened"] == 4
+
+    for conn in conns:
+        pool.putconn(conn)
+    stats = pool.stats()
+    assert stats["size"] == 3
+    assert stats["idle"] == 3
+
+
+class FakePgConnection:
+    def __init__(self, status):
+        self.status = status
+        self.autocommit = False
+        self.isolation_level = None
+        self.executed = []
+        self.notifies = ["notify"]
+        self.notices = ["notice"]
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.status = base.extensions.TRANSACTION_STATUS_IDLE
+
+    def cursor(self):
+        conn = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                pass
+
+            def execute(self, sql):
+                conn.executed.append((sql, conn.autocommit, conn.status))
+
+        return Cursor()
+
+
+def test_returned_connections_are_rolled_back_and_discarded():
+    conn = FakePgConnection(base.extensions.TRANSACTION_STATUS_INTRANS)
+
+    base._reset(conn)
+
+    idle = base.extensions.TRANSACTION_STATUS_IDLE
+    assert conn.executed == [("DISCARD ALL", True, idle)]
+    assert conn.autocommit is False
+    assert conn.notifies == conn.notices == []
+
+
+def test_connection_state_is_set_up_on_every_checkout(monkeypatch):
+    registered = []
+    monkeypatch.setattr(
+        base.psycopg2.extras,
+        "register_default_jsonb",
+        lambda conn_or_curs, loads: registered.append(conn_or_curs),
+    )
+    wrapper = base.DatabaseWrapper(
+        {
+            "ENGINE": "core.db.backends.postgresql_pool",
+            "NAME": "test",
+            "OPTIONS": {"isolation_level": base.IsolationLevel.SERIALIZABLE},
+        }
+    )
+    conn = FakePgConnection(base.extensions.TRANSACTION_STATUS_IDLE)
+
+    for _ in range(2):
+        wrapper._configure_connection(conn)
+
+    assert wrapper.isolation_level == base.IsolationLevel.SERIALIZABLE
+    assert conn.isolation_level == base.IsolationLevel.SERIALIZABLE
+    assert registered == [conn, conn]
+
+
+@pytest.mark.django_db
+def test_pool_stats_are_admin_only():
+    employee = User.objects.create_user(
+        username="employee",
+        email="employee@example.com",
+        password="password12345",
+        user_type="employee",
+    )
+    admin = User.objects.create_user(
+        username="admin",
+        email="admin@example.com",
+        password="password12345",
+        user_type="admin",
+    )
+    client = APIClient()
+
+    client.force_authenticate(user=employee)
+    assert client.get(reverse("db-pool-stats")).status_code == 403
+
+    client.force_authenticate(user=admin)
+    response = client.get(reverse("db-pool-stats"))
+    assert response.status_code == 200
+    assert isinstance(response.json()["response"], list)
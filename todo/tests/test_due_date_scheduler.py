@@ -0,0 +1,177 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from todo.list_cache import get_task_generation
+from todo.models import Task
+from todo.scheduler import DueDateScheduler
+
+pytestmark = pytest.mark.django_db
+
+
+def test_scheduler_sends_reminders_and_marks_overdue(create_users):
+    owner, employee = create_users()
+    now = timezone.now()
+
+    soon = Task.objects.create(
+        owner=owner,
+        assigned_user=employee,
+        title="Soon",
+        due_date=now + timedelta(hours=1),
+    )
+    late = Task.objects.create(
+        owner=owner,
+        assigned_user=employee,
+        title="Late",
+        due_date=now - timedelta(hours=1),
+    )
+    later = Task.objects.create(
+        owner=owner, title="Later", due_date=now + timedelta(days=3)
+    )
+    done = Task.objects.create(
+        owner=owner,
+        title="Done",
+        is_completed=True,
+        due_date=now - timedelta(days=1),
+    )
+
+    scheduler = DueDateScheduler(lead_time=timedelta(hours=24), batch_size=2)
+    scheduler.start(now=now)
+    reminders_sent, marked_overdue = scheduler.run_pending(now=now)
+
+    assert (reminders_sent, marked_overdue) == (1, 1)
+    assert len(mail.outbox) == 1
+    assert "Soon" in mail.outbox[0].subject
+    assert set(mail.outbox[0].to) == {"admin@example.com", "employee@example.com"}
+
+    for task in (soon, late, later, done):
+        task.refresh_from_db()
+    assert soon.reminder_sent_at is not None
+    assert late.is_overdue is True
+    assert later.reminder_sent_at is None
+    assert done.is_overdue is False
+
+    # running again must not send duplicate reminders
+    assert scheduler.run_pending(now=now) == (0, 0)
+
+    # the reminder for `later` fires once its lead window opens
+    assert scheduler.seconds_until_next_run(now=now) <= scheduler.poll_interval
+    assert scheduler.run_pending(now=now + timedelta(days=2, hours=1)) == (1, 1)
+
+
+def test_scheduler_picks_up_task_changes_without_reload(create_users):
+    owner, _ = create_users()
+    now = timezone.now()
+
+    task = Task.objects.create(
+        owner=owner, title="Moved", due_date=now + timedelta(days=5)
+    )
+
+    scheduler = DueDateScheduler(lead_time=timedelta(minutes=30))
+    scheduler.start(now=now)
+    assert scheduler.run_pending(now=now) == (0, 0)
+
+    task.due_date = now - timedelta(minutes=1)
+    task.save()
+    created = Task.objects.create(
+        owner=owner, title="New", due_date=now - timedelta(minutes=5)
+    )
+
+    assert scheduler.run_pending(now=timezone.now()) == (0, 2)
+    task.refresh_from_db()
+    created.refresh_from_db()
+    assert task.is_overdue is True
+    assert created.is_overdue is True
+
+
+def test_scheduler_rereads_changes_that_committed_late(create_users):
+    owner, _ = create_users()
+    now = timezone.now()
+
+    scheduler = DueDateScheduler(lead_time=timedelta(minutes=30))
+    scheduler.start(now=now - timedelta(hours=1))
+    seen = Task.objects.create(owner=owner, title="Seen")
+    assert scheduler.run_pending(now=now) == (0, 0)
+
+    # written before `seen`, committed after the scheduler polled
+    late = Task.objects.create(
+        owner=owner, title="Late", due_date=now - timedelta(minutes=5)
+    )
+    Task.objects.filter(id=late.id).update(
+        updated_at=seen.updated_at - timedelta(seconds=30)
+    )
+
+    assert scheduler.run_pending(now=now + timedelta(hours=1)) == (0, 1)
+
+
+def test_scheduler_is_notified_only_of_deadline_changes(
+    create_users, get_client, monkeypatch
+):
+    notified = []
+    monkeypatch.setattr(
+        "todo.signals.notify_schedule_changed",
+        lambda task_id, using: notified.append(task_id),
+    )
+    monkeypatch.setattr(
+        "todo.views.notify_schedule_changed",
+        lambda task_id, using: notified.append(task_id),
+    )
+    owner, _ = create_users()
+
+    task = Task.objects.create(owner=owner, title="No deadline")
+    task.title = "Renamed"
+    task.save()
+    task = Task.objects.get(id=task.id)
+    task.description = "Loaded"
+    task.save()
+    assert notified == []
+
+    task.due_date = timezone.now() + timedelta(days=1)
+    task.save()
+    assert notified == [task.id]
+
+    client = get_client(owner)
+    url = reverse("tasks-detail", args=[task.id])
+    client.patch(url, {"title": "Patched"}, format="json")
+    assert notified == [task.id]
+    client.patch(url, {"is_completed": True}, format="json")
+    assert notified == [task.id, task.id]
+
+
+def test_marking_overdue_invalidates_cached_task_lists(
+    create_users, create_user, django_capture_on_commit_callbacks
+):
+    owner, employee = create_users()
+    other = create_user("other")
+    now = timezone.now()
+    Task.objects.create(
+        owner=owner,
+        assigned_user=employee,
+        title="Late",
+        due_date=now + timedelta(minutes=5),
+    )
+    users = (owner, employee, other)
+    generations = [get_task_generation(user.id) for user in users]
+
+    scheduler = DueDateScheduler(lead_time=timedelta(minutes=1))
+    scheduler.start(now=now)
+    with django_capture_on_commit_callbacks(execute=True):
+        assert scheduler.run_pending(now=now + timedelta(minutes=10)) == (0, 1)
+
+    changed = [get_task_generation(user.id) != g for user, g in zip(users, generations)]
+    assert changed == [True, True, False]
+
+
+def test_run_due_date_scheduler_command_once(create_users):
+    owner, _ = create_users()
+    Task.objects.create(
+        owner=owner, title="Late", due_date=timezone.now() - timedelta(hours=2)
+    )
+
+    call_command("run_due_date_scheduler", "--once")
+
+    assert Task.objects.get(title="Late").is_overdue is True
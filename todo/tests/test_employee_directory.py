@@ -0,0 +1,88 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.directory import search_filter
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="operator classes are PostgreSQL only"
+)
+def test_directory_search_uses_the_pattern_indexes(create_user):
+    for n in range(20):
+        create_user(f"user{n}", first_name=f"Name{n}", last_name=f"Surname{n}")
+
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    plan = (
+        User.objects.filter(user_type="employee", is_active=True)
+        .filter(search_filter("nam"))
+        .explain()
+    )
+
+    assert "user_employee_first_name_idx" in plan
+    assert "user_employee_last_name_idx" in plan
+    assert "user_employee_email_idx" in plan
+
+
+def test_directory_search_and_keyset_pagination(create_user, get_client):
+    client = get_client(
+        create_user("boss", "admin", first_name="Ayse", last_name="Kaya")
+    )
+    create_user("ali", first_name="Ali", last_name="Veli")
+    create_user("alper", first_name="Alper", last_name="Demir")
+    create_user("zeynep", first_name="Zeynep", last_name="Aliyev")
+    create_user("mehmet", first_name="Mehmet", last_name="Yilmaz")
+
+    url = reverse("employee-list")
+
+    response = client.get(url, {"search": "al", "limit": 2})
+    assert response.status_code == 200
+    data = response.json()
+    assert [e["first_name"] for e in data["response"]] == ["Ali", "Alper"]
+    assert set(data["response"][0]) == {"id", "first_name", "last_name", "email"}
+    assert data["next_cursor"] is not None
+
+    response = client.get(
+        url, {"search": "al", "limit": 2, "cursor": data["next_cursor"]}
+    )
+    data = response.json()
+    assert [e["first_name"] for e in data["response"]] == ["Zeynep"]
+    assert data["next_cursor"] is None
+
+    # every word has to match a prefix
+    response = client.get(url, {"search": "ali vel"})
+    assert [e["email"] for e in response.json()["response"]] == ["ali@example.com"]
+
+
+def test_directory_is_cached_until_an_employee_changes(create_user, get_client):
+    client = get_client(
+        create_user("boss", "admin", first_name="Ayse", last_name="Kaya")
+    )
+    employee = create_user("ali", first_name="Ali", last_name="Veli")
+    url = reverse("employee-list")
+
+    client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert not any("accounts_user" in q["sql"] for q in queries.captured_queries)
+
+    employee.first_name = "Alican"
+    employee.save()
+
+    response = client.get(url)
+    assert [e["first_name"] for e in response.json()["response"]] == ["Alican"]
+
+    # an employee promoted to admin must disappear as well
+    employee = User.objects.get(id=employee.id)
+    employee.user_type = "admin"
+    employee.save()
+
+    assert client.get(url).json()["response"] == []
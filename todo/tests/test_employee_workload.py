@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from todo.models import Task
+
+pytestmark = pytest.mark.django_db
+
+
+def test_workload_is_grouped_per_assignee_and_sorted_by_load(create_user):
+    admin = create_user("admin", user_type="admin")
+    other_admin = create_user("other", user_type="admin")
+    ali = create_user("ali")
+    veli = create_user("veli")
+    now = timezone.now()
+
+    Task.objects.create(owner=admin, assigned_user=ali, title="a1")
+    Task.objects.create(
+        owner=admin, assigned_user=ali, title="a2", complete_requested=True
+    )
+    Task.objects.create(
+        owner=admin,
+        assigned_user=ali,
+        title="a3",
+        is_completed=True,
+        assigned_at=now - timedelta(hours=4),
+        completed_at=now,
+    )
+    Task.objects.create(
+        owner=admin,
+        assigned_user=veli,
+        title="v1",
+        is_completed=True,
+        assigned_at=now - timedelta(hours=2),
+        completed_at=now,
+    )
+    Task.objects.create(owner=admin, assigned_user=veli, title="gone", is_deleted=True)
+    Task.objects.create(owner=other_admin, assigned_user=veli, title="not mine")
+
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    url = reverse("employee-workload")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    # one COUNT for the paginator, one grouped aggregate for the page
+    assert len(queries.captured_queries) == 2
+
+    results = response.json()["response"]["results"]
+    assert [row["user_id"] for row in results] == [ali.id, veli.id]
+    assert results[0]["open_tasks"] == 2
+    assert results[0]["pending_tasks"] == 1
+    assert results[0]["completed_tasks"] == 1
+    assert results[0]["avg_completion_seconds"] == 4 * 3600
+    assert results[1]["open_tasks"] == 0
+    assert results[1]["avg_completion_seconds"] == 2 * 3600
+
+    response = client.get(url, {"ordering": "load"})
+    results = response.json()["response"]["results"]
+    assert [row["user_id"] for row in results] == [veli.id, ali.id]
+
+
+def test_workload_is_admin_only(create_user):
+    employee = create_user("ali")
+    client = APIClient()
+    client.force_authenticate(user=employee)
+
+    assert client.get(reverse("employee-workload")).status_code == 403
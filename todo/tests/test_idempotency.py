@@ -0,0 +1,106 @@
+import hashlib
+import threading
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.idempotency import idempotency_cache_key
+from todo.models import Task
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+def create_todo_admin():
+    return User.objects.create_user(
+        username="todoadmin",
+        email="todoadmin@example.com",
+        password="password12345",
+        user_type="todo admin",
+    )
+
+
+def test_retried_create_task_is_replayed_without_a_second_task(get_client):
+    client = get_client(create_todo_admin())
+    url = reverse("create-task")
+    payload = {"title": "Only once"}
+
+    first = client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="abc-1")
+    second = client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="abc-1")
+
+    assert first.status_code == second.status_code == 201
+    assert second["Idempotent-Replayed"] == "true"
+    assert second.json() == first.json()
+    assert Task.objects.count() == 1
+
+    # a different key is a different request
+    client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="abc-2")
+    assert Task.objects.count() == 2
+
+    # no key, no idempotency
+    client.post(url, payload, format="json")
+    assert Task.objects.count() == 3
+
+
+def test_reusing_a_key_with_another_payload_is_rejected(get_client):
+    client = get_client(create_todo_admin())
+    url = reverse("create-task")
+
+    client.post(url, {"title": "A"}, format="json", HTTP_IDEMPOTENCY_KEY="k")
+    response = client.post(url, {"title": "B"}, format="json", HTTP_IDEMPOTENCY_KEY="k")
+
+    assert response.status_code == 422
+    assert Task.objects.count() == 1
+
+
+def test_concurrent_duplicate_waits_for_the_in_flight_request(get_client):
+    user = create_todo_admin()
+    client = get_client(user)
+    url = reverse("create-task")
+    cache_key = idempotency_cache_key(user.pk, "POST", url, "slow")
+    body = b'{"title":"Slow"}'
+
+    # simulate a first request that is still running and finishes shortly
+    cache.add(f"{cache_key}:lock", 1, 60)
+    stored = {
+        "fingerprint": hashlib.sha256(body).hexdigest(),
+        "status": 201,
+        "data": {"message": "Task created successfully."},
+    }
+
+    def finish_first_request():
+        cache.set(cache_key, stored, 60)
+
+    timer = threading.Timer(0.2, finish_first_request)
+    timer.start()
+
+    response = client.post(
+        url, body, content_type="application/json", HTTP_IDEMPOTENCY_KEY="slow"
+    )
+    timer.join()
+
+    assert response.status_code == 201
+    assert response["Idempotent-Replayed"] == "true"
+    assert Task.objects.count() == 0
+
+
+def test_register_supports_idempotency_key():
+    client = APIClient()
+    url = reverse("register")
+    payload = {
+        "username": "newuser",
+        "email": "newuser@example.com",
+        "password": "password12345",
+        "first_name": "New",
+        "last_name": "User",
+    }
+
+    first = client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="reg-1")
+    second = client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="reg-1")
+
+    assert first.status_code == second.status_code == 201
+    assert User.objects.filter(username="newuser").count() == 1
@@ -0,0 +1,139 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from todo import jobs
+from todo.models import Job, Task
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def job_registry(monkeypatch):
+    # handlers registered by a test are gone after it
+    monkeypatch.setattr(jobs, "_registry", dict(jobs._registry))
+    monkeypatch.setattr(jobs, "_lock_timeouts", dict(jobs._lock_timeouts))
+
+
+def test_workflow_emails_are_sent_by_the_worker(create_users, get_client):
+    admin, employee = create_users()
+    task = Task.objects.create(owner=admin, assigned_user=employee, title="Report")
+
+    response = get_client(employee).patch(
+        reverse("task-request-complete", args=[task.id]), format="json"
+    )
+    assert response.status_code == 200
+
+    # the request only enqueues, nothing is sent yet
+    assert Job.objects.filter(name="task_workflow_email").count() == 1
+    assert len(mail.outbox) == 0
+
+    call_command("run_jobs", "--once")
+
+    assert Job.objects.count() == 0
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].to == ["admin@example.com"]
+    assert "Completion requested" in mail.outbox[0].subject
+
+    response = get_client(admin).patch(
+        reverse("task-approve-reject", args=[task.id]),
+        {"complete_requested": False, "reason": "Missing charts"},
+        format="json",
+    )
+    assert response.status_code == 200
+
+    call_command("run_jobs", "--once")
+
+    assert len(mail.outbox) == 2
+    assert mail.outbox[1].to == ["employee@example.com"]
+    assert "Missing charts" in mail.outbox[1].body
+
+
+def test_failed_job_is_retried_with_backoff_then_marked_failed():
+    calls = []
+
+    @jobs.register("test_flaky")
+    def flaky(**payload):
+        calls.append(payload)
+        raise RuntimeError("boom")
+
+    job = jobs.enqueue("test_flaky", {"value": 1}, max_attempts=2)
+    now = timezone.now()
+
+    assert jobs.run_pending_jobs(now=now) == (0, 1)
+    job.refresh_from_db()
+    assert job.status == "queued"
+    assert job.attempts == 1
+    assert job.run_at == now + jobs.backoff_delay(1)
+    assert "boom" in job.last_error
+
+    # not due yet
+    assert jobs.run_pending_jobs(now=now) == (0, 0)
+
+    assert jobs.run_pending_jobs(now=now + timedelta(hours=1)) == (0, 1)
+    job.refresh_from_db()
+    assert job.status == "failed"
+    assert job.attempts == 2
+    assert calls == [{"value": 1}, {"value": 1}]
+
+
+def test_stale_running_jobs_are_requeued():
+    @jobs.register("test_noop")
+    def noop():
+        pass
+
+    job = jobs.enqueue("test_noop")
+    Job.objects.filter(id=job.id).update(
+        status="running", locked_at=timezone.now() - jobs.LOCK_TIMEOUT * 2
+    )
+
+    assert jobs.requeue_stale_jobs() == 1
+    assert jobs.run_pending_jobs() == (1, 0)
+    assert not Job.objects.exists()
+
+
+def test_stale_jobs_without_attempts_left_are_failed():
+    @jobs.register("test_noop")
+    def noop():
+        pass
+
+    job = jobs.enqueue("test_noop", max_attempts=2)
+    Job.objects.filter(id=job.id).update(
+        status="running",
+        attempts=2,
+        locked_at=timezone.now() - jobs.LOCK_TIMEOUT * 2,
+    )
+
+    assert jobs.requeue_stale_jobs() == 1
+    job.refresh_from_db()
+    assert job.status == "failed"
+    assert job.locked_at is None
+    assert "Lock timed out" in job.last_error
+    assert jobs.run_pending_jobs() == (0, 0)
+
+
+def test_stale_timeout_is_per_job():
+    @jobs.register("test_slow", lock_timeout=jobs.LOCK_TIMEOUT * 6)
+    def slow():
+        pass
+
+    job = jobs.enqueue("test_slow")
+    Job.objects.filter(id=job.id).update(
+        status="running", locked_at=timezone.now() - jobs.LOCK_TIMEOUT * 2
+    )
+    assert jobs.requeue_stale_jobs() == 0
+
+    Job.objects.filter(id=job.id).update(
+        locked_at=timezone.now() - jobs.LOCK_TIMEOUT * 7
+    )
+    assert jobs.requeue_stale_jobs() == 1
+
+
+def test_test_handlers_are_unregistered():
+    assert "test_flaky" not in jobs._registry
+    assert "test_slow" not in jobs._lock_timeouts
+    assert "offboard_user" in jobs._registry
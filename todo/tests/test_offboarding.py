@@ -0,0 +1,211 @@
+import io
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from todo.jobs import run_pending_jobs
+from todo.list_cache import get_task_generation
+from todo.models import Job, Offboarding, Task, TaskActivity
+from todo.offboarding import purge_user
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+def counters_are_consistent():
+    out = io.StringIO()
+    call_command("reconcile_task_counters", "--check", stdout=out)
+    return "found 0 mismatch(es)" in out.getvalue()
+
+
+def test_offboarding_reassigns_open_tasks_and_purges_in_the_background(
+    create_user,
+    get_client,
+    django_capture_on_commit_callbacks,
+):
+    admin = create_user("admin", "admin")
+    todo_admin = create_user("todoadmin", "todo admin")
+    leaving = create_user("leaving", "employee")
+    successor = create_user("successor", "employee")
+
+    open_task = Task.objects.create(
+        owner=todo_admin, assigned_user=leaving, title="Open", status="pending_approval"
+    )
+    done = Task.objects.create(
+        owner=todo_admin, assigned_user=leaving, title="Done", status="completed"
+    )
+    own = Task.objects.create(owner=leaving, assigned_user=successor, title="Own")
+    call_command("reconcile_task_counters", stdout=io.StringIO())
+    generation = get_task_generation(successor.id)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = get_client(admin).post(
+            reverse("user-offboard", args=[leaving.id]),
+            {"reassign_to": successor.id},
+            format="json",
+        )
+    assert response.status_code == 202
+    assert response.json()["response"]["reassigned"] == 1
+
+    open_task.refresh_from_db()
+    assert open_task.assigned_user_id == successor.id
+    assert open_task.version == 2
+    assert Task.objects.get(id=done.id).assigned_user_id == leaving.id
+    assert get_task_generation(successor.id) != generation
+    assert counters_are_consistent()
+
+    leaving.refresh_from_db()
+    assert not leaving.is_active
+    assert leaving.is_deleted
+
+    status_url = reverse("user-offboard", args=[leaving.id])
+    offboarding = get_client(admin).get(status_url).json()["response"]
+    assert offboarding["status"] == "running"
+    assert offboarding["reassigned"] == 1
+    assert offboarding["deleted"] == 0
+
+    assert run_pending_jobs() == (1, 0)
+    assert not User.objects.filter(id=leaving.id).exists()
+    assert not Task.objects.filter(id=own.id).exists()
+    assert Task.objects.get(id=done.id).assigned_user_id is None
+    assert counters_are_consistent()
+
+    offboarding = get_client(admin).get(status_url).json()["response"]
+    assert offboarding["status"] == "done"
+    assert (offboarding["deleted"], offboarding["unassigned"]) == (1, 1)
+    assert offboarding["finished_at"] is not None
+
+
+def test_offboarding_start_is_atomic(create_user, get_client, monkeypatch):
+    admin = create_user("admin", "admin")
+    leaving = create_user("leaving", "employee")
+    successor = create_user("successor", "employee")
+    task = Task.objects.create(owner=admin, assigned_user=leaving, title="Open")
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("queue unavailable")
+
+    monkeypatch.setattr("todo.offboarding.enqueue", fail)
+    with pytest.raises(RuntimeError):
+        get_client(admin).post(
+            reverse("user-offboard", args=[leaving.id]),
+            {"reassign_to": successor.id},
+            format="json",
+        )
+
+    leaving.refresh_from_db()
+    assert leaving.is_active
+    assert Task.objects.get(id=task.id).assigned_user_id == leaving.id
+    assert not Offboarding.objects.exists()
+
+
+def test_failed_purge_is_reported(create_user, get_client, monkeypatch):
+    admin = create_user("admin", "admin")
+    leaving = create_user("leaving", "employee")
+    client = get_client(admin)
+    client.post(reverse("user-offboard", args=[leaving.id]))
+    Job.objects.update(max_attempts=1)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr("todo.offboarding.purge_user", fail)
+    assert run_pending_jobs() == (0, 1)
+
+    response = client.get(reverse("user-offboard", args=[leaving.id]))
+    offboarding = response.json()["response"]
+    assert offboarding["status"] == "failed"
+    assert offboarding["last_error"] == "RuntimeError: disk full"
+
+
+def test_owned_tasks_are_deleted_in_batches(create_user):
+    leaving = create_user("leaving", "todo admin")
+    employee = create_user("employee", "employee")
+    for n in range(5):
+        Task.objects.create(owner=leaving, assigned_user=employee, title=f"Task {n}")
+    call_command("reconcile_task_counters", stdout=io.StringIO())
+
+    progress = []
+    result = purge_user(
+        leaving.id,
+        batch_size=2,
+        progress=lambda stage, count: progress.append((stage, count)),
+    )
+
+    assert result == {"deleted": 5, "unassigned": 0}
+    assert progress == [("deleted", 2), ("deleted", 2), ("deleted", 1)]
+    assert not Task.objects.exists()
+    employee.refresh_from_db()
+    assert employee.open_assigned_tasks_count == 0
+
+
+def test_activity_log_is_detached_from_the_user_in_batches(create_user):
+    leaving = create_user("leaving", "todo admin")
+    for n in range(5):
+        TaskActivity.objects.create(task_id=n, actor=leaving, event="updated")
+
+    with CaptureQueriesContext(connection) as queries:
+        purge_user(leaving.id, batch_size=2)
+
+    batches = [
+        q["sql"]
+        for q in queries
+        if q["sql"].startswith('UPDATE "todo_taskactivity"')
+        and '"todo_taskactivity"."id" IN' in q["sql"]
+    ]
+    # the collector's own SET NULL finds nothing left
+    assert len(batches) == 3
+    assert TaskActivity.objects.filter(actor__isnull=True).count() == 5
+    assert not User.objects.filter(id=leaving.id).exists()
+
+
+def test_offboarding_is_admin_only_and_validated(create_user, get_client):
+    admin = create_user("admin", "admin")
+    employee = create_user("employee", "employee")
+    url = reverse("user-offboard", args=[employee.id])
+
+    assert get_client(employee).post(url).status_code == 403
+
+    client = get_client(admin)
+    own_url = reverse("user-offboard", args=[admin.id])
+    assert client.post(own_url).status_code == 400
+    response = client.post(url, {"reassign_to": employee.id}, format="json")
+    assert response.status_code == 400
+    assert client.post(reverse("user-offboard", args=[0])).status_code == 404
+    assert client.get(url).status_code == 404
+
+    employee.refresh_from_db()
+    assert employee.is_active
+
+
+def test_command_reports_progress(create_user):
+    leaving = create_user("leaving", "employee")
+    successor = create_user("successor", "employee")
+    owner = create_user("owner", "todo admin")
+    for n in range(3):
+        Task.objects.create(owner=owner, assigned_user=leaving, title=f"Task {n}")
+    Task.objects.create(owner=leaving, title="Own")
+
+    out = io.StringIO()
+    call_command(
+        "offboard_user",
+        str(leaving.id),
+        "--reassign-to",
+        str(successor.id),
+        "--batch-size",
+        "2",
+        stdout=out,
+    )
+
+    assert "3 task(s) reassigned" in out.getvalue()
+    assert "1 task(s) deleted" in out.getvalue()
+    assert f"User {leaving.id} offboarded: 3 task(s) reassigned" in out.getvalue()
+    assert Task.objects.filter(assigned_user=successor).count() == 3
+    offboarding = Offboarding.objects.get(user_id=leaving.id)
+    assert offboarding.status == "done"
+    assert (offboarding.reassigned, offboarding.deleted) == (3, 1)
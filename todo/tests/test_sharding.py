@@ -0,0 +1,208 @@
+import importlib
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.urls import reverse
+from django.utils import timezone
+
+from todo.models import Task
+from todo.offboarding import purge_user, reassign_open_tasks
+from todo.sharding import (
+    SHARD_ID_STRIDE,
+    get_shards,
+    is_sharded,
+    merge_sorted,
+    shard_for_owner,
+)
+
+# run with --ds=config.settings_sharded to cover the sharded paths
+pytestmark = pytest.mark.django_db(databases="__all__")
+
+sharded = pytest.mark.skipif(
+    not is_sharded(), reason="needs TASK_SHARDS with several databases"
+)
+
+user_constraints = importlib.import_module("todo.migrations.0019_task_user_constraints")
+
+User = get_user_model()
+
+
+def owners_on_every_shard(create_user):
+    owners = {}
+    n = 0
+    while len(owners) < len(get_shards()):
+        n += 1
+        user = create_user(f"owner{n}", "admin")
+        owners.setdefault(shard_for_owner(user.id), user)
+    return list(owners.values())
+
+
+def create_task(owner, title, minutes_ago, **kwargs):
+    task = Task.objects.create(owner=owner, title=title, **kwargs)
+    created_at = timezone.now() - timedelta(minutes=minutes_ago)
+    Task.objects.for_id(task.id).filter(id=task.id).update(created_at=created_at)
+    return task
+
+
+def test_merge_sorted_merges_sorted_results():
+    def rows(*values):
+        return [SimpleNamespace(a=a, b=b) for a, b in values]
+
+    first = rows((9, 1), (5, 1), (1, 1))
+    second = rows((8, 2), (5, 2), (2, 2))
+
+    merged = merge_sorted([first, second], ("-a",), limit=4)
+    assert [row.a for row in merged] == [9, 8, 5, 5]
+
+    merged = merge_sorted([first, second], ("-a", "b"))
+    assert [(row.a, row.b) for row in merged] == [
+        (9, 1),
+        (8, 2),
+        (5, 1),
+        (5, 2),
+        (2, 2),
+        (1, 1),
+    ]
+
+
+@sharded
+def test_tasks_are_stored_on_the_owners_shard(create_user):
+    for owner in owners_on_every_shard(create_user):
+        shard = shard_for_owner(owner.id)
+        task = Task.objects.create(owner=owner, title="Draft")
+
+        assert task._state.db == shard
+        assert get_shards()[task.id % SHARD_ID_STRIDE] == shard
+        assert Task.objects.using(shard).filter(id=task.id).exists()
+        assert Task.objects.for_id(task.id).get(id=task.id).owner == owner
+
+    assert not Task.objects.using("default").exists()
+
+
+@sharded
+def test_admin_task_list_is_merged_across_shards(create_user, get_client):
+    first, second = owners_on_every_shard(create_user)[:2]
+    create_task(first, "a", minutes_ago=50)
+    create_task(second, "b", minutes_ago=40)
+    create_task(first, "c", minutes_ago=30)
+    create_task(second, "d", minutes_ago=20)
+
+    client = get_client(first)
+    response = client.get(reverse("tasks-list"))
+    titles = [task["title"] for task in response.json()["response"]]
+    assert titles == ["d", "c", "b", "a"]
+
+    response = client.get(reverse("tasks-list"), {"limit": 3})
+    titles = [task["title"] for task in response.json()["response"]]
+    assert titles == ["d", "c", "b"]
+
+
+@sharded
+def test_assignee_sees_tasks_from_every_shard(create_user, get_client):
+    first, second = owners_on_every_shard(create_user)[:2]
+    employee = create_user("employee", "employee")
+    create_task(first, "first", minutes_ago=20, assigned_user=employee)
+    create_task(second, "second", minutes_ago=10, assigned_user=employee)
+    create_task(second, "not mine", minutes_ago=5)
+
+    response = get_client(employee).get(reverse("tasks-list"))
+    titles = [task["title"] for task in response.json()["response"]]
+    assert titles == ["second", "first"]
+
+
+@sharded
+def test_task_workflow_on_a_shard(
+    create_user, get_client, django_capture_on_commit_callbacks
+):
+    owner = owners_on_every_shard(create_user)[-1]
+    employee = create_user("employee", "employee")
+    task = Task.objects.create(owner=owner, assigned_user=employee, title="Draft")
+    owner_client = get_client(owner)
+    url = reverse("tasks-detail", args=[task.id])
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = owner_client.patch(
+            url, {"title": "Final"}, format="json", HTTP_IF_MATCH='"1"'
+        )
+    assert response.status_code == 200
+    assert owner_client.get(url).json()["response"]["title"] == "Final"
+
+    response = get_client(employee).patch(
+        reverse("task-request-complete", args=[task.id]), format="json"
+    )
+    assert response.status_code == 200
+
+    response = owner_client.patch(
+        reverse("task-approve-reject", args=[task.id]),
+        {"is_completed": True},
+        format="json",
+    )
+    assert response.status_code == 200
+
+    task = Task.objects.for_id(task.id).get(id=task.id)
+    assert task.status == "completed"
+    assert task.version == 4
+    employee.refresh_from_db()
+    assert employee.completed_tasks_count == 1
+
+
+@sharded
+def test_offboarding_reaches_every_shard(create_user):
+    owners = owners_on_every_shard(create_user)
+    leaving = create_user("leaving", "employee")
+    successor = create_user("successor", "employee")
+    tasks = [
+        create_task(owner, f"Task {n}", n, assigned_user=leaving)
+        for n, owner in enumerate(owners)
+    ]
+    own = create_task(leaving, "Own", 0)
+
+    assert reassign_open_tasks(leaving.id, successor.id) == len(owners)
+    assert purge_user(leaving.id) == {"deleted": 1, "unassigned": 0}
+
+    for task in tasks:
+        task = Task.objects.for_id(task.id).get(id=task.id)
+        assert task.assigned_user_id == successor.id
+    assert not Task.objects.for_id(own.id).filter(id=own.id).exists()
+    assert not User.objects.filter(id=leaving.id).exists()
+
+
+def task_user_foreign_keys(alias):
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, Task._meta.db_table
+        )
+    return sorted(
+        column
+        for constraint in constraints.values()
+        if constraint["foreign_key"]
+        for column in constraint["columns"]
+    )
+
+
+def test_user_constraints_are_only_dropped_on_shards():
+    for alias in get_shards():
+        expected = [] if is_sharded() else ["assigned_user_id", "owner_id"]
+        assert task_user_foreign_keys(alias) == expected
+
+
+@pytest.mark.skipif(is_sharded(), reason="constraints are only added unsharded")
+def test_orphaned_tasks_are_removed(create_user):
+    owner = create_user("owner", "admin")
+    assignee = create_user("assignee", "employee")
+    kept = Task.objects.create(owner=owner, assigned_user=assignee, title="Kept")
+    # users deleted while the constraints were missing
+    orphan = Task.objects.create(owner_id=owner.id + 1000, title="Orphan")
+    unassigned = Task.objects.create(
+        owner=owner, assigned_user_id=assignee.id + 1000, title="Unassigned"
+    )
+
+    assert user_constraints.remove_orphans(Task, User) == (1, 1)
+
+    assert Task.objects.get(id=kept.id).assigned_user_id == assignee.id
+    assert not Task.objects.filter(id=orphan.id).exists()
+    assert Task.objects.get(id=unassigned.id).assigned_user_id is None
@@ -0,0 +1,106 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from todo.activity import activity_batch
+from todo.models import Task, TaskActivity
+from todo.signals import TASK_UPDATED, send_task_event
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+def test_task_workflow_is_recorded_and_paged(create_user, get_client):
+    admin = create_user("admin", "admin", first_name="Admin", last_name="User")
+    employee = create_user("employee", "employee")
+    task = Task.objects.create(owner=admin, assigned_user=employee, title="Report")
+    admin_client = get_client(admin)
+    employee_client = get_client(employee)
+
+    admin_client.patch(
+        reverse("tasks-detail", args=[task.id]), {"title": "Q3"}, format="json"
+    )
+    employee_client.patch(reverse("task-request-complete", args=[task.id]))
+    admin_client.patch(
+        reverse("task-approve-reject", args=[task.id]),
+        {"complete_requested": False, "reason": "Missing numbers"},
+        format="json",
+    )
+
+    url = reverse("task-history", args=[task.id])
+    response = employee_client.get(url, {"limit": 2})
+    assert response.status_code == 200
+    page = response.json()["response"]
+    assert [entry["event"] for entry in page["results"]] == [
+        "rejected",
+        "completion_requested",
+    ]
+    assert page["results"][0]["actor"] == admin.id
+    assert page["results"][0]["actor_name"] == "Admin User"
+    assert page["results"][0]["details"] == {"reason": "Missing numbers"}
+    assert page["has_more"]
+
+    page = employee_client.get(url, {"limit": 2, "cursor": page["cursor"]}).json()
+    page = page["response"]
+    assert [entry["event"] for entry in page["results"]] == ["updated"]
+    assert page["results"][0]["details"]["title"] == ["Report", "Q3"]
+    assert not page["has_more"]
+    assert page["cursor"] is None
+
+
+def test_entries_are_written_in_the_transaction_in_one_insert(create_user):
+    admin = create_user("admin", "admin")
+    task = Task.objects.create(owner=admin, title="Report")
+
+    with pytest.raises(RuntimeError):
+        with transaction.atomic(), activity_batch():
+            send_task_event(task, TASK_UPDATED, admin)
+            raise RuntimeError
+    assert not TaskActivity.objects.exists()
+
+    with transaction.atomic():
+        with CaptureQueriesContext(connection) as queries:
+            with activity_batch():
+                with activity_batch():
+                    send_task_event(task, TASK_UPDATED, admin)
+                for _ in range(2):
+                    send_task_event(task, TASK_UPDATED, admin)
+                assert not TaskActivity.objects.exists()
+        assert TaskActivity.objects.count() == 3
+    inserts = [q for q in queries if q["sql"].startswith("INSERT")]
+    assert len(inserts) == 1
+
+
+def test_failed_activity_write_rolls_the_change_back(
+    create_user, get_client, monkeypatch
+):
+    admin = create_user("admin", "admin")
+    task = Task.objects.create(owner=admin, title="Report")
+
+    def fail(entries):
+        raise DatabaseError("disk full")
+
+    monkeypatch.setattr("todo.activity._write", fail)
+    with pytest.raises(DatabaseError):
+        get_client(admin).patch(
+            reverse("tasks-detail", args=[task.id]), {"title": "Q3"}, format="json"
+        )
+
+    task.refresh_from_db()
+    assert task.title == "Report"
+
+
+def test_history_is_only_shown_to_people_involved(create_user, get_client):
+    admin = create_user("admin", "admin")
+    owner = create_user("owner", "todo admin")
+    stranger = create_user("stranger", "employee")
+    task = Task.objects.create(owner=owner, title="Report")
+    url = reverse("task-history", args=[task.id])
+
+    assert get_client(stranger).get(url).status_code == 404
+    assert get_client(owner).get(url).status_code == 200
+    assert get_client(admin).get(url).status_code == 200
+    assert get_client(owner).get(url, {"cursor": "nope"}).status_code == 400
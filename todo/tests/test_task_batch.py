@@ -0,0 +1,56 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from todo.models import Task
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+def create_admin(username):
+    return User.objects.create_user(
+        username=username,
+        email=f"{username}@example.com",
+        password="password12345",
+        user_type="admin",
+    )
+
+
+def test_batch_returns_visible_tasks_in_one_query(get_client):
+    admin = create_admin("admin")
+    other = create_admin("other")
+    mine = [Task.objects.create(owner=admin, title=f"t{i}") for i in range(3)]
+    deleted = Task.objects.create(owner=admin, title="gone", is_deleted=True)
+    foreign = Task.objects.create(owner=other, title="foreign")
+
+    ids = [mine[2].id, foreign.id, mine[0].id, 999999, deleted.id, mine[1].id]
+    client = get_client(admin)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("tasks-batch"), {"ids": ",".join(map(str, ids))})
+
+    assert response.status_code == 200
+    body = response.json()["response"]
+    assert [task["id"] for task in body["tasks"]] == [
+        mine[2].id,
+        mine[0].id,
+        mine[1].id,
+    ]
+    assert body["tasks"][0]["task_owner"] == " "
+    assert body["not_found"] == [foreign.id, 999999, deleted.id]
+
+    task_queries = [q for q in queries if '"todo_task"' in q["sql"]]
+    assert len(task_queries) == 1
+
+
+def test_batch_validates_ids(get_client):
+    client = get_client(create_admin("admin"))
+    url = reverse("tasks-batch")
+
+    assert client.get(url).status_code == 400
+    assert client.get(url, {"ids": "1,x"}).status_code == 400
+    too_many = ",".join(str(i) for i in range(1, 102))
+    assert client.get(url, {"ids": too_many}).status_code == 400
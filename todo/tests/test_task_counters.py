@@ -0,0 +1,76 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from todo.counters import COUNTER_FIELDS
+from todo.models import Task
+
+pytestmark = pytest.mark.django_db
+
+
+def counters(user):
+    user.refresh_from_db()
+    return tuple(getattr(user, field) for field in COUNTER_FIELDS)
+
+
+def test_counters_follow_the_task_workflow(create_user, get_client):
+    todo_admin = create_user("todoadmin", "todo admin")
+    admin = create_user("admin", "admin")
+    employee = create_user("employee", "employee")
+
+    # (open, pending, completed, overdue)
+    response = get_client(todo_admin).post(
+        reverse("create-task"),
+        {"title": "Created", "assigned_user": employee.id},
+        format="json",
+    )
+    assert response.status_code == 201
+    assert counters(employee) == (1, 0, 0, 0)
+
+    task = Task.objects.create(owner=admin, assigned_user=employee, title="Report")
+    employee.open_assigned_tasks_count += 1
+    employee.save()
+
+    get_client(employee).patch(reverse("task-request-complete", args=[task.id]))
+    assert counters(employee) == (2, 1, 0, 0)
+
+    get_client(admin).patch(
+        reverse("task-approve-reject", args=[task.id]),
+        {"complete_requested": False, "reason": "Not yet"},
+        format="json",
+    )
+    assert counters(employee) == (2, 0, 0, 0)
+
+    get_client(employee).patch(reverse("task-request-complete", args=[task.id]))
+    get_client(admin).patch(
+        reverse("task-approve-reject", args=[task.id]),
+        {"is_completed": True},
+        format="json",
+    )
+    assert counters(employee) == (1, 0, 1, 0)
+
+    get_client(admin).patch(
+        reverse("tasks-detail", args=[task.id]), {"is_deleted": True}, format="json"
+    )
+    assert counters(employee) == (1, 0, 0, 0)
+
+
+def test_reconcile_command_fixes_drifted_counters(create_user):
+    admin = create_user("admin", "admin")
+    employee = create_user("employee", "employee")
+    Task.objects.create(owner=admin, assigned_user=employee, title="Open")
+    Task.objects.create(
+        owner=admin, assigned_user=employee, title="Late", is_overdue=True
+    )
+    Task.objects.create(
+        owner=admin, assigned_user=employee, title="Done", is_completed=True
+    )
+    Task.objects.create(
+        owner=admin, assigned_user=employee, title="Gone", is_deleted=True
+    )
+
+    call_command("reconcile_task_counters", "--check", "--batch-size", "1")
+    assert counters(employee) == (0, 0, 0, 0)
+
+    call_command("reconcile_task_counters", "--batch-size", "1")
+    assert counters(employee) == (2, 0, 1, 1)
@@ -0,0 +1,90 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from todo.detail_cache import task_detail_cache
+from todo.models import Task
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def empty_local_tier():
+    task_detail_cache.local.clear()
+    task_detail_cache.reset_stats()
+
+
+def create_admin(username):
+    return User.objects.create_user(
+        username=username,
+        email=f"{username}@example.com",
+        password="password12345",
+        user_type="admin",
+    )
+
+
+def test_detail_is_served_from_cache_and_invalidated_by_writes(
+    get_client,
+    django_capture_on_commit_callbacks,
+):
+    admin = create_admin("admin")
+    task = Task.objects.create(owner=admin, title="Draft")
+    client = get_client(admin)
+    url = reverse("tasks-detail", args=[task.id])
+
+    assert client.get(url).json()["response"]["title"] == "Draft"
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.json()["response"]["title"] == "Draft"
+    assert response["ETag"] == '"1"'
+    assert not [q for q in queries if '"todo_task"' in q["sql"]]
+
+    # another process only has the shared tier
+    task_detail_cache.local.clear()
+    assert client.get(url).status_code == 200
+
+    stats = task_detail_cache.stats()
+    assert (stats["misses"], stats["local_hits"], stats["shared_hits"]) == (1, 1, 1)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.patch(url, {"title": "Final"}, format="json")
+    response = client.get(url)
+    assert response.json()["response"]["title"] == "Final"
+    assert response["ETag"] == '"2"'
+
+    response = client.get(reverse("cache-stats"))
+    assert response.json()["response"]["task_detail"]["misses"] == 2
+
+
+def test_stale_stamp_hides_local_entries_of_other_processes(
+    get_client,
+    django_capture_on_commit_callbacks,
+):
+    admin = create_admin("admin")
+    task = Task.objects.create(owner=admin, title="Draft")
+    client = get_client(admin)
+    url = reverse("tasks-detail", args=[task.id])
+    client.get(url)
+
+    # a write in another process only bumps the shared stamp
+    local_entry = task_detail_cache.local.get(task.id)
+    Task.objects.filter(id=task.id).update(title="Elsewhere")
+    with django_capture_on_commit_callbacks(execute=True):
+        task_detail_cache.invalidate(task.id)
+    task_detail_cache.local.set(task.id, local_entry)
+
+    assert client.get(url).json()["response"]["title"] == "Elsewhere"
+
+
+def test_cached_detail_still_checks_the_owner(get_client):
+    admin = create_admin("admin")
+    other = create_admin("other")
+    task = Task.objects.create(owner=admin, title="Private")
+    url = reverse("tasks-detail", args=[task.id])
+
+    assert get_client(admin).get(url).status_code == 200
+    assert get_client(other).get(url).status_code == 404
@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from todo.events import InMemoryBroker, get_broker
+from todo.models import Task
+from todo.sse import STREAM_PATH, TaskEventStream
+
+pytestmark = pytest.mark.django_db
+
+
+def make_scope(headers=(), query_string=b""):
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": STREAM_PATH,
+        "headers": list(headers),
+        "query_string": query_string,
+    }
+
+
+def test_in_memory_broker_delivers_only_to_recipients():
+    broker = InMemoryBroker()
+
+    async def scenario():
+        first = broker.subscribe(1)
+        second = broker.subscribe(2)
+
+        assert broker.publish([1], {"event": "created"}) == 1
+        assert await asyncio.wait_for(first.get(), 1) == {"event": "created"}
+        assert second._queue.empty()
+
+        first.close()
+        second.close()
+        assert broker.subscriber_count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_stream_requires_a_valid_token():
+    sent = []
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    async_to_sync(TaskEventStream())(
+        make_scope(query_string=b"token=invalid"), receive, send
+    )
+
+    assert sent[0]["status"] == 401
+
+
+def test_stream_pushes_events_until_disconnect(create_users):
+    _, employee = create_users()
+    token = str(AccessToken.for_user(employee)).encode()
+    broker = get_broker()
+    sent = []
+
+    async def scenario():
+        disconnect = asyncio.Event()
+
+        async def receive():
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = make_scope(headers=[(b"authorization", b"Bearer " + token)])
+        stream = asyncio.ensure_future(TaskEventStream()(scope, receive, send))
+
+        while broker.subscriber_count() == 0:
+            await asyncio.sleep(0.01)
+
+        broker.publish([employee.id], {"event": "approved", "task": {"id": 7}})
+        while len(sent) < 3:
+            await asyncio.sleep(0.01)
+
+        disconnect.set()
+        await asyncio.wait_for(stream, 1)
+
+    async_to_sync(scenario)()
+
+    assert sent[0]["status"] == 200
+    assert (b"content-type", b"text/event-stream") in sent[0]["headers"]
+    body = sent[2]["body"].decode()
+    assert body.startswith("event: task.approved\n")
+    assert json.loads(body.split("data: ")[1])["task"]["id"] == 7
+    assert broker.subscriber_count() == 0
+
+
+def test_workflow_views_publish_to_owner_and_assignee(
+    create_users, monkeypatch, django_capture_on_commit_callbacks
+):
+    admin, employee = create_users()
+    task = Task.objects.create(owner=admin, assigned_user=employee, title="Report")
+    published = []
+    monkeypatch.setattr(
+        get_broker(), "publish", lambda users, event: published.append((users, event))
+    )
+
+    client = APIClient()
+    client.force_authenticate(user=employee)
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.patch(
+            reverse("task-request-complete", args=[task.id]), format="json"
+        )
+    assert response.status_code == 200
+
+    assert len(published) == 1
+    users, event = published[0]
+    assert users == {admin.id, employee.id}
+    assert event["event"] == "completion_requested"
+    assert event["task"]["complete_requested"] is True
@@ -0,0 +1,67 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from todo.models import Task
+
+pytestmark = pytest.mark.django_db
+
+
+def titles(response):
+    return [task["title"] for task in response.json()["response"]]
+
+
+def test_task_list_is_cached_until_a_task_of_the_user_changes(
+    create_user,
+    get_client,
+    django_capture_on_commit_callbacks,
+):
+    employee = create_user("employee")
+    boss = create_user("boss", "todo admin")
+    client = get_client(employee)
+    url = reverse("tasks-list")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Task.objects.create(owner=boss, assigned_user=employee, title="first")
+
+    assert titles(client.get(url, {"is_completed": "no"})) == ["first"]
+    with CaptureQueriesContext(connection) as queries:
+        # same filter, spelled differently
+        response = client.get(url, {"is_completed": "False"})
+    assert titles(response) == ["first"]
+    assert not [q for q in queries if '"todo_task"' in q["sql"]]
+
+    # somebody else's task doesn't touch the employee's lists
+    with django_capture_on_commit_callbacks(execute=True):
+        Task.objects.create(owner=boss, title="unrelated")
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url, {"is_completed": "false"})
+    assert not [q for q in queries if '"todo_task"' in q["sql"]]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Task.objects.create(owner=boss, assigned_user=employee, title="second")
+    assert titles(client.get(url, {"is_completed": "false"})) == ["second", "first"]
+
+
+def test_admin_lists_are_invalidated_by_any_task_change(
+    create_user,
+    get_client,
+    django_capture_on_commit_callbacks,
+):
+    admin = create_user("admin", "admin")
+    boss = create_user("boss", "todo admin")
+    client = get_client(admin)
+    url = reverse("tasks-list")
+
+    assert titles(client.get(url)) == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Task.objects.create(owner=boss, title="new")
+    assert titles(client.get(url)) == ["new"]
+
+    # patch writes with update() and is picked up through the task event
+    own = Task.objects.create(owner=admin, title="own")
+    with django_capture_on_commit_callbacks(execute=True):
+        client.patch(reverse("tasks-detail", args=[own.id]), {"title": "renamed"})
+    assert titles(client.get(url)) == ["renamed", "new"]
@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from todo.models import RollupWatermark, Task, TaskDailyRollup
+from todo.rollups import BACKFILL_WATERMARK
+
+pytestmark = pytest.mark.django_db
+
+
+def test_workflow_views_update_todays_rollup_and_trend_reads_it(
+    create_user, get_client
+):
+    admin = create_user("admin", "admin")
+    employee = create_user("employee", "employee")
+    task = Task.objects.create(owner=admin, assigned_user=employee, title="Report")
+
+    get_client(employee).patch(reverse("task-request-complete", args=[task.id]))
+    get_client(admin).patch(
+        reverse("task-approve-reject", args=[task.id]),
+        {"complete_requested": False, "reason": "Not yet"},
+        format="json",
+    )
+    get_client(employee).patch(reverse("task-request-complete", args=[task.id]))
+    get_client(admin).patch(
+        reverse("task-approve-reject", args=[task.id]),
+        {"is_completed": True},
+        format="json",
+    )
+
+    rollup = TaskDailyRollup.objects.get(owner=admin)
+    assert rollup.day == timezone.now().date()
+    assert rollup.completion_requested_count == 2
+    assert rollup.rejected_count == 1
+    assert rollup.approved_count == 1
+
+    today = timezone.now().date()
+    response = get_client(admin).get(
+        reverse("task-trends"),
+        {"start": str(today - timedelta(days=2)), "end": str(today)},
+    )
+    assert response.status_code == 200
+    trend = response.json()["response"]
+    assert [row["day"] for row in trend] == [
+        str(today - timedelta(days=2)),
+        str(today - timedelta(days=1)),
+        str(today),
+    ]
+    assert trend[0]["approved_count"] == 0
+    assert trend[2]["completion_requested_count"] == 2
+
+
+def test_trend_rejects_invalid_range(create_user, get_client):
+    admin = create_user("admin", "admin")
+    client = get_client(admin)
+
+    start = timezone.now().date() - timedelta(days=10)
+    response = client.get(reverse("task-trends"), {"start": str(start)})
+    assert response.status_code == 200
+    assert len(response.json()["response"]) == 11
+
+    response = client.get(reverse("task-trends"), {"start": "2020-01-01"})
+    assert response.status_code == 400
+
+    response = client.get(reverse("task-trends"), {"start": "yesterday"})
+    assert response.status_code == 400
+
+    response = client.get(
+        reverse("task-trends"), {"start": "2025-03-01", "end": "2025-01-01"}
+    )
+    assert response.status_code == 400
+
+
+def test_backfill_counts_existing_tasks_in_chunks(create_user):
+    admin = create_user("admin", "admin")
+    now = timezone.now()
+    two_days_ago = now - timedelta(days=2)
+
+    tasks = [Task.objects.create(owner=admin, title=f"t{i}") for i in range(5)]
+    Task.objects.filter(id__in=[t.id for t in tasks[:3]]).update(
+        created_at=two_days_ago
+    )
+    Task.objects.filter(id=tasks[0].id).update(
+        status="completed", completed_at=now - timedelta(days=1)
+    )
+    RollupWatermark.objects.update_or_create(
+        name=BACKFILL_WATERMARK,
+        defaults={"position": 0, "until_id": tasks[-1].id, "until_time": now},
+    )
+
+    call_command("backfill_task_rollups", "--chunk-size", "2")
+
+    rows = {row.day: row for row in TaskDailyRollup.objects.filter(owner=admin)}
+    assert rows[two_days_ago.date()].created_count == 3
+    assert rows[now.date()].created_count == 2
+    assert rows[(now - timedelta(days=1)).date()].approved_count == 1
+
+    # running it again is a no-op
+    call_command("backfill_task_rollups")
+    assert TaskDailyRollup.objects.get(owner=admin, day=now.date()).created_count == 2
@@ -0,0 +1,61 @@
+import pytest
+from django.urls import reverse
+
+from todo.models import Task
+
+pytestmark = pytest.mark.django_db
+
+
+def test_boolean_attributes_are_computed_from_status(create_user):
+    admin = create_user("admin", "admin")
+
+    task = Task.objects.create(owner=admin, title="t", complete_requested=True)
+    assert task.status == "pending_approval"
+    assert (task.is_completed, task.complete_requested, task.is_deleted) == (
+        False,
+        True,
+        False,
+    )
+
+    task.is_completed = True
+    assert task.status == "completed"
+    assert not task.complete_requested
+
+    task.is_deleted = True
+    assert task.status == "deleted"
+    task.is_completed = False
+    assert task.status == "deleted"
+
+
+def test_workflow_moves_task_through_statuses(create_user, get_client):
+    admin = create_user("admin", "admin")
+    employee = create_user("employee", "employee")
+    task = Task.objects.create(owner=admin, assigned_user=employee, title="Report")
+    approve_url = reverse("task-approve-reject", args=[task.id])
+    request_url = reverse("task-request-complete", args=[task.id])
+
+    get_client(employee).patch(request_url)
+    task.refresh_from_db()
+    assert task.status == "pending_approval"
+
+    get_client(admin).patch(
+        approve_url, {"complete_requested": False, "reason": "No"}, format="json"
+    )
+    task.refresh_from_db()
+    assert task.status == "rejected"
+
+    response = get_client(admin).get(reverse("dashboard"), {"is_rejected": "true"})
+    assert [row["id"] for row in response.json()["response"]] == [task.id]
+
+    get_client(admin).patch(approve_url, {"is_completed": True}, format="json")
+    task.refresh_from_db()
+    assert task.status == "completed"
+
+    # a completed task can't be sent for approval again
+    response = get_client(employee).patch(request_url)
+    assert response.status_code == 400
+
+    response = get_client(admin).get(reverse("tasks-list"))
+    row = response.json()["response"][0]
+    assert row["status"] == "completed"
+    assert row["is_completed"] is True
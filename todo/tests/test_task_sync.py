@@ -0,0 +1,133 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+
+from todo.models import Task
+from todo.offboarding import purge_user, reassign_open_tasks
+
+pytestmark = pytest.mark.django_db
+
+
+def sync(client, **params):
+    response = client.get(reverse("tasks-sync"), params)
+    assert response.status_code == 200
+    return response.json()["response"]
+
+
+def test_sync_returns_changes_and_tombstones_after_cursor(create_user, get_client):
+    admin = create_user("admin", "admin")
+    employee = create_user("employee", "employee")
+    other = create_user("other", "employee")
+
+    first = Task.objects.create(owner=admin, assigned_user=employee, title="First")
+    second = Task.objects.create(owner=admin, assigned_user=employee, title="Second")
+    Task.objects.create(owner=admin, assigned_user=other, title="Not mine")
+
+    client = get_client(employee)
+
+    page = sync(client, limit=1)
+    assert [task["title"] for task in page["tasks"]] == ["First"]
+    assert page["has_more"] is True
+
+    page = sync(client, cursor=page["cursor"])
+    assert [task["title"] for task in page["tasks"]] == ["Second"]
+    assert page["has_more"] is False
+    cursor = page["cursor"]
+
+    # nothing changed: the overlap window is re-read but nothing is repeated
+    page = sync(client, cursor=cursor)
+    assert page["tasks"] == page["deleted"] == []
+    assert page["cursor"] == cursor
+
+    first.title = "First (edited)"
+    first.save()
+    response = get_client(admin).patch(
+        reverse("tasks-detail", args=[second.id]), {"is_deleted": True}, format="json"
+    )
+    assert response.status_code == 200
+
+    page = sync(client, cursor=cursor)
+    assert [task["title"] for task in page["tasks"]] == ["First (edited)"]
+    assert page["deleted"] == [second.id]
+    assert page["cursor"] != cursor
+
+
+def test_sync_returns_rows_committed_behind_the_cursor(create_user, get_client):
+    admin = create_user("admin", "admin")
+    employee = create_user("employee", "employee")
+    client = get_client(employee)
+
+    seen = Task.objects.create(owner=admin, assigned_user=employee, title="Seen")
+    cursor = sync(client)["cursor"]
+
+    # a transaction that started before `seen` was written commits only now
+    late = Task.objects.create(owner=admin, assigned_user=employee, title="Late")
+    Task.objects.filter(id=late.id).update(
+        updated_at=seen.updated_at - timedelta(seconds=10)
+    )
+
+    page = sync(client, cursor=cursor)
+    assert [task["title"] for task in page["tasks"]] == ["Late"]
+    assert page["has_more"] is False
+
+    page = sync(client, cursor=page["cursor"])
+    assert page["tasks"] == []
+
+
+def test_sync_returns_tombstones_for_offboarded_tasks(create_user, get_client):
+    admin = create_user("admin", "admin")
+    leaving = create_user("leaving", "todo admin")
+    successor = create_user("successor", "employee")
+    employee = create_user("employee", "employee")
+
+    purged = Task.objects.create(owner=leaving, assigned_user=employee, title="P")
+    reassigned = Task.objects.create(owner=admin, assigned_user=employee, title="R")
+    kept = Task.objects.create(owner=employee, assigned_user=employee, title="K")
+
+    client = get_client(employee)
+    admin_client = get_client(admin)
+    cursor = sync(client)["cursor"]
+    admin_cursor = sync(admin_client)["cursor"]
+
+    reassign_open_tasks(employee.id, successor.id)
+    purge_user(leaving.id)
+
+    page = sync(client, cursor=cursor)
+    # the owner still sees `kept`, only the assignment changed
+    assert [task["id"] for task in page["tasks"]] == [kept.id]
+    assert page["deleted"] == sorted([purged.id, reassigned.id])
+
+    page = sync(client, cursor=page["cursor"])
+    assert page["tasks"] == page["deleted"] == []
+
+    page = sync(admin_client, cursor=admin_cursor)
+    assert page["deleted"] == [purged.id]
+
+
+def test_sync_pages_through_tombstones(create_user, get_client):
+    admin = create_user("admin", "admin")
+    leaving = create_user("leaving", "todo admin")
+    purged = [
+        Task.objects.create(owner=leaving, title=f"Task {n}").id for n in range(3)
+    ]
+
+    client = get_client(admin)
+    cursor = sync(client)["cursor"]
+    purge_user(leaving.id)
+
+    deleted = []
+    for _ in range(3):
+        page = sync(client, cursor=cursor, limit=2)
+        deleted += page["deleted"]
+        cursor = page["cursor"]
+    assert sorted(deleted) == purged
+    assert page["has_more"] is False
+
+
+def test_sync_rejects_malformed_cursor(create_user, get_client):
+    employee = create_user("employee", "employee")
+
+    response = get_client(employee).get(reverse("tasks-sync"), {"cursor": "nope"})
+
+    assert response.status_code == 400
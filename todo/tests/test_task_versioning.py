@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from todo.models import Task
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+def create_admin():
+    return User.objects.create_user(
+        username="admin",
+        email="admin@example.com",
+        password="password12345",
+        user_type="admin",
+    )
+
+
+def test_stale_if_match_is_rejected_with_412(get_client):
+    admin = create_admin()
+    task = Task.objects.create(owner=admin, title="Draft", description="long text")
+    client = get_client(admin)
+    url = reverse("tasks-detail", args=[task.id])
+
+    etag = client.get(url)["ETag"]
+    assert etag == '"1"'
+
+    first = client.patch(url, {"title": "Mine"}, format="json", HTTP_IF_MATCH=etag)
+    assert first.status_code == 200
+    assert first["ETag"] == '"2"'
+    assert first.json()["response"]["version"] == 2
+
+    # a second editor still holding the old version
+    second = client.patch(url, {"title": "Theirs"}, format="json", HTTP_IF_MATCH=etag)
+    assert second.status_code == 412
+    assert second.json()["version"] == 2
+
+    stale_body = client.patch(url, {"title": "Theirs", "version": 1}, format="json")
+    assert stale_body.status_code == 412
+
+    task.refresh_from_db()
+    assert task.title == "Mine"
+    assert task.version == 2
+
+
+def test_patch_writes_only_changed_columns(get_client):
+    admin = create_admin()
+    task = Task.objects.create(owner=admin, title="Draft", description="long text")
+    client = get_client(admin)
+    url = reverse("tasks-detail", args=[task.id])
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.patch(
+            url, {"title": "New"}, format="json", HTTP_IF_MATCH='W/"1"'
+        )
+    assert response.status_code == 200
+
+    updates = [q["sql"] for q in queries if q["sql"].startswith("UPDATE")]
+    task_updates = [sql for sql in updates if '"todo_task"' in sql]
+    assert len(task_updates) == 1
+    assert '"title"' in task_updates[0]
+    assert '"description"' not in task_updates[0]
+    assert '"version" = ' in task_updates[0]
+
+    task.refresh_from_db()
+    assert task.version == 2
+
+
+def test_invalid_if_match_is_a_bad_request(get_client):
+    admin = create_admin()
+    task = Task.objects.create(owner=admin, title="Draft")
+
+    response = get_client(admin).patch(
+        reverse("tasks-detail", args=[task.id]),
+        {"title": "New"},
+        format="json",
+        HTTP_IF_MATCH="abc",
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("version", [[1], {}, "one"])
+def test_invalid_body_version_is_a_bad_request(get_client, version):
+    admin = create_admin()
+    task = Task.objects.create(owner=admin, title="Draft")
+
+    response = get_client(admin).patch(
+        reverse("tasks-detail", args=[task.id]),
+        {"title": "New", "version": version},
+        format="json",
+    )
+    assert response.status_code == 400
+
+
+def test_unchanged_due_date_keeps_the_version_and_reminder(get_client):
+    admin = create_admin()
+    due_date = timezone.now().replace(microsecond=0) + timedelta(days=1)
+    task = Task.objects.create(
+        owner=admin, title="Draft", due_date=due_date, reminder_sent_at=timezone.now()
+    )
+    client = get_client(admin)
+    url = reverse("tasks-detail", args=[task.id])
+
+    response = client.patch(url, {"due_date": due_date.isoformat()}, format="json")
+    assert response.status_code == 200
+    task.refresh_from_db()
+    assert task.version == 1
+    assert task.reminder_sent_at is not None
+
+    later = due_date + timedelta(days=1)
+    response = client.patch(url, {"due_date": later.isoformat()}, format="json")
+    assert response.status_code == 200
+    task.refresh_from_db()
+    assert task.due_date == later
+    assert task.version == 2
+    assert task.reminder_sent_at is None
+
+    response = client.patch(url, {"due_date": "tomorrow"}, format="json")
+    assert response.status_code == 400
@@ -0,0 +1,49 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from todo.models import Task
+from todo.visibility import visible_tasks
+
+pytestmark = pytest.mark.django_db
+
+
+def test_visible_tasks_is_a_union_without_duplicates(create_user):
+    me = create_user("me", "todo admin")
+    other = create_user("other", "todo admin")
+    owned = Task.objects.create(owner=me, title="owned")
+    both = Task.objects.create(owner=me, assigned_user=me, title="both")
+    assigned = Task.objects.create(owner=other, assigned_user=me, title="assigned")
+    Task.objects.create(owner=other, title="foreign")
+    done = Task.objects.create(
+        owner=other, assigned_user=me, title="done", is_completed=True
+    )
+
+    with CaptureQueriesContext(connection) as queries:
+        tasks = list(visible_tasks(me, order_by=("-created_at",)))
+    assert [task.id for task in tasks] == [done.id, assigned.id, both.id, owned.id]
+    assert "UNION ALL" in queries[0]["sql"]
+
+    tasks = visible_tasks(me, order_by=("-created_at",), limit=2, status="open")
+    assert [task.id for task in tasks] == [assigned.id, both.id]
+
+
+def test_tasks_list_uses_visibility_rules_and_limit(create_user):
+    me = create_user("me")
+    boss = create_user("boss", "todo admin")
+    Task.objects.create(owner=boss, assigned_user=me, title="first")
+    Task.objects.create(owner=boss, assigned_user=me, title="second")
+    Task.objects.create(owner=boss, title="not mine")
+
+    client = APIClient()
+    client.force_authenticate(user=me)
+    response = client.get(reverse("tasks-list"))
+    assert [task["title"] for task in response.json()["response"]] == [
+        "second",
+        "first",
+    ]
+
+    response = client.get(reverse("tasks-list"), {"limit": 1})
+    assert [task["title"] for task in response.json()["response"]] == ["second"]
@@ -0,0 +1,146 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from core.throttling import take_tokens
+
+pytestmark = pytest.mark.django_db
+
+
+NOW = 1_000_000.5
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    # buckets refill while the tests run; only the tests move this clock
+    clock = SimpleNamespace(now=NOW)
+    monkeypatch.setattr(
+        "core.throttling.time",
+        SimpleNamespace(time=lambda: clock.now, sleep=time.sleep),
+    )
+    return clock
+
+
+@pytest.fixture
+def rates(settings):
+    def configure(**rates):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": rates,
+        }
+
+    return configure
+
+
+def test_user_read_bucket_returns_429_with_retry_after(get_client, create_user, rates):
+    rates(user_read="3/min")
+    client = get_client(create_user("employee"))
+    url = reverse("tasks-list")
+
+    assert [client.get(url).status_code for _ in range(3)] == [200, 200, 200]
+
+    response = client.get(url)
+    assert response.status_code == 429
+    assert 1 <= int(response["Retry-After"]) <= 60
+
+    # other users have their own bucket
+    assert get_client(create_user("other")).get(url).status_code == 200
+
+
+def test_reads_and_writes_use_separate_buckets(create_user, get_client, rates):
+    rates(user_read="1/min", user_write="1/min")
+    admin = create_user("todoadmin", "todo admin")
+    client = get_client(admin)
+
+    assert client.get(reverse("tasks-list")).status_code == 200
+    assert client.get(reverse("tasks-list")).status_code == 429
+
+    create = reverse("create-task")
+    assert client.post(create, {"title": "A"}, format="json").status_code == 201
+    assert client.post(create, {"title": "B"}, format="json").status_code == 429
+
+
+def test_role_bucket_is_shared_by_all_users_of_a_user_type(
+    create_user, get_client, rates
+):
+    rates(role_employee_read="2/min")
+    url = reverse("tasks-list")
+
+    assert get_client(create_user("e1")).get(url).status_code == 200
+    assert get_client(create_user("e2")).get(url).status_code == 200
+    assert get_client(create_user("e3")).get(url).status_code == 429
+
+    # admins are not in the employee bucket
+    admin = create_user("admin", "admin")
+    assert get_client(admin).get(url).status_code == 200
+
+
+def test_requests_rejected_by_the_role_bucket_keep_the_users_tokens(
+    get_client, create_user, rates
+):
+    rates(user_read="2/min", role_employee_read="1/min")
+    employee = create_user("employee")
+    client = get_client(employee)
+    url = reverse("tasks-list")
+
+    assert client.get(url).status_code == 200
+    assert client.get(url).status_code == 429
+    assert client.get(url).status_code == 429
+
+    # charged for the first request only
+    user_bucket = cache.get(f"throttle:user:{employee.pk}:read")
+    assert user_bucket == pytest.approx(NOW + 30)
+
+
+def test_buckets_refill_one_token_per_interval(clock):
+    buckets = [("throttle:a", 3, 60)]
+    assert [take_tokens(buckets) for _ in range(3)] == [0, 0, 0]
+    assert take_tokens(buckets) == pytest.approx(20)
+
+    # no second burst at a minute boundary, one token every 20 seconds
+    clock.now += 19.5
+    assert take_tokens(buckets) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert take_tokens(buckets) == 0
+    assert take_tokens(buckets) == pytest.approx(20)
+
+    clock.now += 60
+    assert [take_tokens(buckets) for _ in range(4)][-1] > 0
+
+
+def test_a_rejected_request_charges_no_bucket():
+    buckets = [("throttle:a", 1, 60), ("throttle:b", 5, 60)]
+    assert take_tokens(buckets) == 0
+    assert take_tokens(buckets) == pytest.approx(60)
+
+    tats = cache.get_many(["throttle:a", "throttle:b"])
+    assert tats == {
+        "throttle:a": pytest.approx(NOW + 60),
+        "throttle:b": pytest.approx(NOW + 12),
+    }
+    assert cache.get("throttle:a:lock") is None
+
+
+def test_buckets_wait_for_a_lock_held_by_another_worker(clock):
+    cache.add("throttle:a:lock", "other", 0.05)
+    assert take_tokens([("throttle:a", 1, 60)]) == 0
+    # the expired lock of the other worker is not released by this one
+    assert cache.get("throttle:a") == pytest.approx(NOW + 60)
+
+
+def test_redis_buckets(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    redis = fakeredis.FakeRedis()
+    monkeypatch.setattr("core.throttling._redis_client", lambda: redis)
+
+    buckets = [("throttle:a", 1, 60), ("throttle:b", 5, 60)]
+    assert take_tokens(buckets) == 0
+    assert 59 < take_tokens(buckets) <= 60
+
+    # "throttle:b" wasn't charged for the rejected request
+    assert [take_tokens(buckets[1:]) for _ in range(4)] == [0, 0, 0, 0]
+    assert 11 < take_tokens(buckets[1:]) <= 12
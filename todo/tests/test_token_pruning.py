@@ -0,0 +1,68 @@
+import io
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.tokens import prune_expired_tokens
+
+pytestmark = pytest.mark.django_db
+
+
+def issue_tokens(user, count, expires_at=None, blacklist=False):
+    tokens = [RefreshToken.for_user(user) for _ in range(count)]
+    jtis = [token["jti"] for token in tokens]
+    if blacklist:
+        for token in tokens:
+            token.blacklist()
+    if expires_at is not None:
+        OutstandingToken.objects.filter(jti__in=jtis).update(expires_at=expires_at)
+    return jtis
+
+
+def test_expired_tokens_are_deleted_in_batches(create_user):
+    user = create_user("employee")
+    expired = timezone.now() - timedelta(days=1)
+    issue_tokens(user, 3, expired)
+    issue_tokens(user, 2, expired, blacklist=True)
+    live = issue_tokens(user, 2, blacklist=True)
+
+    with CaptureQueriesContext(connection) as queries:
+        assert prune_expired_tokens(batch_size=2) == (5, 2)
+
+    deletes = [q for q in queries if q["sql"].startswith("DELETE")]
+    outstanding_deletes = [q for q in deletes if "outstandingtoken" in q["sql"]]
+    assert len(outstanding_deletes) == 3
+
+    assert set(OutstandingToken.objects.values_list("jti", flat=True)) == set(live)
+    assert BlacklistedToken.objects.count() == 2
+
+
+def test_tokens_within_the_leeway_are_kept(create_user):
+    user = create_user("employee")
+    now = timezone.now()
+    issue_tokens(user, 1, now - timedelta(seconds=30), blacklist=True)
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("accounts.tokens.api_settings.LEEWAY", 60)
+        assert prune_expired_tokens(now=now) == (0, 0)
+    assert prune_expired_tokens(now=now) == (1, 1)
+
+
+def test_command_prunes_once(create_user):
+    user = create_user("employee")
+    issue_tokens(user, 2, timezone.now() - timedelta(hours=1), blacklist=True)
+
+    out = io.StringIO()
+    call_command("prune_expired_tokens", "--once", "--pause", "0", stdout=out)
+
+    assert "2 expired token(s) deleted, 2 of them blacklisted." in out.getvalue()
+    assert not OutstandingToken.objects.exists()
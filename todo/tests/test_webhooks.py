@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import socketserver
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from core.async_http import AsyncHTTPClient
+from todo.models import WebhookEvent, WebhookSubscription
+from todo.webhooks import MAX_ATTEMPTS, SIGNATURE_HEADER, deliver_pending
+
+pytestmark = pytest.mark.django_db
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.received.append((self.headers[SIGNATURE_HEADER], body))
+        self.server.connections.add(self.client_address)
+        status = self.server.status
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def receiver():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.received = []
+    server.connections = set()
+    server.status = 200
+    server.url = f"http://127.0.0.1:{server.server_port}/hooks"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class RawHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while self.rfile.readline() not in (b"\r\n", b""):
+            pass
+        self.wfile.write(self.server.response)
+
+
+@pytest.fixture
+def broken_receiver():
+    """
+    Answers every request with the bytes in `response`.
+    """
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), RawHandler)
+    server.daemon_threads = True
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/hooks"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def subscribe(client, url, events):
+    response = client.post(
+        reverse("webhook-list"), {"url": url, "events": events}, format="json"
+    )
+    assert response.status_code == 201
+    return response.json()["response"]
+
+
+def test_task_events_are_delivered_signed_and_batched(
+    create_user, get_client, receiver
+):
+    admin = create_user("admin", "admin")
+    todo_admin = create_user("todoadmin", "todo admin")
+    employee = create_user("employee", "employee")
+    subscription = subscribe(
+        get_client(admin), receiver.url, ["created", "completion_requested", "approved"]
+    )
+    assert len(subscription["secret"]) == 64
+
+    response = get_client(todo_admin).post(
+        reverse("create-task"),
+        {"title": "Report", "assigned_user": employee.id},
+        format="json",
+    )
+    task_id = response.json()["response"]["id"]
+    get_client(employee).patch(reverse("task-request-complete", args=[task_id]))
+    # edits are not subscribed to
+    get_client(todo_admin).patch(
+        reverse("tasks-detail", args=[task_id]), {"title": "Q3"}, format="json"
+    )
+    assert WebhookEvent.objects.count() == 2
+    assert receiver.received == []
+
+    assert deliver_pending() == (2, 0)
+    assert not WebhookEvent.objects.exists()
+
+    [(signature, body)] = receiver.received
+    timestamp, digest = (part.split("=", 1)[1] for part in signature.split(","))
+    expected = hmac.new(
+        subscription["secret"].encode(),
+        f"{timestamp}.".encode() + body,
+        hashlib.sha256,
+    ).hexdigest()
+    assert hmac.compare_digest(digest, expected)
+
+    events = json.loads(body)["events"]
+    assert [event["event"] for event in events] == ["created", "completion_requested"]
+    assert events[1]["task"]["id"] == task_id
+    assert events[1]["task"]["status"] == "pending_approval"
+
+
+def test_failed_deliveries_back_off_and_give_up(create_user, get_client, receiver):
+    admin = create_user("admin", "admin")
+    subscribe(get_client(admin), receiver.url, ["created"])
+    WebhookEvent.objects.create(
+        subscription=WebhookSubscription.objects.get(),
+        event="created",
+        payload={"task": {"id": 1}},
+    )
+
+    receiver.status = 503
+    assert deliver_pending() == (0, 1)
+    subscription = WebhookSubscription.objects.get()
+    assert subscription.consecutive_failures == 1
+    assert subscription.last_error == "HTTP 503"
+    assert subscription.retry_at > timezone.now()
+
+    # backing off: nothing is due
+    assert deliver_pending() == (0, 0)
+    assert len(receiver.received) == 1
+
+    WebhookEvent.objects.update(attempts=MAX_ATTEMPTS - 1)
+    later = timezone.now() + timedelta(hours=2)
+    assert deliver_pending(now=later) == (0, 1)
+    assert WebhookEvent.objects.get().status == "failed"
+
+    receiver.status = 200
+    later += timedelta(hours=2)
+    assert deliver_pending(now=later) == (0, 0)
+
+
+def test_unreachable_endpoint_does_not_block_others(create_user, get_client, receiver):
+    admin = create_user("admin", "admin")
+    subscribe(get_client(admin), "http://127.0.0.1:9/unreachable", ["created"])
+    subscribe(get_client(admin), receiver.url, ["created"])
+
+    get_client(create_user("todoadmin", "todo admin")).post(
+        reverse("create-task"), {"title": "Report"}, format="json"
+    )
+
+    assert deliver_pending(timeout=2) == (1, 1)
+    assert len(receiver.received) == 1
+    failed = WebhookSubscription.objects.get(url__contains="unreachable")
+    assert failed.last_error.startswith(("ConnectionRefusedError", "OSError"))
+
+
+def test_http_client_reuses_connections(receiver):
+    async def post_three():
+        async with AsyncHTTPClient(max_connections=2) as client:
+            return [await client.request("POST", receiver.url, b"{}") for _ in range(3)]
+
+    assert asyncio.run(post_three()) == [(200, b"ok")] * 3
+    assert len(receiver.connections) == 1
+
+
+def test_subscriptions_are_admin_only_and_validated(create_user, get_client):
+    admin = create_user("admin", "admin")
+    employee = create_user("employee", "employee")
+    url = reverse("webhook-list")
+
+    data = {"url": "https://tickets.example.com/hooks", "events": ["created"]}
+    assert get_client(employee).post(url, data, format="json").status_code == 403
+
+    client = get_client(admin)
+    invalid = {"url": "https://tickets.example.com/hooks", "events": ["deleted"]}
+    assert client.post(url, invalid, format="json").status_code == 400
+
+    subscription = subscribe(get_client(admin), data["url"], data["events"])
+    listed = client.get(url).json()["response"]
+    assert [item["id"] for item in listed] == [subscription["id"]]
+    assert "secret" not in listed[0]
+
+    detail = reverse("webhook-detail", args=[subscription["id"]])
+    response = client.patch(detail, {"is_active": False}, format="json")
+    assert response.json()["response"]["is_active"] is False
+    assert client.delete(detail).status_code == 204
+    assert not WebhookSubscription.objects.exists()
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        b"garbage\r\n\r\n",
+        b"HTTP/1.1 200 OK\r\nContent-Length: abc\r\n\r\nok",
+        b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\nok\r\n",
+        b"HTTP/1.1 200 OK\r\n" + b"X" * 100000,
+    ],
+    ids=["status-line", "content-length", "chunk-size", "long-line"],
+)
+def test_malformed_responses_fail_only_their_endpoint(
+    create_user, get_client, receiver, broken_receiver, response
+):
+    admin = create_user("admin", "admin")
+    subscribe(get_client(admin), broken_receiver.url, ["created"])
+    subscribe(get_client(admin), receiver.url, ["created"])
+    broken_receiver.response = response
+
+    get_client(create_user("todoadmin", "todo admin")).post(
+        reverse("create-task"), {"title": "Report"}, format="json"
+    )
+
+    assert deliver_pending(timeout=2) == (1, 1)
+    assert len(receiver.received) == 1
+    broken = WebhookSubscription.objects.get(url=broken_receiver.url)
+    assert broken.last_error.startswith("HTTPError")
+    assert broken.retry_at > timezone.now()
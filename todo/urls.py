@@ -2,19 +2,31 @@ from django.urls import path
 
 from .views import (
     AdminDashboardView,
+    CacheStatsView,
     CreateTaskView,
     EmployeeUserListView,
+    EmployeeWorkloadView,
+    OffboardUserView,
     TaskApproveOrRejectView,
+    TaskBatchView,
     TaskCompleteRequestView,
     TaskDetailView,
+    TaskHistoryView,
     TasksListView,
+    TaskSyncView,
+    TaskTrendView,
+    WebhookSubscriptionDetailView,
+    WebhookSubscriptionListView,
 )
 
 urlpatterns = [
     path("employee-list/", EmployeeUserListView.as_view(), name="employee-list"),
     path("create-task/", CreateTaskView.as_view(), name="create-task"),
     path("tasks-list/", TasksListView.as_view(), name="tasks-list"),
+    path("tasks/sync/", TaskSyncView.as_view(), name="tasks-sync"),
     path("task-detail/<int:id>", TaskDetailView.as_view(), name="tasks-detail"),
+    path("tasks/batch/", TaskBatchView.as_view(), name="tasks-batch"),
+    path("tasks/<int:id>/history/", TaskHistoryView.as_view(), name="task-history"),
     path(
         "tasks/<id>/request-complete/",
         TaskCompleteRequestView.as_view(),
@@ -26,4 +38,14 @@ urlpatterns = [
         name="task-approve-reject",
     ),
     path("dashboard/", AdminDashboardView.as_view(), name="dashboard"),
+    path("workload/", EmployeeWorkloadView.as_view(), name="employee-workload"),
+    path("trends/", TaskTrendView.as_view(), name="task-trends"),
+    path("cache-stats/", CacheStatsView.as_view(), name="cache-stats"),
+    path("users/<int:id>/offboard/", OffboardUserView.as_view(), name="user-offboard"),
+    path("webhooks/", WebhookSubscriptionListView.as_view(), name="webhook-list"),
+    path(
+        "webhooks/<int:id>/",
+        WebhookSubscriptionDetailView.as_view(),
+        name="webhook-detail",
+    ),
 ]
@@ -1,40 +1,110 @@
-from django.db.models import Q
+import secrets
+from datetime import timedelta
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import (
+    Avg,
+    Count,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    Q,
+    prefetch_related_objects,
+)
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from accounts.directory import employee_directory_page
 from accounts.models import User
 from accounts.permissions import IsAdminUser, IsTododminUser
-from todo.pagination import PostPagination
-
-from .models import Task
-from .serializers import TaskSerializer
+from core.idempotency import idempotent
+from todo.pagination import CachedCountPagination, PostPagination
+
+from .counters import counter_snapshot, update_counters
+from .cursors import decode_cursor, encode_cursor
+from .detail_cache import get_task_detail, task_detail_cache, task_detail_data
+from .list_cache import cache_task_list, get_cached_task_list, task_list_cache_key
+from .models import (
+    ACTIVE_TASK_STATUSES,
+    VISIBLE_TASK_STATUSES,
+    Offboarding,
+    Task,
+    TaskActivity,
+    TaskDailyRollup,
+    WebhookSubscription,
+)
+from .offboarding import start_offboarding
+from .rollups import ROLLUP_FIELDS
+from .scheduler import notify_schedule_changed
+from .serializers import (
+    TaskSerializer,
+    TaskSyncSerializer,
+    WebhookSubscriptionSerializer,
+)
+from .sharding import shard_atomic, shard_for_owner, task_atomic
+from .signals import (
+    REMOVAL_EVENTS,
+    TASK_APPROVED,
+    TASK_COMPLETION_REQUESTED,
+    TASK_CREATED,
+    TASK_PURGED,
+    TASK_REASSIGNED,
+    TASK_REJECTED,
+    TASK_UPDATED,
+    send_task_event,
+)
+from .visibility import visible_tasks
 
 
 class EmployeeUserListView(APIView):
+    """
+    Employee directory for assignee pickers.
+    ?search= matches word prefixes of first name, last name and e-mail,
+    ?cursor= / ?limit= page through the results (keyset on id).
+    """
+
     permission_classes = [IsAuthenticated, IsAdminUser]
+    default_limit = 50
+    max_limit = 200
 
     def get(self, request, *args, **kwargs):
+        search = request.query_params.get("search", "")
 
-        employees = User.objects.filter(user_type="employee", is_active=True)
+        try:
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        limit = max(1, min(limit, self.max_limit))
+
+        after_id = None
+        cursor = request.query_params.get("cursor")
+        if cursor:
+            try:
+                (after_id,) = decode_cursor(cursor, 1)
+                after_id = int(after_id)
+            except (TypeError, ValueError):
+                return Response(
+                    {"detail": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST
+                )
 
-        employees_data = [
-            {
-                "id": emp.id,
-                "first_name": emp.first_name,
-                "last_name": emp.last_name,
-                "email": emp.email,
-            }
-            for emp in employees
-        ]
+        employees_data, has_more = employee_directory_page(
+            search=search, after_id=after_id, limit=limit
+        )
+
+        next_cursor = None
+        if has_more:
+            next_cursor = encode_cursor(employees_data[-1]["id"])
 
         return Response(
             {
                 "status": 200,
                 "message": "Employee users retrieved successfully.",
                 "response": employees_data,
+                "next_cursor": next_cursor,
             },
             status=status.HTTP_200_OK,
         )
@@ -43,6 +113,7 @@ class EmployeeUserListView(APIView):
 class CreateTaskView(APIView):
     permission_classes = [IsAuthenticated, IsTododminUser]
 
+    @idempotent
     def post(self, request, *args, **kwargs):
         title = request.data.get("title")
         description = request.data.get("description")
@@ -68,13 +139,17 @@ class CreateTaskView(APIView):
                 )
 
         # ===== CREATE TASK =====
-        task = Task.objects.create(
-            owner=request.user,
-            title=title,
-            description=description,
-            due_date=due_date,
-            assigned_user=assigned_user,
-        )
+        with shard_atomic(shard_for_owner(request.user.id)):
+            task = Task.objects.create(
+                owner=request.user,
+                title=title,
+                description=description,
+                due_date=due_date,
+                assigned_user=assigned_user,
+                assigned_at=timezone.now() if assigned_user else None,
+            )
+            update_counters(None, task)
+            send_task_event(task, TASK_CREATED, request.user)
 
         # ===== RESPONSE =====
         return Response(
@@ -107,64 +182,298 @@ class TasksListView(APIView):
     def get(self, request, *args, **kwargs):
         user = request.user
 
-        base_qs = Task.objects.filter(is_deleted=False)
+        cache_key = task_list_cache_key(user, request.query_params)
+        data = get_cached_task_list(cache_key)
+        if data is not None:
+            return Response(
+                {
+                    "status": 200,
+                    "message": "Tasks retrieved successfully.",
+                    "response": data,
+                },
+                status=status.HTTP_200_OK,
+            )
 
-        if user.user_type == "admin":
-            tasks = base_qs
-        else:
-            tasks = base_qs.filter(Q(owner=user) | Q(assigned_user=user))
+        filters = {"status__in": VISIBLE_TASK_STATUSES}
 
         is_completed_param = request.query_params.get("is_completed")
         if is_completed_param is not None:
             value = is_completed_param.lower()
             if value in ["true", "1", "yes"]:
-                tasks = tasks.filter(is_completed=True)
+                filters["status__in"] = ["completed"]
             elif value in ["false", "0", "no"]:
-                tasks = tasks.filter(is_completed=False)
+                filters["status__in"] = ACTIVE_TASK_STATUSES
 
         due_date_start = request.query_params.get("due_date_start")
         due_date_end = request.query_params.get("due_date_end")
 
         if due_date_start:
-            tasks = tasks.filter(due_date__gte=due_date_start)
+            filters["due_date__gte"] = due_date_start
         if due_date_end:
-            tasks = tasks.filter(due_date__lte=due_date_end)
+            filters["due_date__lte"] = due_date_end
 
-        tasks = tasks.order_by("-created_at")
+        # optional: only the newest `limit` tasks
+        try:
+            limit = int(request.query_params["limit"])
+        except (KeyError, ValueError):
+            limit = None
+        if limit is not None and limit < 1:
+            limit = None
+
+        tasks = list(
+            visible_tasks(user, order_by=("-created_at",), limit=limit, **filters)
+        )
+        prefetch_related_objects(tasks, "owner")
 
-        serializer = TaskSerializer(tasks, many=True)
+        data = TaskSerializer(tasks, many=True).data
+        cache_task_list(cache_key, data)
 
         return Response(
             {
                 "status": 200,
                 "message": "Tasks retrieved successfully.",
-                "response": serializer.data,
+                "response": data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class TaskSyncView(APIView):
+    """
+    Delta sync for clients that keep a local copy of their tasks.
+    Returns the tasks changed since `cursor` ordered by (updated_at, id), in
+    "deleted" the ids of tasks that left the caller's view since then
+    (soft-deleted, or reassigned away and purged by offboarding, from the
+    activity log), and the cursor for the next call. Without a cursor every
+    visible task is returned.
+
+    `updated_at` and the activity `created_at` are taken before the change
+    commits, so a slow transaction can commit a row behind a cursor that was
+    already handed out. Every sync therefore re-reads `overlap` behind the
+    cursor, which carries the `(id, timestamp)` pairs it already returned
+    from that window so that they are not sent again. Its size grows with
+    the changes of the last `overlap`.
+    """
+
+    permission_classes = [IsAuthenticated]
+    default_limit = 100
+    max_limit = 500
+    # longer than any transaction that updates tasks
+    overlap = timedelta(minutes=1)
+
+    def get(self, request, *args, **kwargs):
+        user = request.user
+
+        try:
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        limit = max(1, min(limit, self.max_limit))
+
+        cursor = request.query_params.get("cursor")
+
+        if cursor:
+            try:
+                position, seen, removed_at, seen_removals = decode_cursor(cursor, 4)
+                if position is not None:
+                    position = _parse_timestamp(position)
+                removed_at = _parse_timestamp(removed_at)
+                seen = {(int(task_id), str(at)) for task_id, at in seen}
+                seen_removals = {
+                    (int(entry_id), str(at)) for entry_id, at in seen_removals
+                }
+            except (TypeError, ValueError):
+                return Response(
+                    {"detail": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST
+                )
+
+            changes = Q()
+            if position is not None:
+                changes = Q(updated_at__gte=position - self.overlap)
+        else:
+            # first sync: tombstones are meaningless without local state
+            changes = Q(status__in=VISIBLE_TASK_STATUSES)
+            position = None
+            seen = set()
+            removed_at = timezone.now()
+            seen_removals = []
+
+        rows = visible_tasks(
+            user, changes, order_by=("updated_at", "id"), limit=limit + 1 + len(seen)
+        )
+        changed = [
+            task for task in rows if (task.id, task.updated_at.isoformat()) not in seen
+        ]
+        has_more = len(changed) > limit
+        changed = changed[:limit]
+
+        if changed:
+            position = max([changed[-1].updated_at] + ([position] if position else []))
+        seen = self._window(
+            seen | {(task.id, task.updated_at.isoformat()) for task in changed},
+            position,
+        )
+
+        removed = []
+        if cursor:
+            entries = [
+                entry
+                for entry in self._removal_entries(
+                    user, removed_at - self.overlap, limit + 1 + len(seen_removals)
+                )
+                if (entry[0], entry[2].isoformat()) not in seen_removals
+            ]
+            has_more = has_more or len(entries) > limit
+            entries = entries[:limit]
+
+            if entries:
+                removed_at = max(removed_at, entries[-1][2])
+            seen_removals = self._window(
+                seen_removals
+                | {(entry_id, at.isoformat()) for entry_id, _, at in entries},
+                removed_at,
+            )
+            removed = self._removed_task_ids(
+                user, {task_id for _, task_id, _ in entries} - {t.id for t in changed}
+            )
+
+        live = [task for task in changed if not task.is_deleted]
+        deleted = [task.id for task in changed if task.is_deleted] + removed
+
+        return Response(
+            {
+                "status": 200,
+                "message": "Tasks synced successfully.",
+                "response": {
+                    "tasks": TaskSyncSerializer(live, many=True).data,
+                    "deleted": deleted,
+                    "cursor": encode_cursor(
+                        position.isoformat() if position else None,
+                        seen,
+                        removed_at.isoformat(),
+                        seen_removals,
+                    ),
+                    "has_more": has_more,
+                },
             },
             status=status.HTTP_200_OK,
         )
 
+    def _window(self, pairs, position):
+        """
+        The `(id, timestamp)` pairs the next sync re-reads, sorted so that
+        an unchanged cursor encodes the same.
+        """
+        if position is None:
+            return []
+        start = position - self.overlap
+        return sorted(
+            [entry_id, at] for entry_id, at in pairs if _parse_timestamp(at) >= start
+        )
+
+    def _removal_entries(self, user, since, limit):
+        """
+        `(id, task_id, created_at)` of the activity entries for tasks that
+        may have left the view of `user` since `since`.
+        """
+        entries = TaskActivity.objects.filter(
+            event__in=REMOVAL_EVENTS, created_at__gte=since
+        )
+        if user.user_type == "admin":
+            # admins see every task until it is gone
+            entries = entries.filter(event=TASK_PURGED)
+        else:
+            entries = entries.filter(
+                Q(event=TASK_PURGED, details__owner=user.id)
+                | Q(event=TASK_PURGED, details__assigned_user=user.id)
+                | Q(event=TASK_REASSIGNED, details__assigned_user__0=user.id)
+            )
+        return list(
+            entries.order_by("created_at", "id").values_list(
+                "id", "task_id", "created_at"
+            )[:limit]
+        )
+
+    def _removed_task_ids(self, user, task_ids):
+        if not task_ids:
+            return []
+        # e.g. reassigned away from an owner, or back to the user since
+        still_visible = {task.id for task in visible_tasks(user, id__in=task_ids)}
+        return sorted(task_ids - still_visible)
+
+
+def _parse_timestamp(value):
+    timestamp = parse_datetime(value) if isinstance(value, str) else None
+    if timestamp is None:
+        raise ValueError(f"Invalid timestamp: {value!r}")
+    return timestamp
+
+
+def _requested_version(request):
+    """
+    Task version from If-Match (`"3"`, `W/"3"`) or the "version" body field,
+    None when the client sent neither (or `If-Match: *`).
+    """
+    if_match = request.headers.get("If-Match")
+    if if_match is not None:
+        if_match = if_match.strip()
+        if if_match == "*":
+            return None
+        if if_match.startswith("W/"):
+            if_match = if_match[2:]
+        return int(if_match.strip('"'))
+
+    version = request.data.get("version")
+    if version is None:
+        return None
+    return int(version)
+
+
+def _parse_due_date(value):
+    """
+    Aware datetime from an ISO 8601 string; naive values are in the current
+    time zone. Raises ValueError for anything else.
+    """
+    due_date = parse_datetime(value) if isinstance(value, str) else None
+    if due_date is None:
+        raise ValueError(f"Invalid due_date: {value!r}")
+    if timezone.is_naive(due_date):
+        due_date = timezone.make_aware(due_date)
+    return due_date
+
+
+def _version_mismatch(current_version):
+    return Response(
+        {
+            "detail": "Task was modified by another request.",
+            "version": current_version,
+        },
+        status=status.HTTP_412_PRECONDITION_FAILED,
+    )
+
 
 class TaskDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
+    # columns a PATCH may change
+    update_fields = (
+        "title",
+        "description",
+        "due_date",
+        "is_overdue",
+        "reminder_sent_at",
+        "status",
+        "completed_at",
+    )
+
     def get(self, request, id, *args, **kwargs):
-        try:
-            task = Task.objects.get(id=id, owner=request.user, is_deleted=False)
-        except Task.DoesNotExist:
+        cached = get_task_detail(id)
+        if cached is None or cached["owner_id"] != request.user.id:
             return Response(
                 {"detail": "Task not found."}, status=status.HTTP_404_NOT_FOUND
             )
 
-        task_data = {
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "due_date": task.due_date,
-            "is_completed": task.is_completed,
-            "is_deleted": task.is_deleted,
-            "created_at": task.created_at,
-            "task_owner": f"{task.owner.first_name} {task.owner.last_name}",
-        }
+        task_data = cached["data"]
 
         return Response(
             {
@@ -173,11 +482,35 @@ class TaskDetailView(APIView):
                 "response": task_data,
             },
             status=status.HTTP_200_OK,
+            headers={"ETag": f'"{task_data["version"]}"'},
         )
 
+    @idempotent
+    @task_atomic
     def patch(self, request, id, *args, **kwargs):
+        """
+        Optimistic concurrency: the client sends the version it edited in
+        `If-Match` (the ETag of GET) or as "version" in the body, and gets
+        412 if the task changed since. Only changed columns are written, in
+        one `UPDATE ... WHERE version = ?`.
+        """
         try:
-            task = Task.objects.get(id=id, owner=request.user, is_deleted=False)
+            expected_version = _requested_version(request)
+        except (TypeError, ValueError):
+            return Response(
+                {"detail": "Invalid If-Match header or version."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        tasks = Task.objects.for_id(id).filter(
+            id=id, owner=request.user, status__in=VISIBLE_TASK_STATUSES
+        )
+        if expected_version is None:
+            # old clients without a version keep last-write-wins semantics
+            tasks = tasks.select_for_update()
+
+        try:
+            task = tasks.get()
         except Task.DoesNotExist:
             return Response(
                 {"detail": "Task not found."}, status=status.HTTP_404_NOT_FOUND
@@ -189,6 +522,12 @@ class TaskDetailView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
+        if expected_version is not None and expected_version != task.version:
+            return _version_mismatch(task.version)
+
+        counters_before = counter_snapshot(task)
+        original = {field: getattr(task, field) for field in self.update_fields}
+
         data = request.data
 
         title = data.get("title")
@@ -197,6 +536,15 @@ class TaskDetailView(APIView):
         is_completed = data.get("is_completed")
         is_deleted = data.get("is_deleted")
 
+        if due_date is not None:
+            try:
+                due_date = _parse_due_date(due_date)
+            except ValueError:
+                return Response(
+                    {"detail": "Invalid due_date."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
         if "title" in data and (title is None or title == ""):
             return Response(
                 {"error": "title field cannot be empty."},
@@ -209,28 +557,55 @@ class TaskDetailView(APIView):
         if description is not None:
             task.description = description
 
-        if due_date is not None:
+        if due_date is not None and due_date != task.due_date:
             task.due_date = due_date
+            # the scheduler re-evaluates the new deadline
+            task.is_overdue = False
+            task.reminder_sent_at = None
 
-        if is_completed is not None:
+        if is_completed is not None and bool(is_completed) != task.is_completed:
             task.is_completed = bool(is_completed)
+            task.completed_at = timezone.now() if task.is_completed else None
 
         if is_deleted is not None:
             task.is_deleted = bool(is_deleted)
 
-        task.save()
-
-        updated_data = {
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "due_date": task.due_date,
-            "is_completed": task.is_completed,
-            "is_deleted": task.is_deleted,
-            "created_at": task.created_at,
-            "task_owner": f"{task.owner.first_name} {task.owner.last_name}",
+        changes = {
+            field: getattr(task, field)
+            for field in self.update_fields
+            if getattr(task, field) != original[field]
         }
 
+        if changes:
+            now = timezone.now()
+            updated = (
+                Task.objects.for_id(task.id)
+                .filter(id=task.id, version=task.version)
+                .update(**changes, updated_at=now, version=F("version") + 1)
+            )
+            if not updated:
+                # changed by another request after we read it
+                current = (
+                    Task.objects.for_id(task.id)
+                    .filter(id=task.id)
+                    .values_list("version", flat=True)
+                )
+                return _version_mismatch(current.first())
+
+            task.updated_at = now
+            task.version += 1
+            update_counters(counters_before, task)
+            send_task_event(
+                task,
+                TASK_UPDATED,
+                request.user,
+                {field: [original[field], value] for field, value in changes.items()},
+            )
+            if changes.keys() & set(Task.SCHEDULE_FIELDS):
+                notify_schedule_changed(task.id, using=task._state.db)
+
+        updated_data = task_detail_data(task)
+
         return Response(
             {
                 "status": 200,
@@ -238,12 +613,143 @@ class TaskDetailView(APIView):
                 "response": updated_data,
             },
             status=status.HTTP_200_OK,
+            headers={"ETag": f'"{task.version}"'},
+        )
+
+
+class TaskHistoryView(APIView):
+    """
+    Activity log of a task for its owner, its assignee and admins, newest
+    first. Keyset paginated on the entry id: pass the returned `cursor` to
+    get the next (older) page.
+    """
+
+    permission_classes = [IsAuthenticated]
+    default_limit = 50
+    max_limit = 200
+
+    def get(self, request, id, *args, **kwargs):
+        user = request.user
+
+        task = (
+            Task.objects.for_id(id)
+            .filter(id=id)
+            .values("owner_id", "assigned_user_id")
+            .first()
+        )
+        if task is None or (user.user_type != "admin" and user.id not in task.values()):
+            return Response(
+                {"detail": "Task not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        try:
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        limit = max(1, min(limit, self.max_limit))
+
+        entries = TaskActivity.objects.filter(task_id=id)
+
+        cursor = request.query_params.get("cursor")
+        if cursor:
+            try:
+                (last_id,) = decode_cursor(cursor, 1)
+                last_id = int(last_id)
+            except (TypeError, ValueError):
+                return Response(
+                    {"detail": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST
+                )
+            entries = entries.filter(id__lt=last_id)
+
+        entries = list(entries.select_related("actor").order_by("-id")[: limit + 1])
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        return Response(
+            {
+                "status": 200,
+                "message": "Task history retrieved successfully.",
+                "response": {
+                    "results": [
+                        {
+                            "id": entry.id,
+                            "event": entry.event,
+                            "actor": entry.actor_id,
+                            "actor_name": (
+                                f"{entry.actor.first_name} {entry.actor.last_name}"
+                                if entry.actor
+                                else None
+                            ),
+                            "details": entry.details,
+                            "created_at": entry.created_at,
+                        }
+                        for entry in entries
+                    ],
+                    "cursor": encode_cursor(entries[-1].id) if has_more else None,
+                    "has_more": has_more,
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class TaskBatchView(APIView):
+    """
+    Several tasks in one request, e.g. for notification feeds:
+    ?ids=1,2,3 (at most `max_ids`). Same visibility as TaskDetailView;
+    ids that don't exist and ids the user may not see are both reported in
+    "not_found".
+    """
+
+    permission_classes = [IsAuthenticated]
+    max_ids = 100
+
+    def get(self, request, *args, **kwargs):
+        try:
+            ids = [int(value) for value in request.query_params["ids"].split(",")]
+        except (KeyError, ValueError):
+            return Response(
+                {"detail": "ids must be a comma separated list of task ids."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > self.max_ids:
+            return Response(
+                {"detail": f"At most {self.max_ids} ids are allowed."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # only the user's own tasks are visible, all on their shard
+        tasks = (
+            Task.objects.for_owner(request.user.id)
+            .with_users("owner")
+            .filter(id__in=ids, owner=request.user, status__in=VISIBLE_TASK_STATUSES)
+        )
+        found = {task.id: task for task in tasks}
+
+        return Response(
+            {
+                "status": 200,
+                "message": "Tasks retrieved successfully.",
+                "response": {
+                    "tasks": [
+                        task_detail_data(found[task_id])
+                        for task_id in ids
+                        if task_id in found
+                    ],
+                    "not_found": [task_id for task_id in ids if task_id not in found],
+                },
+            },
+            status=status.HTTP_200_OK,
         )
 
 
 class TaskCompleteRequestView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @idempotent
+    @task_atomic
     def patch(self, request, id, *args, **kwargs):
 
         user = request.user
@@ -255,7 +761,11 @@ class TaskCompleteRequestView(APIView):
             )
 
         try:
-            task = Task.objects.get(id=id, is_deleted=False)
+            task = (
+                Task.objects.for_id(id)
+                .select_for_update()
+                .get(id=id, status__in=VISIBLE_TASK_STATUSES)
+            )
         except Task.DoesNotExist:
             return Response(
                 {"detail": "Task not found."}, status=status.HTTP_404_NOT_FOUND
@@ -267,14 +777,24 @@ class TaskCompleteRequestView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        if task.complete_requested:
+        if task.status == "pending_approval":
             return Response(
                 {"detail": "Completion request already submitted."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        task.complete_requested = True
+        if task.status == "completed":
+            return Response(
+                {"detail": "Task is already completed."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        counters_before = counter_snapshot(task)
+        task.status = "pending_approval"
+        task.version += 1
         task.save()
+        update_counters(counters_before, task)
+        send_task_event(task, TASK_COMPLETION_REQUESTED, user)
 
         return Response(
             {
@@ -293,14 +813,16 @@ class TaskCompleteRequestView(APIView):
 
 class TaskApproveOrRejectView(APIView):
     """
-    Sadece user_type = 'admin' ve task.owner == request.user olan kullanıcı:
-      - is_completed = True  yaparak görevi onaylayabilir
-      - complete_requested = False + reason göndererek isteği reddedebilir
-        ve reason_for_reject JSONField'ına {id, reason} formatında eklenir.
+    Only a user with user_type = 'admin' and task.owner == request.user can:
+      - approve the task by sending is_completed = True
+      - reject the request by sending complete_requested = False + reason;
+        the reason is appended to reason_for_reject as {id, reason}.
     """
 
     permission_classes = [IsAuthenticated]
 
+    @idempotent
+    @task_atomic
     def patch(self, request, id, *args, **kwargs):
         user = request.user
 
@@ -311,7 +833,11 @@ class TaskApproveOrRejectView(APIView):
             )
 
         try:
-            task = Task.objects.get(id=id, is_deleted=False)
+            task = (
+                Task.objects.for_id(id)
+                .select_for_update()
+                .get(id=id, status__in=VISIBLE_TASK_STATUSES)
+            )
         except Task.DoesNotExist:
             return Response(
                 {"detail": "Task not found."}, status=status.HTTP_404_NOT_FOUND
@@ -323,6 +849,8 @@ class TaskApproveOrRejectView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
+        counters_before = counter_snapshot(task)
+
         data = request.data
 
         is_completed = data.get("is_completed", None)
@@ -330,9 +858,12 @@ class TaskApproveOrRejectView(APIView):
         reason = data.get("reason", None)
 
         if is_completed is True:
-            task.is_completed = True
-            task.complete_requested = False
+            task.status = "completed"
+            task.completed_at = timezone.now()
+            task.version += 1
             task.save()
+            update_counters(counters_before, task)
+            send_task_event(task, TASK_APPROVED, user)
 
             return Response(
                 {
@@ -368,9 +899,12 @@ class TaskApproveOrRejectView(APIView):
             existing_reasons.append({"id": new_id, "reason": reason})
 
             task.reason_for_reject = existing_reasons
-            task.complete_requested = False
-            task.is_completed = False
+            task.status = "rejected"
+            task.completed_at = None
+            task.version += 1
             task.save()
+            update_counters(counters_before, task)
+            send_task_event(task, TASK_REJECTED, user, {"reason": reason})
 
             return Response(
                 {
@@ -398,11 +932,209 @@ class TaskApproveOrRejectView(APIView):
         )
 
 
+class EmployeeWorkloadView(APIView):
+    """
+    For user_type='admin' only: open / pending / completed counts per
+    assignee over the tasks the admin owns, and the average time from
+    assignment to completion. ?ordering=load|-load (default -load), paginated.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    pagination_class = CachedCountPagination
+
+    def get(self, request, *args, **kwargs):
+        ordering = request.query_params.get("ordering", "-load")
+        if ordering not in ("load", "-load"):
+            return Response(
+                {"detail": "Invalid value for ordering. Use 'load' or '-load'."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        completion_time = ExpressionWrapper(
+            F("completed_at") - F("assigned_at"), output_field=DurationField()
+        )
+
+        tasks = Task.objects.for_owner(request.user.id)
+
+        # assignee names are joined in when the tasks are on the users'
+        # database and read with one more query when they are on a shard
+        user_fields = ("first_name", "last_name", "email")
+        joined = tasks.db == DEFAULT_DB_ALIAS
+        joined_fields = [f"assigned_user__{field}" for field in user_fields]
+
+        workload = (
+            tasks.filter(
+                owner=request.user,
+                status__in=VISIBLE_TASK_STATUSES,
+                assigned_user__isnull=False,
+            )
+            .values("assigned_user_id", *(joined_fields if joined else ()))
+            .annotate(
+                open_tasks=Count("id", filter=Q(status__in=ACTIVE_TASK_STATUSES)),
+                pending_tasks=Count("id", filter=Q(status="pending_approval")),
+                completed_tasks=Count("id", filter=Q(status="completed")),
+                avg_completion_time=Avg(
+                    completion_time,
+                    filter=Q(
+                        status="completed",
+                        assigned_at__isnull=False,
+                        completed_at__isnull=False,
+                    ),
+                ),
+            )
+        )
+
+        if ordering == "load":
+            workload = workload.order_by("open_tasks", "assigned_user_id")
+        else:
+            workload = workload.order_by("-open_tasks", "assigned_user_id")
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(workload, request, view=self)
+
+        if joined:
+            assignees = {
+                row["assigned_user_id"]: dict(
+                    zip(user_fields, map(row.get, joined_fields))
+                )
+                for row in page
+            }
+        else:
+            assignees = {
+                user["id"]: user
+                for user in User.objects.filter(
+                    id__in=[row["assigned_user_id"] for row in page]
+                ).values("id", *user_fields)
+            }
+
+        results = [
+            {
+                "user_id": row["assigned_user_id"],
+                "name": (
+                    f"{assignees[row['assigned_user_id']]['first_name']} "
+                    f"{assignees[row['assigned_user_id']]['last_name']}"
+                ),
+                "email": assignees[row["assigned_user_id"]]["email"],
+                "open_tasks": row["open_tasks"],
+                "pending_tasks": row["pending_tasks"],
+                "completed_tasks": row["completed_tasks"],
+                "avg_completion_seconds": (
+                    row["avg_completion_time"].total_seconds()
+                    if row["avg_completion_time"] is not None
+                    else None
+                ),
+            }
+            for row in page
+        ]
+
+        return Response(
+            {
+                "status": 200,
+                "message": "Employee workload retrieved successfully.",
+                "response": {
+                    "count": paginator.page.paginator.count,
+                    "count_is_approximate": (
+                        paginator.page.paginator.count_is_approximate
+                    ),
+                    "next": paginator.get_next_link(),
+                    "previous": paginator.get_previous_link(),
+                    "results": results,
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class TaskTrendView(APIView):
+    """
+    For user_type='admin' only: created / completion requested / approved /
+    rejected counts of the admin's tasks per day. Reads only the
+    TaskDailyRollup table. ?start=YYYY-MM-DD&end=YYYY-MM-DD (default: the
+    last 30 days).
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    default_days = 30
+    max_days = 366
+
+    def get(self, request, *args, **kwargs):
+        today = timezone.now().date()
+
+        start_param = request.query_params.get("start")
+        end_param = request.query_params.get("end")
+
+        try:
+            end = parse_date(end_param) if end_param else today
+            start = parse_date(start_param) if start_param else None
+        except ValueError:
+            start = end = None
+
+        if start is None and not start_param and end is not None:
+            start = end - timedelta(days=self.default_days - 1)
+
+        if start is None or end is None:
+            return Response(
+                {"detail": "start and end must be dates in YYYY-MM-DD format."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if start > end or (end - start).days >= self.max_days:
+            return Response(
+                {"detail": f"The date range must be 1 to {self.max_days} days."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        rows = {
+            row["day"]: row
+            for row in TaskDailyRollup.objects.filter(
+                owner=request.user, day__gte=start, day__lte=end
+            ).values("day", *ROLLUP_FIELDS)
+        }
+
+        trend = []
+        for offset in range((end - start).days + 1):
+            day = start + timedelta(days=offset)
+            row = rows.get(day, {})
+            trend.append(
+                {
+                    "day": day,
+                    **{field: row.get(field, 0) for field in ROLLUP_FIELDS},
+                }
+            )
+
+        return Response(
+            {
+                "status": 200,
+                "message": "Task trends retrieved successfully.",
+                "response": trend,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class CacheStatsView(APIView):
+    """
+    Hit / miss counters of the task caches, for this process.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(
+            {
+                "status": 200,
+                "message": "Cache stats retrieved successfully.",
+                "response": {"task_detail": task_detail_cache.stats()},
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 class AdminDashboardView(APIView):
     """
-    Sadece user_type='admin' olan ve sadece kendi owner olduğu task'ler için
-    dashboard özeti döner.
-    İsteğe bağlı olarak ?is_rejected=true|false filtresi ile task listesi dönebilir.
+    Dashboard summary for user_type='admin', over the tasks the admin owns.
+    With the optional ?is_rejected=true|false filter it also returns the
+    matching tasks.
     """
 
     permission_classes = [IsAuthenticated]
@@ -416,18 +1148,19 @@ class AdminDashboardView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        qs = Task.objects.filter(owner=user, is_deleted=False)
+        tasks = Task.objects.for_owner(user.id)
+        qs = tasks.filter(owner=user, status__in=VISIBLE_TASK_STATUSES)
 
         is_rejected_param = request.query_params.get("is_rejected", None)
 
         if is_rejected_param is not None:
             is_rejected_param = is_rejected_param.lower()
-            now = timezone.now()
 
             if is_rejected_param == "true":
-                filtered = qs.filter(
-                    is_completed=False, complete_requested=False
-                ).filter(Q(reason_for_reject__isnull=False) | Q(due_date__lt=now))
+                filtered = tasks.filter(owner=user).filter(
+                    Q(status="rejected")
+                    | Q(status__in=("open", "rejected"), is_overdue=True)
+                )
 
                 tasks_data = [
                     {
@@ -453,7 +1186,7 @@ class AdminDashboardView(APIView):
                 )
 
             elif is_rejected_param == "false":
-                filtered = qs.filter(is_completed=True)
+                filtered = tasks.filter(owner=user, status="completed")
 
                 tasks_data = [
                     {
@@ -484,11 +1217,16 @@ class AdminDashboardView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-        total_tasks = qs.count()
-        completed_tasks = qs.filter(is_completed=True).count()
-        active_tasks = qs.filter(is_completed=False).count()
-        pending_approval_tasks = qs.filter(
-            complete_requested=True, is_completed=False
+        # one pass over the (owner, status) index
+        by_status = dict(
+            qs.values("status").annotate(n=Count("id")).values_list("status", "n")
+        )
+        total_tasks = sum(by_status.values())
+        completed_tasks = by_status.get("completed", 0)
+        active_tasks = total_tasks - completed_tasks
+        pending_approval_tasks = by_status.get("pending_approval", 0)
+        overdue_tasks = qs.filter(
+            status__in=ACTIVE_TASK_STATUSES, is_overdue=True
         ).count()
 
         total_rejections = 0
@@ -505,6 +1243,7 @@ class AdminDashboardView(APIView):
             "completed_tasks": completed_tasks,
             "active_tasks": active_tasks,
             "pending_approval_tasks": pending_approval_tasks,
+            "overdue_tasks": overdue_tasks,
             "tasks_with_rejection": tasks_with_rejection,
             "total_rejections": total_rejections,
         }
@@ -517,3 +1256,187 @@ class AdminDashboardView(APIView):
             },
             status=status.HTTP_200_OK,
         )
+
+
+class OffboardUserView(APIView):
+    """
+    Offboards an employee who leaves: the user is deactivated right away and
+    their active tasks are handed to the "reassign_to" user with one UPDATE.
+    Their own tasks and the user are deleted in batches by the
+    "offboard_user" job (see todo/offboarding.py). GET returns the state of
+    the latest offboarding.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request, id, *args, **kwargs):
+        offboarding = (
+            Offboarding.objects.select_related("job")
+            .filter(user_id=id)
+            .order_by("-id")
+            .first()
+        )
+        if offboarding is None:
+            return Response(
+                {"detail": "Offboarding not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        job = offboarding.job
+        offboarding_status = offboarding.status
+        if job is not None and job.status == "failed":
+            offboarding_status = "failed"
+
+        return Response(
+            {
+                "status": 200,
+                "message": "Offboarding status fetched successfully.",
+                "response": {
+                    "id": offboarding.id,
+                    "user_id": offboarding.user_id,
+                    "status": offboarding_status,
+                    "reassigned": offboarding.reassigned,
+                    "deleted": offboarding.deleted,
+                    "unassigned": offboarding.unassigned,
+                    "attempts": job.attempts if job is not None else None,
+                    "last_error": job.last_error if job is not None else "",
+                    "created_at": offboarding.created_at,
+                    "updated_at": offboarding.updated_at,
+                    "finished_at": offboarding.finished_at,
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @idempotent
+    def post(self, request, id, *args, **kwargs):
+        if id == request.user.id:
+            return Response(
+                {"detail": "You cannot offboard yourself."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            user = User.objects.get(id=id)
+        except User.DoesNotExist:
+            return Response(
+                {"detail": "User not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        reassign_to_id = request.data.get("reassign_to")
+        reassign_to = None
+        if reassign_to_id is not None:
+            reassign_to = User.objects.filter(
+                id=reassign_to_id, is_active=True, is_deleted=False
+            ).first()
+            if reassign_to is None or reassign_to.id == user.id:
+                return Response(
+                    {"detail": "reassign_to must be another active user."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        offboarding = start_offboarding(
+            user, reassign_to.id if reassign_to is not None else None
+        )
+
+        return Response(
+            {
+                "status": 202,
+                "message": "Offboarding started.",
+                "response": {
+                    "id": offboarding.id,
+                    "reassigned": offboarding.reassigned,
+                    "job_id": offboarding.job_id,
+                },
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class WebhookSubscriptionListView(APIView):
+    """
+    Lists webhook endpoints and adds new ones (admins only). The signing
+    secret is returned once, in the response to the creation.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        subscriptions = WebhookSubscription.objects.order_by("id")
+        return Response(
+            {
+                "status": 200,
+                "message": "Webhook subscriptions retrieved successfully.",
+                "response": WebhookSubscriptionSerializer(
+                    subscriptions, many=True
+                ).data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @idempotent
+    def post(self, request, *args, **kwargs):
+        serializer = WebhookSubscriptionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        secret = secrets.token_hex(32)
+        subscription = serializer.save(secret=secret, created_by=request.user)
+
+        return Response(
+            {
+                "status": 201,
+                "message": "Webhook subscription created successfully.",
+                "response": {
+                    **WebhookSubscriptionSerializer(subscription).data,
+                    "secret": secret,
+                },
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class WebhookSubscriptionDetailView(APIView):
+    """
+    Updates or removes a webhook endpoint (admins only).
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def _get(self, id):
+        return WebhookSubscription.objects.filter(id=id).first()
+
+    def patch(self, request, id, *args, **kwargs):
+        subscription = self._get(id)
+        if subscription is None:
+            return Response(
+                {"detail": "Webhook subscription not found."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        serializer = WebhookSubscriptionSerializer(
+            subscription, data=request.data, partial=True
+        )
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        subscription = serializer.save()
+
+        return Response(
+            {
+                "status": 200,
+                "message": "Webhook subscription updated successfully.",
+                "response": WebhookSubscriptionSerializer(subscription).data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    def delete(self, request, id, *args, **kwargs):
+        subscription = self._get(id)
+        if subscription is None:
+            return Response(
+                {"detail": "Webhook subscription not found."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        # pending events go with it
+        subscription.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,74 @@
+"""
+"Tasks visible to this user" queries.
+
+Admins see every task. Everybody else sees the tasks they own or are
+assigned to; instead of `Q(owner=user) | Q(assigned_user=user)`, which can't
+use either FK index, that is a UNION ALL of two branches that each use one:
+
+    (tasks owned by the user)
+    UNION ALL
+    (tasks assigned to the user that they don't own)
+
+The second branch excludes the first, so no row appears twice. Filters are
+applied inside both branches; with a limit, the ordering and limit are also
+pushed into each branch where the database supports it (PostgreSQL, MySQL),
+so every branch stops after `limit` index-ordered rows.
+
+With sharded tasks (todo/sharding.py) the assigned branch runs on every
+shard and the owned branch only on the user's shard; the results are
+merged in Python.
+"""
+
+from django.db import connections
+
+from .models import Task
+from .sharding import fetch_all, is_sharded, merge_sorted, scatter_gather
+
+
+def visible_tasks(user, *filters, order_by=(), limit=None, **lookups):
+    """
+    Tasks `user` may see, filtered by `filters`/`lookups`, ordered by
+    `order_by` and cut at `limit`. Returns a queryset that can only be
+    iterated (union querysets can't be filtered further), or a list when
+    tasks are sharded.
+    """
+    tasks = Task.objects.filter(*filters, **lookups)
+
+    if is_sharded():
+        if user.user_type == "admin":
+            return scatter_gather(tasks.per_shard(), order_by, limit)
+
+        owner_shard = Task.objects.for_owner(user.id).db
+        results = fetch_all(
+            _visible_on(shard, user, order_by, limit, owned=shard.db == owner_shard)
+            for shard in tasks.per_shard()
+        )
+        return merge_sorted(results, order_by, limit)
+
+    if user.user_type == "admin":
+        tasks = tasks.order_by(*order_by)
+        return tasks[:limit] if limit is not None else tasks
+
+    return _visible_on(tasks, user, order_by, limit)
+
+
+def _visible_on(tasks, user, order_by, limit, owned=True):
+    """
+    The UNION ALL above on the database of `tasks`; only the assigned
+    branch when `owned` is False.
+    """
+    assigned = tasks.filter(assigned_user=user).exclude(owner=user)
+    if not owned:
+        assigned = assigned.order_by(*order_by)
+        return assigned[:limit] if limit is not None else assigned
+
+    branches = [tasks.filter(owner=user), assigned]
+
+    features = connections[tasks.db].features
+    if limit is not None and features.supports_slicing_ordering_in_compound:
+        branches = [branch.order_by(*order_by)[:limit] for branch in branches]
+    else:
+        branches = [branch.order_by() for branch in branches]
+
+    combined = branches[0].union(branches[1], all=True).order_by(*order_by)
+    return combined[:limit] if limit is not None else combined